@@ -1,37 +1,139 @@
 """
 Agent initialization and configuration
 """
+import asyncio
+
 from langchain.agents import create_agent
-from langchain.tools import tool
+from langchain_core.tools import StructuredTool
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
-from langchain_core.vectorstores import InMemoryVectorStore
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_core.documents import Document
 
 from config.settings import (
     MODEL_NAME, 
     MODEL_TEMPERATURE, 
-    CHUNK_SIZE, 
-    CHUNK_OVERLAP, 
+    EMBEDDING_MODEL,
+    KB_DIR,
+    INDEX_PATH,
     SIMILARITY_SEARCH_K
 )
-from data.knowledge_base import KNOWLEDGE_BASE
+from data.knowledge_base import load_documents
+from retrieval.engine import RetrievalEngine
+from retrieval.index_store import load_or_build_index
+from retrieval.retriever import KnowledgeRetriever
 from tools import (
     calculate_profit, 
+    calculate_batch_profit,
     get_price_range, 
     get_platform_tutorial, 
     check_authentication_tips
 )
+from agent.async_runner import ToolTimeoutMiddleware
+from agent.instrumentation import TracingMiddleware
+from utils.http_client import get_http_client, get_shared_async_client, http_timeout
 from utils.logger import setup_logger
+from utils.tracing import traced
 
 logger = setup_logger(__name__)
 
-def initialize_agent(api_key: str):
+def create_embeddings(api_key: str = None) -> OpenAIEmbeddings:
+    """Create the embeddings client used for indexing and queries"""
+    return OpenAIEmbeddings(
+        model=EMBEDDING_MODEL,
+        api_key=api_key,
+        request_timeout=http_timeout(),
+        http_client=get_http_client(),
+        http_async_client=get_shared_async_client()
+    )
+
+
+def create_chat_model(api_key: str = None) -> ChatOpenAI:
+    """Create the chat model used by the agent (and for conversation summaries)"""
+    return ChatOpenAI(
+        model=MODEL_NAME, 
+        temperature=MODEL_TEMPERATURE,
+        api_key=api_key,
+        stream_usage=True,
+        request_timeout=http_timeout(),
+        http_client=get_http_client(),
+        http_async_client=get_shared_async_client()
+    )
+
+
+def create_engine(index) -> RetrievalEngine:
+    """Retrieval engine for ``index``, with its HNSW graph cached next to the index file"""
+    return RetrievalEngine(index, hnsw_path=f"{INDEX_PATH}.{index.key[:16]}.hnsw")
+
+
+@traced("agent.load_index")
+def create_vectorstore(api_key: str = None):
+    """
+    Load (or build) the knowledge base index with a query embedding client
+    
+    Args:
+        api_key: OpenAI API key, falls back to OPENAI_API_KEY when omitted
+    
+    Returns:
+        KnowledgeRetriever (cached retrieval engine) ready for similarity search
+    """
+    index = load_or_build_index(load_documents(KB_DIR), create_embeddings(api_key))
+    vectorstore = KnowledgeRetriever(create_engine(index))
+    logger.info(f"Vector store ready with {len(vectorstore)} chunks")
+    return vectorstore
+
+
+def create_tools(vectorstore) -> list:
+    """
+    Build the agent tool set around a vector store
+    
+    Args:
+        vectorstore: Index used by the knowledge base search tool
+    
+    Returns:
+        List of LangChain tools
+    """
+    
+    # Create knowledge base search tool
+    def search(query: str) -> str:
+        """Search the GrabyAI platform guide for information"""
+        try:
+            docs = vectorstore.similarity_search(query, k=SIMILARITY_SEARCH_K)
+            context = "\n\n---\n\n".join([doc.page_content for doc in docs])
+            logger.info(f"Knowledge base search successful")
+            return context
+        except Exception as e:
+            logger.error(f"Error in knowledge base search: {str(e)}")
+            return f"Error searching knowledge base: {str(e)}"
+    
+    async def asearch(query: str) -> str:
+        """Search the GrabyAI platform guide for information"""
+        # The query embedding is a network call; keep it off the event loop
+        return await asyncio.to_thread(search, query)
+    
+    search_knowledge_base = StructuredTool.from_function(
+        func=search,
+        coroutine=asearch,
+        name="search_knowledge_base"
+    )
+    
+    return [
+        search_knowledge_base,
+        calculate_profit,
+        calculate_batch_profit,
+        get_price_range,
+        get_platform_tutorial,
+        check_authentication_tips
+    ]
+
+
+@traced("agent.init")
+def initialize_agent(api_key: str, vectorstore=None, tools: list = None, model=None):
     """
     Initialize the agent with knowledge base and tools
     
     Args:
         api_key: OpenAI API key
+        vectorstore: Existing index to reuse (loaded if omitted)
+        tools: Existing tool set to reuse (built around vectorstore if omitted)
+        model: Existing chat model to reuse (created if omitted)
     
     Returns:
         Tuple of (agent, vectorstore)
@@ -40,56 +142,15 @@ def initialize_agent(api_key: str):
     try:
         logger.info("Initializing agent...")
         
-        # Create documents from knowledge base
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=CHUNK_SIZE,
-            chunk_overlap=CHUNK_OVERLAP
-        )
-        
-        docs = [Document(
-            page_content=KNOWLEDGE_BASE, 
-            metadata={"source": "platform_guide"}
-        )]
-        splits = text_splitter.split_documents(docs)
-        
-        logger.info(f"Knowledge base split into {len(splits)} chunks")
-        
-        # Create vector store
-        embeddings = OpenAIEmbeddings()
-        vectorstore = InMemoryVectorStore.from_documents(
-            documents=splits,
-            embedding=embeddings
-        )
+        if vectorstore is None:
+            vectorstore = create_vectorstore(api_key)
         
-        logger.info("Vector store created successfully")
-        
-        # Create knowledge base search tool
-        @tool
-        def search_knowledge_base(query: str) -> str:
-            """Search the GrabyAI platform guide for information"""
-            try:
-                docs = vectorstore.similarity_search(query, k=SIMILARITY_SEARCH_K)
-                context = "\n\n---\n\n".join([doc.page_content for doc in docs])
-                logger.info(f"Knowledge base search successful")
-                return context
-            except Exception as e:
-                logger.error(f"Error in knowledge base search: {str(e)}")
-                return f"Error searching knowledge base: {str(e)}"
+        if tools is None:
+            tools = create_tools(vectorstore)
         
         # Initialize model
-        model = ChatOpenAI(
-            model=MODEL_NAME, 
-            temperature=MODEL_TEMPERATURE
-        )
-        
-        # Collect all tools
-        tools = [
-            search_knowledge_base,
-            calculate_profit,
-            get_price_range,
-            get_platform_tutorial,
-            check_authentication_tips
-        ]
+        if model is None:
+            model = create_chat_model(api_key)
         
         # System prompt
         system_prompt = """You are the GrabyAI Platform Assistant.
@@ -106,11 +167,16 @@ Always recommend 30%+ profit margin and direct users to WhatsApp group for exper
 Be helpful, specific, and encouraging!"""
         
         # Create agent
-        agent = create_agent(model, tools, system_prompt=system_prompt)
+        agent = create_agent(
+            model,
+            tools,
+            system_prompt=system_prompt,
+            middleware=[TracingMiddleware(), ToolTimeoutMiddleware()]
+        )
         
         logger.info("Agent initialized successfully")
         return agent, vectorstore
         
     except Exception as e:
         logger.error(f"Fatal error initializing agent: {str(e)}")
-        raise
\ No newline at end of file
+        raise
@@ -0,0 +1,344 @@
+"""
+Full-answer cache for agent responses
+
+A complete agent answer is reused when the same question comes in again for
+the same model, temperature and knowledge index version. Lookups are exact on
+the normalized prompt first, then near-duplicate: prompts whose character
+trigrams overlap above a threshold (and that mention exactly the same
+numbers, so "buy £200" never answers "buy £250") share an answer. Entries
+are bounded by count and TTL and can optionally be persisted with diskcache
+so they survive restarts.
+
+``start_warm_up`` precomputes answers for the sidebar example questions in a
+background thread, so those buttons respond instantly.
+"""
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, Iterable, Optional
+
+from config.settings import (
+    ANSWER_CACHE_SIZE,
+    ANSWER_CACHE_TTL,
+    ANSWER_CACHE_SIMILARITY,
+    ANSWER_CACHE_DIR,
+    MODEL_NAME,
+    MODEL_TEMPERATURE
+)
+from retrieval.cache import normalize_query
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+try:
+    import diskcache
+except ImportError:  # pragma: no cover - diskcache is optional
+    diskcache = None
+
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)*")
+
+
+def _trigrams(text: str) -> FrozenSet[str]:
+    compact = text.replace(" ", "")
+    if len(compact) < 3:
+        return frozenset([compact])
+    return frozenset(compact[i:i + 3] for i in range(len(compact) - 2))
+
+
+def _similarity(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+@dataclass(frozen=True)
+class CachedAnswer:
+    """A cache hit: the stored answer and how it matched ('exact' or 'similar')"""
+    answer: str
+    match: str
+    prompt: str
+
+
+class _Entry:
+    __slots__ = ("prompt", "answer", "trigrams", "numbers", "scope", "expires_at")
+
+    def __init__(self, prompt, answer, trigrams, numbers, scope, expires_at):
+        self.prompt = prompt
+        self.answer = answer
+        self.trigrams = trigrams
+        self.numbers = numbers
+        self.scope = scope
+        self.expires_at = expires_at
+
+
+class AnswerCache:
+    """Thread-safe LRU + TTL cache of final agent answers"""
+
+    def __init__(
+        self,
+        max_size: int = ANSWER_CACHE_SIZE,
+        ttl: float = ANSWER_CACHE_TTL,
+        similarity_threshold: float = ANSWER_CACHE_SIMILARITY,
+        directory: Optional[str] = ANSWER_CACHE_DIR,
+        model: str = MODEL_NAME,
+        temperature: float = MODEL_TEMPERATURE
+    ):
+        """
+        Args:
+            max_size: Maximum number of cached answers
+            ttl: Seconds an answer stays valid
+            similarity_threshold: Minimum trigram Jaccard similarity for a near-duplicate hit
+                (values above 1 disable near-duplicate matching)
+            directory: diskcache directory for persistence; None keeps answers in memory only
+            model: Model name the answers were generated with
+            temperature: Sampling temperature the answers were generated with
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.model = model
+        self.temperature = temperature
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+
+        self._disk = None
+        if directory and max_size > 0:
+            if diskcache is None:
+                logger.warning("diskcache not installed, answer cache is memory-only")
+            else:
+                self._disk = diskcache.Cache(directory, size_limit=64 * 1024 * 1024)
+                self._load_from_disk()
+
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(self, prompt: str, version: str) -> str:
+        """Cache key of ``prompt`` for the configured model and index ``version``"""
+        raw = f"{normalize_query(prompt)}\x00{self.model}\x00{self.temperature}\x00{version}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def scope(self, version: str) -> str:
+        """Entries can only match each other within one model/temperature/index scope"""
+        return f"{self.model}|{self.temperature}|{version}"
+
+    def get(self, prompt: str, version: str) -> Optional[CachedAnswer]:
+        """
+        Look up an answer for ``prompt``.
+
+        Args:
+            prompt: User question as typed
+            version: Knowledge index version (``vectorstore.key``)
+
+        Returns:
+            CachedAnswer, or None on a miss
+        """
+        if self.max_size <= 0:
+            return None
+        key = self.key(prompt, version)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return CachedAnswer(entry.answer, "exact", entry.prompt)
+                self._remove(key)
+                self.expirations += 1
+
+            if self.similarity_threshold <= 1:
+                normalized = normalize_query(prompt)
+                trigrams = _trigrams(normalized)
+                numbers = tuple(_NUMBER.findall(normalized))
+                scope = self.scope(version)
+
+                best_key, best_score = None, self.similarity_threshold
+                for candidate_key, candidate in self._entries.items():
+                    if candidate.scope != scope or candidate.numbers != numbers:
+                        continue
+                    if candidate.expires_at <= now:
+                        continue
+                    score = _similarity(trigrams, candidate.trigrams)
+                    if score >= best_score:
+                        best_key, best_score = candidate_key, score
+
+                if best_key is not None:
+                    entry = self._entries[best_key]
+                    self._entries.move_to_end(best_key)
+                    self.similar_hits += 1
+                    return CachedAnswer(entry.answer, "similar", entry.prompt)
+
+            self.misses += 1
+            return None
+
+    def put(self, prompt: str, answer: str, version: str) -> None:
+        """Store the final ``answer`` to ``prompt`` for index ``version``"""
+        if self.max_size <= 0 or not answer:
+            return
+        key = self.key(prompt, version)
+        normalized = normalize_query(prompt)
+        entry = _Entry(
+            prompt,
+            answer,
+            _trigrams(normalized),
+            tuple(_NUMBER.findall(normalized)),
+            self.scope(version),
+            time.monotonic() + self.ttl
+        )
+        with self._lock:
+            self._insert(key, entry)
+
+        if self._disk is not None:
+            try:
+                self._disk.set(key, (prompt, answer, entry.scope), expire=self.ttl)
+            except Exception as e:
+                logger.error(f"Answer cache write failed: {str(e)}")
+
+    def contains(self, prompt: str, version: str) -> bool:
+        """Exact, unexpired entry for ``prompt`` exists (no counters touched)"""
+        entry = self._entries.get(self.key(prompt, version))
+        return entry is not None and entry.expires_at > time.monotonic()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        if self._disk is not None:
+            self._disk.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss/eviction counters"""
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+    def _insert(self, key: str, entry: _Entry) -> None:
+        if key in self._entries:
+            self._entries.move_to_end(key)
+        self._entries[key] = entry
+        while len(self._entries) > self.max_size:
+            evicted, _ = self._entries.popitem(last=False)
+            self.evictions += 1
+            if self._disk is not None:
+                self._disk.delete(evicted)
+
+    def _remove(self, key: str) -> None:
+        self._entries.pop(key, None)
+        if self._disk is not None:
+            self._disk.delete(key)
+
+    def _load_from_disk(self) -> None:
+        loaded = 0
+        try:
+            for key in list(self._disk.iterkeys()):
+                record, expire_time = self._disk.get(key, expire_time=True)
+                if record is None:
+                    continue
+                prompt, answer, scope = record
+                remaining = expire_time - time.time() if expire_time else self.ttl
+                normalized = normalize_query(prompt)
+                self._insert(key, _Entry(
+                    prompt,
+                    answer,
+                    _trigrams(normalized),
+                    tuple(_NUMBER.findall(normalized)),
+                    scope,
+                    time.monotonic() + remaining
+                ))
+                loaded += 1
+        except Exception as e:
+            logger.error(f"Error loading answer cache: {str(e)}")
+        if loaded:
+            logger.info(f"Loaded {loaded} cached answers from disk")
+
+
+_cache: Optional[AnswerCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_answer_cache() -> AnswerCache:
+    """Return the process-wide answer cache, creating it on first use"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = AnswerCache()
+    return _cache
+
+
+_warmed: set = set()
+_warm_lock = threading.Lock()
+
+
+def start_warm_up(
+    agent,
+    version: str,
+    prompts: Iterable[str],
+    skip: Optional[Callable[[str], bool]] = None,
+    cache: Optional[AnswerCache] = None
+) -> Optional[threading.Thread]:
+    """
+    Precompute answers for ``prompts`` in a daemon thread.
+
+    Runs at most once per index version per process (later calls, e.g. on
+    every Streamlit rerun, return None). Prompts already cached or for which
+    ``skip`` returns True (such as questions the fast-path router answers)
+    are not sent to the model.
+
+    Args:
+        agent: Compiled agent graph
+        version: Knowledge index version the answers belong to
+        prompts: Questions to answer
+        skip: Optional predicate for prompts that don't need warming
+        cache: Target cache (defaults to the process-wide one)
+
+    Returns:
+        The started thread, or None if this version was already warmed
+    """
+    cache = cache or get_answer_cache()
+    with _warm_lock:
+        if version in _warmed:
+            return None
+        _warmed.add(version)
+
+    pending = [p for p in prompts if not (skip and skip(p)) and not cache.contains(p, version)]
+    if not pending:
+        return None
+
+    def run():
+        # Deferred so importing this module stays cheap on the landing page
+        from agent.streaming import iter_agent_events
+
+        start = time.perf_counter()
+        warmed = 0
+        for prompt in pending:
+            try:
+                answer = ""
+                for event in iter_agent_events(agent, [{"role": "user", "content": prompt}]):
+                    if event.kind == "done":
+                        answer = event.text
+                if answer:
+                    cache.put(prompt, answer, version)
+                    warmed += 1
+            except Exception as e:
+                logger.error(f"Warm-up failed for '{prompt[:50]}': {str(e)}")
+        logger.info(f"Warmed {warmed}/{len(pending)} answers in {time.perf_counter() - start:.1f}s")
+
+    thread = threading.Thread(target=run, name="answer-cache-warm-up", daemon=True)
+    thread.start()
+    return thread
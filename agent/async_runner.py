@@ -0,0 +1,194 @@
+"""
+Asynchronous agent execution
+
+The agent's tool node already dispatches every tool call of one model turn
+concurrently; under ``astream`` that is an ``asyncio.gather``. This module adds
+what makes that safe to rely on: per-tool timeouts with cancellation, and a
+long-lived background event loop so synchronous callers (the Streamlit script
+thread) can drive the async agent without blocking on each tool in turn.
+"""
+import asyncio
+import concurrent.futures
+import contextvars
+import queue
+import threading
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional
+
+from langchain.agents.middleware import AgentMiddleware
+from langchain_core.messages import ToolMessage
+
+from config.settings import TOOL_MAX_WORKERS, TOOL_TIMEOUT, TOOL_TIMEOUTS
+from utils.logger import setup_logger
+from utils.tracing import get_metrics
+
+logger = setup_logger(__name__)
+
+
+class ToolTimeoutMiddleware(AgentMiddleware):
+    """
+    Fail a tool call with an error message once it exceeds its time budget.
+
+    This is a backstop: network calls carry their own HTTP timeouts. On the
+    sync path a timed-out call can't be stopped, so it runs on a bounded
+    pool; calls still queued are cancelled, running ones are counted as
+    abandoned (``tool_abandoned`` metric) and logged when they finally end.
+    """
+
+    def __init__(
+        self,
+        default_timeout: float = TOOL_TIMEOUT,
+        timeouts: Dict[str, float] = None,
+        max_workers: int = TOOL_MAX_WORKERS
+    ):
+        """
+        Args:
+            default_timeout: Seconds allowed per tool call
+            timeouts: Per-tool overrides keyed by tool name
+            max_workers: Threads running sync tool calls
+        """
+        super().__init__()
+        self.default_timeout = default_timeout
+        self.timeouts = dict(TOOL_TIMEOUTS if timeouts is None else timeouts)
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="tool-timeout"
+        )
+        self._abandoned = 0
+        self._abandoned_lock = threading.Lock()
+
+    @property
+    def abandoned(self) -> int:
+        """Timed-out sync tool calls still occupying a worker thread"""
+        with self._abandoned_lock:
+            return self._abandoned
+
+    def _abandon(self, name: str, future: concurrent.futures.Future, timeout: float) -> None:
+        if future.cancel():
+            # Still queued behind other calls: it will never run
+            return
+        with self._abandoned_lock:
+            self._abandoned += 1
+        get_metrics().increment("tool_abandoned", tool=name)
+
+        def finished(_):
+            with self._abandoned_lock:
+                self._abandoned -= 1
+            get_metrics().increment("tool_abandoned", -1, tool=name)
+            logger.warning(f"Tool {name} finished after its {timeout:.0f}s timeout; result discarded")
+
+        future.add_done_callback(finished)
+
+    def _timeout_for(self, request) -> float:
+        return self.timeouts.get(request.tool_call["name"], self.default_timeout)
+
+    def _timed_out(self, request, timeout: float) -> ToolMessage:
+        name = request.tool_call["name"]
+        logger.warning(f"Tool {name} timed out after {timeout:.0f}s")
+        return ToolMessage(
+            content=f"Error: {name} timed out after {timeout:.0f} seconds. Answer without it or try again.",
+            tool_call_id=request.tool_call["id"],
+            name=name,
+            status="error"
+        )
+
+    def wrap_tool_call(self, request, handler: Callable):
+        # Threads cannot be cancelled; the call keeps running but the agent moves on
+        timeout = self._timeout_for(request)
+        future = self._executor.submit(contextvars.copy_context().run, handler, request)
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            self._abandon(request.tool_call["name"], future, timeout)
+            return self._timed_out(request, timeout)
+
+    async def awrap_tool_call(self, request, handler: Callable[..., Awaitable]):
+        timeout = self._timeout_for(request)
+        try:
+            return await asyncio.wait_for(handler(request), timeout=timeout)
+        except asyncio.TimeoutError:
+            return self._timed_out(request, timeout)
+
+
+_END = object()
+
+
+async def _in_context(ctx: contextvars.Context, coro: Awaitable):
+    """Await ``coro`` with the caller's context variables (e.g. the log request ID)"""
+    for var, value in ctx.items():
+        var.set(value)
+    return await coro
+
+
+class AgentLoop:
+    """A background event loop shared by all sessions for async agent runs"""
+
+    def __init__(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="agent-loop", daemon=True)
+        self._thread.start()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return self._loop
+
+    def run(self, coro: Awaitable, timeout: Optional[float] = None):
+        """Run a coroutine on the loop and wait for its result"""
+        future = asyncio.run_coroutine_threadsafe(
+            _in_context(contextvars.copy_context(), coro), self._loop
+        )
+        try:
+            return future.result(timeout=timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def iterate(self, agen: AsyncIterator) -> Iterator:
+        """
+        Consume an async iterator from synchronous code.
+
+        Items are handed over through a queue as they are produced. If the
+        caller stops early (or is interrupted), the async iterator is
+        cancelled, which cancels any in-flight tool calls.
+        """
+        items: queue.Queue = queue.Queue()
+
+        async def pump():
+            try:
+                async for item in agen:
+                    items.put((item, None))
+            except asyncio.CancelledError:
+                items.put((_END, None))
+                raise
+            except BaseException as e:
+                items.put((_END, e))
+            else:
+                items.put((_END, None))
+
+        future = asyncio.run_coroutine_threadsafe(
+            _in_context(contextvars.copy_context(), pump()), self._loop
+        )
+        try:
+            while True:
+                item, error = items.get()
+                if item is _END:
+                    if error is not None:
+                        raise error
+                    return
+                yield item
+        finally:
+            if not future.done():
+                future.cancel()
+
+
+_agent_loop: Optional[AgentLoop] = None
+_agent_loop_lock = threading.Lock()
+
+
+def get_agent_loop() -> AgentLoop:
+    """Return the process-wide agent event loop, starting it on first use"""
+    global _agent_loop
+    if _agent_loop is None:
+        with _agent_loop_lock:
+            if _agent_loop is None:
+                _agent_loop = AgentLoop()
+    return _agent_loop
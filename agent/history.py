@@ -0,0 +1,235 @@
+"""
+Token-budgeted conversation memory
+
+Each agent call gets the conversation so far in bounded form: the most
+recent turns verbatim (up to HISTORY_RECENT_TURNS and HISTORY_MAX_TOKENS)
+and everything older folded into a rolling summary. The summary is updated
+incrementally: only messages that just left the verbatim window are sent to
+the summarizer, together with the previous summary. Sizes are counted with
+the model's tiktoken encoding.
+"""
+import threading
+from typing import Callable, List, Optional
+
+from config.settings import (
+    MODEL_NAME,
+    HISTORY_MAX_TOKENS,
+    HISTORY_RECENT_TURNS,
+    HISTORY_SUMMARY_MAX_TOKENS
+)
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - tiktoken is optional
+    tiktoken = None
+
+# Role/separator tokens the chat format adds around every message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        with _encoding_lock:
+            if not _encoding_loaded:
+                if tiktoken is not None:
+                    try:
+                        _encoding = tiktoken.encoding_for_model(MODEL_NAME)
+                    except KeyError:
+                        _encoding = tiktoken.get_encoding("o200k_base")
+                    except Exception as e:
+                        # The BPE file is downloaded on first use; offline we estimate
+                        logger.warning(f"tiktoken encoding unavailable, estimating tokens: {str(e)[:100]}")
+                else:
+                    logger.warning("tiktoken not installed, estimating tokens")
+                _encoding_loaded = True
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Tokens in ``text`` for MODEL_NAME (about 4 characters per token without tiktoken)"""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def message_tokens(message: dict) -> int:
+    """Tokens a chat message costs in a prompt, including the per-message overhead"""
+    return count_tokens(message.get("content", "")) + MESSAGE_OVERHEAD_TOKENS
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Cut ``text`` to at most ``max_tokens`` tokens"""
+    encoding = _get_encoding()
+    if encoding is None:
+        return text[:max_tokens * 4]
+    tokens = encoding.encode(text, disallowed_special=())
+    return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+
+
+def _is_context(message: dict) -> bool:
+    # Error placeholders shown in the chat are not part of the conversation
+    return message.get("role") in ("user", "assistant") and not message.get("error")
+
+
+def extractive_summary(summary: str, messages: List[dict], max_tokens: int = HISTORY_SUMMARY_MAX_TOKENS) -> str:
+    """Summarizer without a model: keeps the start of each message, newest last"""
+    lines = [summary] if summary else []
+    for message in messages:
+        speaker = "User" if message["role"] == "user" else "Assistant"
+        lines.append(f"{speaker}: {truncate_tokens(' '.join(message['content'].split()), 40)}")
+    text = "\n".join(lines)
+    # Over budget: drop the oldest lines first
+    while len(lines) > 1 and count_tokens(text) > max_tokens:
+        lines.pop(0)
+        text = "\n".join(lines)
+    return truncate_tokens(text, max_tokens)
+
+
+def model_summarizer(model) -> Callable[[str, List[dict], int], str]:
+    """
+    Summarizer backed by a chat model, falling back to ``extractive_summary`` on errors.
+
+    Args:
+        model: LangChain chat model (e.g. ``AgentBundle.model``)
+    """
+    def summarize(summary: str, messages: List[dict], max_tokens: int = HISTORY_SUMMARY_MAX_TOKENS) -> str:
+        transcript = "\n".join(
+            f"{'User' if m['role'] == 'user' else 'Assistant'}: {m['content']}" for m in messages
+        )
+        prompt = (
+            f"Update the running summary of a conversation between a user and the "
+            f"GrabyAI assistant. Keep facts the user shared (items, brands, prices, "
+            f"platforms, goals) and answers they may refer back to. Reply with the "
+            f"summary only, at most {int(max_tokens * 0.75)} words.\n\n"
+            f"Current summary:\n{summary or '(empty)'}\n\nNew messages:\n{transcript}"
+        )
+        try:
+            response = model.invoke([{"role": "user", "content": prompt}])
+            text = response.content if isinstance(response.content, str) else response.text
+            return truncate_tokens(text.strip(), max_tokens)
+        except Exception as e:
+            logger.error(f"Error summarizing conversation: {str(e)}")
+            return extractive_summary(summary, messages, max_tokens)
+
+    return summarize
+
+
+class ConversationMemory:
+    """Per-session rolling summary plus a verbatim window of recent turns"""
+
+    def __init__(
+        self,
+        max_tokens: int = HISTORY_MAX_TOKENS,
+        recent_turns: int = HISTORY_RECENT_TURNS,
+        summary_max_tokens: int = HISTORY_SUMMARY_MAX_TOKENS
+    ):
+        """
+        Args:
+            max_tokens: Budget for the verbatim messages (the current prompt always fits)
+            recent_turns: Maximum user/assistant turns sent verbatim
+            summary_max_tokens: Cap on the rolling summary
+        """
+        self.max_tokens = max_tokens
+        self.recent_turns = recent_turns
+        self.summary_max_tokens = summary_max_tokens
+        self.summary = ""
+        # Messages [0, summarized) of the chat history are covered by the summary
+        self.summarized = 0
+        self._tokens: dict = {}
+
+    def _message_tokens(self, index: int, message: dict) -> int:
+        # Chat messages never change once written, so each is tokenized once
+        cached = self._tokens.get(index)
+        if cached is None or cached[0] is not message:
+            cached = (message, message_tokens(message))
+            self._tokens[index] = cached
+        return cached[1]
+
+    def window_start(self, messages: List[dict]) -> int:
+        """Index of the oldest message sent verbatim"""
+        budget = self.max_tokens
+        count = 0
+        start = len(messages)
+        for i in range(len(messages) - 1, -1, -1):
+            message = messages[i]
+            if not _is_context(message):
+                start = i
+                continue
+            cost = self._message_tokens(i, message)
+            # The newest message (the current prompt) is always included
+            if start < len(messages) and (count >= self.recent_turns * 2 + 1 or cost > budget):
+                break
+            budget -= cost
+            count += 1
+            start = i
+        return max(start, self.summarized)
+
+    def context(self, messages: List[dict]) -> List[dict]:
+        """
+        Agent input for the latest message in ``messages``.
+
+        Args:
+            messages: Full chat history, ending with the current user prompt
+
+        Returns:
+            Messages for the agent: an optional summary, recent turns, the prompt
+        """
+        context = []
+        if self.summary:
+            context.append({
+                "role": "system",
+                "content": f"Summary of the earlier conversation:\n{self.summary}"
+            })
+        context.extend(
+            {"role": m["role"], "content": m["content"]}
+            for m in messages[self.window_start(messages):]
+            if _is_context(m)
+        )
+        return context
+
+    def compact(
+        self,
+        messages: List[dict],
+        summarize: Optional[Callable[[str, List[dict], int], str]] = None
+    ) -> bool:
+        """
+        Fold messages that left the verbatim window into the summary.
+
+        Call after each completed turn. ``messages`` is the history that the
+        next prompt will be appended to.
+
+        Args:
+            messages: Full chat history
+            summarize: ``(summary, messages, max_tokens) -> summary``; defaults to ``extractive_summary``
+
+        Returns:
+            True if the summary changed
+        """
+        # Leave room for the next prompt, which will join the window
+        start = self.window_start(messages + [{"role": "user", "content": ""}])
+        evicted = [m for m in messages[self.summarized:start] if _is_context(m)]
+        self.summarized = max(self.summarized, start)
+        if not evicted:
+            return False
+        summarize = summarize or extractive_summary
+        self.summary = summarize(self.summary, evicted, self.summary_max_tokens)
+        logger.info(
+            f"Summarized {len(evicted)} older messages "
+            f"(summary {count_tokens(self.summary)} tokens, {len(messages) - start} kept verbatim)"
+        )
+        return True
+
+    def context_tokens(self, messages: List[dict]) -> int:
+        """Prompt tokens the conversation context costs for the latest message"""
+        return sum(message_tokens(m) for m in self.context(messages))
@@ -0,0 +1,52 @@
+"""
+Tracing hooks for the agent graph
+
+Wraps every model call and tool call of the agent in a span, so a chat
+turn's trace shows how long each LLM round trip and each tool took, plus the
+tokens each model call consumed.
+"""
+from typing import Awaitable, Callable
+
+from langchain.agents.middleware import AgentMiddleware
+from langchain_core.messages import AIMessage
+
+from utils.tracing import get_metrics, span
+
+
+def _record_usage(trace, response) -> None:
+    """Copy token usage from a model response onto the span and the token counters"""
+    messages = getattr(response, "result", None) or [response]
+    usage = {"input_tokens": 0, "output_tokens": 0}
+    for message in messages:
+        if isinstance(message, AIMessage) and message.usage_metadata:
+            for field in usage:
+                usage[field] += message.usage_metadata.get(field, 0)
+
+    trace.set(**usage)
+    metrics = get_metrics()
+    metrics.increment("llm_tokens", usage["input_tokens"], type="input")
+    metrics.increment("llm_tokens", usage["output_tokens"], type="output")
+
+
+class TracingMiddleware(AgentMiddleware):
+    """Record an 'llm.call' span per model call and a 'tool.<name>' span per tool call"""
+
+    def wrap_model_call(self, request, handler: Callable):
+        with span("llm.call") as trace:
+            response = handler(request)
+            _record_usage(trace, response)
+            return response
+
+    async def awrap_model_call(self, request, handler: Callable[..., Awaitable]):
+        with span("llm.call") as trace:
+            response = await handler(request)
+            _record_usage(trace, response)
+            return response
+
+    def wrap_tool_call(self, request, handler: Callable):
+        with span(f"tool.{request.tool_call['name']}"):
+            return handler(request)
+
+    async def awrap_tool_call(self, request, handler: Callable[..., Awaitable]):
+        with span(f"tool.{request.tool_call['name']}"):
+            return await handler(request)
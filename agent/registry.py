@@ -0,0 +1,141 @@
+"""
+Process-wide registry of shared agent resources
+
+Streamlit reruns the script per interaction and keeps a separate
+session_state per browser tab. Everything expensive and read-only (the
+knowledge index, the tool set, the compiled agent graph) lives here instead,
+built once per process and reused by every session.
+"""
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from utils.logger import setup_logger
+from utils.validation import api_key_fingerprint
+
+logger = setup_logger(__name__)
+
+
+@dataclass(frozen=True)
+class AgentBundle:
+    """Compiled agent graph with the tools, vector store and chat model it was built from"""
+    agent: object
+    tools: list
+    vectorstore: object
+    model: object = None
+
+
+class AgentRegistry:
+    """Thread-safe, build-once cache of agent bundles"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._vectorstore = None
+        self._bundles: Dict[str, AgentBundle] = {}
+
+    def get(self, api_key: str) -> AgentBundle:
+        """
+        Return the shared bundle for ``api_key``, building it on first use.
+
+        The knowledge index is loaded once and shared by every key; each
+        distinct API key only adds its own model and embedding clients.
+
+        Args:
+            api_key: OpenAI API key of the calling session
+
+        Returns:
+            AgentBundle shared by all sessions using this key
+        """
+        fingerprint = api_key_fingerprint(api_key)
+
+        bundle = self._bundles.get(fingerprint)
+        if bundle is not None:
+            return bundle
+
+        with self._lock:
+            # Another thread may have finished the build while we waited
+            bundle = self._bundles.get(fingerprint)
+            if bundle is not None:
+                return bundle
+
+            logger.info(f"Building shared agent bundle {fingerprint[:8]}")
+
+            # Deferred: pulls in LangChain, OpenAI clients and the tool modules
+            from agent.agent_setup import (
+                create_chat_model,
+                create_embeddings,
+                create_tools,
+                create_vectorstore,
+                initialize_agent
+            )
+
+            if self._vectorstore is None:
+                self._vectorstore = create_vectorstore(api_key)
+                vectorstore = self._vectorstore
+            else:
+                vectorstore = self._vectorstore.with_embedding(create_embeddings(api_key))
+
+            tools = create_tools(vectorstore)
+            model = create_chat_model(api_key)
+            agent, _ = initialize_agent(api_key, vectorstore=vectorstore, tools=tools, model=model)
+
+            bundle = AgentBundle(agent=agent, tools=tools, vectorstore=vectorstore, model=model)
+            self._bundles[fingerprint] = bundle
+            return bundle
+
+    def refresh_index(self) -> bool:
+        """
+        Bring the shared index up to date with the knowledge base files.
+
+        Changed chunks are embedded and the new index and lexical index are
+        built off to the side; every session's retriever is then swapped over
+        in one step, so in-flight searches are never blocked or torn.
+
+        Returns:
+            True if a new index was swapped in
+        """
+        with self._refresh_lock:
+            current = self._vectorstore
+            if current is None:
+                return False
+
+            from agent.agent_setup import create_engine
+            from config.settings import KB_DIR
+            from data.knowledge_base import load_documents
+            from retrieval.bm25 import BM25Index
+            from retrieval.index_store import load_or_build_index
+
+            index = load_or_build_index(load_documents(KB_DIR), current.engine.embedding)
+            if index.key == current.key:
+                return False
+
+            engine = create_engine(index)
+            bm25 = BM25Index(index.texts)
+
+            with self._lock:
+                current.swap(engine, bm25)
+                for bundle in self._bundles.values():
+                    if bundle.vectorstore is not current:
+                        bundle.vectorstore.swap(
+                            engine.with_embedding(bundle.vectorstore.engine.embedding), bm25
+                        )
+            return True
+
+    def peek(self, api_key: str) -> Optional[AgentBundle]:
+        """Return the bundle for ``api_key`` if it is already built"""
+        return self._bundles.get(api_key_fingerprint(api_key))
+
+    def clear(self) -> None:
+        """Drop all shared resources (next ``get`` rebuilds them)"""
+        with self._lock:
+            self._bundles.clear()
+            self._vectorstore = None
+
+
+_registry = AgentRegistry()
+
+
+def get_registry() -> AgentRegistry:
+    """Return the process-wide agent registry"""
+    return _registry
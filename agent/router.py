@@ -0,0 +1,332 @@
+"""
+Deterministic pre-agent intent router
+
+Well-formed calculator and lookup prompts ("Calculate profit: buy £200,
+sell £450") are parsed here and answered by calling the tool directly,
+saving the agent's tool-selection and answer LLM round-trips. A prompt is
+routed only when one intent accounts for all of it: every word left over
+after the intent's pattern must be filler or a known brand, item or
+condition. Negations, chained requests ("... then ...") and anything
+ambiguous return None and go to the agent as before.
+"""
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from data.guides import get_guide_registry
+from data.price_store import CONDITIONS, get_price_store, normalize_item, normalize_name
+from tools import (
+    calculate_profit,
+    get_price_range,
+    get_platform_tutorial,
+    check_authentication_tips
+)
+from tools.profit_calculator import PLATFORM_FEES
+from utils.logger import setup_logger
+from utils.tracing import get_metrics
+
+logger = setup_logger(__name__)
+
+# Prompts longer than this are assumed to carry more than one request
+ROUTER_MAX_PROMPT_LENGTH = 160
+# Agent latency assumed before any real agent turn has been measured
+DEFAULT_AGENT_LATENCY = 4.0
+
+# Words that carry no request of their own
+_FILLER = frozenset(
+    "a an the my i me you we it its this that these those is are was be do does did would will can could should "
+    "how much what whats s of for on at in to with from if and or my please show give get "
+    "item items piece pieces pair condition".split()
+)
+# Negations and chained requests the patterns can't represent
+_HANDOFF = re.compile(
+    r"\b(?:not|never|no|without|except|unless|instead|then|also|plus|afterwards|as well|"
+    r"dont|doesnt|isnt|arent|wont|cant|shouldnt)\b|n't\b|[;]|[?!.]\s+[a-z]",
+    re.I
+)
+
+_AMOUNT = r"£?\s*(\d+(?:,\d+)*(?:\.\d+)?)"
+_THOUSANDS = re.compile(r"\d{1,3}(?:,\d{3})+(?:\.\d+)?")
+_DECIMAL_COMMA = re.compile(r"\d+,\d{1,2}")
+_BUY = re.compile(r"\b(?:buy|buying|bought|purchase[ds]?|paid)\b\D{0,20}?" + _AMOUNT, re.I)
+_SELL = re.compile(r"\b(?:sell|selling|sold|resell|list(?:ed)?)\b\D{0,20}?" + _AMOUNT, re.I)
+_SHIPPING = re.compile(r"\b(?:shipping|postage|delivery)\b\D{0,12}?" + _AMOUNT, re.I)
+_PROFIT_WORDS = re.compile(r"\b(?:profit|margin|roi|calculate|worth it)\b", re.I)
+_PLATFORM = re.compile(r"\b(" + "|".join(PLATFORM_FEES) + r")\b", re.I)
+
+_PRICE_QUESTION = re.compile(
+    r"^(?:what|how much)\s+(?:do|does|are|is|would|will|can)\s+(?:an?\s+|the\s+)?(.+?)\s+"
+    r"(?:sell|go|going|resell|worth|fetch|cost)\b(.*)$",
+    re.I
+)
+_PRICE_RANGE = re.compile(
+    r"^(.*?)\b(?:price|prices|price range|resale value|value)\s+(?:of|for)\s+(.+?)[?.!]*$",
+    re.I
+)
+
+_AUTHENTICATE = re.compile(
+    r"^(?:how\s+(?:do|can|should)\s+(?:i|you|we)\s+)?(?:authenticate|legit[- ]check)\s+(?:an?\s+|my\s+)?(.+?)[?.!]*$",
+    re.I
+)
+_AUTH_TIPS = re.compile(r"^(?:show\s+me\s+)?authentication\s+(?:tips|guide|checklist)(?:\s+for\s+(.+?))?[?.!]*$", re.I)
+_AUTH_MAX_BRAND_WORDS = 4
+
+_TUTORIAL = re.compile(
+    r"^(?:show\s+me\s+|give\s+me\s+|i\s+want\s+)?(?:the\s+|a\s+)?(?:complete\s+|full\s+|platform\s+)?tutorial"
+    r"(?:\s+(?:for|on|about)\s+(?:the\s+)?(\w+)(?:\s+step)?)?[?.!]*$",
+    re.I
+)
+
+
+@dataclass(frozen=True)
+class RouterResult:
+    """A prompt answered without the agent"""
+    intent: str
+    tool: str
+    response: str
+    elapsed: float
+
+
+def _amount(text: str) -> Optional[float]:
+    """
+    Parse a money amount, reading ",ddd" groups as thousands separators and a
+    single comma followed by one or two digits as a decimal point.
+
+    Returns:
+        The amount, or None when the commas are ambiguous (left to the agent)
+
+    Examples:
+        >>> _amount("1,200"), _amount("2,000.50"), _amount("12,5"), _amount("1,2345")
+        (1200.0, 2000.5, 12.5, None)
+    """
+    if "," not in text:
+        return float(text)
+    if _THOUSANDS.fullmatch(text):
+        return float(text.replace(",", ""))
+    if _DECIMAL_COMMA.fullmatch(text):
+        return float(text.replace(",", "."))
+    return None
+
+
+def _words(text: str) -> List[str]:
+    return normalize_name(text).split()
+
+
+def _is_filler(text: str, vocabulary=frozenset()) -> bool:
+    """Whether every word of ``text`` is filler, a condition, a platform or in ``vocabulary``"""
+    for word in _words(text):
+        if word in _FILLER or word in CONDITIONS or word in PLATFORM_FEES:
+            continue
+        if word in vocabulary or normalize_item(word) in vocabulary:
+            continue
+        return False
+    return True
+
+
+def _parse_profit(prompt: str) -> Optional[Dict]:
+    """
+    Examples:
+        >>> _parse_profit("Calculate profit: buy £1,200, sell £2,000")
+        {'purchase_price': 1200.0, 'selling_price': 2000.0}
+    """
+    buys = _BUY.findall(prompt)
+    sells = _SELL.findall(prompt)
+    if len(buys) != 1 or len(sells) != 1:
+        return None
+    if not _PROFIT_WORDS.search(prompt) and not re.search(r"\bbuy\b.*\bsell\b", prompt, re.I):
+        return None
+    rest = prompt
+    for pattern in (_BUY, _SELL, _SHIPPING, _PROFIT_WORDS, _PLATFORM):
+        rest = pattern.sub(" ", rest)
+    if not _is_filler(rest, get_price_store().vocabulary):
+        return None
+
+    args = {"purchase_price": _amount(buys[0]), "selling_price": _amount(sells[0])}
+    if None in args.values():
+        return None
+
+    platforms = {p.lower() for p in _PLATFORM.findall(prompt)}
+    if len(platforms) > 1:
+        return None
+    if platforms:
+        args["platform"] = platforms.pop()
+
+    shipping = _SHIPPING.findall(prompt)
+    if len(shipping) > 1:
+        return None
+    if shipping:
+        args["shipping_cost"] = _amount(shipping[0])
+        if args["shipping_cost"] is None:
+            return None
+    return args
+
+
+def _parse_price_range(prompt: str) -> Optional[Dict]:
+    store = get_price_store()
+    match = _PRICE_QUESTION.search(prompt)
+    if match:
+        phrase, rest = match.group(1), match.group(2)
+    else:
+        match = _PRICE_RANGE.search(prompt)
+        if not match:
+            return None
+        rest, phrase = match.group(1), match.group(2)
+    if not _is_filler(rest):
+        return None
+
+    # Imported here so importing the router doesn't load the sales store
+    from data.sales_store import get_sales_store
+
+    sales = get_sales_store()
+    brand = store.resolve_brand(phrase) or sales.resolve_brand(phrase)
+    item_type = store.resolve_item(phrase) or sales.resolve_item(phrase)
+    if brand is None or item_type is None:
+        return None
+    # Sales-only brands aren't in the price store vocabulary
+    if not _is_filler(phrase, store.vocabulary | frozenset(_words(brand))):
+        return None
+
+    args = {"brand": brand, "item_type": item_type}
+    conditions = [c for c in CONDITIONS if re.search(rf"\b{c}\b", prompt, re.I)]
+    if len(conditions) == 1:
+        args["condition"] = conditions[0]
+    return args
+
+
+def _parse_authentication(prompt: str) -> Optional[Dict]:
+    match = _AUTHENTICATE.search(prompt) or _AUTH_TIPS.search(prompt)
+    if not match:
+        return None
+    brand = (match.group(1) or "general").strip()
+    if len(brand.split()) > _AUTH_MAX_BRAND_WORDS:
+        return None
+    if match.group(1):
+        # Only known brands or items: "authenticate my account" isn't about clothing
+        guides = get_guide_registry()
+        store = get_price_store()
+        known = guides.match_brands(brand) or store.resolve_brand(brand) or store.resolve_item(brand)
+        if not known or not _is_filler(brand, guides.vocabulary | store.vocabulary):
+            return None
+    return {"brand": brand}
+
+
+def _parse_tutorial(prompt: str) -> Optional[Dict]:
+    match = _TUTORIAL.search(prompt)
+    if not match:
+        return None
+    return {"step": (match.group(1) or "overview").lower()}
+
+
+# intent -> (parser, tool)
+_INTENTS: List[Tuple[str, Callable[[str], Optional[Dict]], object]] = [
+    ("profit", _parse_profit, calculate_profit),
+    ("price_range", _parse_price_range, get_price_range),
+    ("authentication", _parse_authentication, check_authentication_tips),
+    ("tutorial", _parse_tutorial, get_platform_tutorial)
+]
+
+
+class IntentRouter:
+    """Parses well-formed tool requests and answers them without the agent"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hits = 0
+        self.hits_by_intent: Dict[str, int] = {name: 0 for name, _, _ in _INTENTS}
+        self.time_saved = 0.0
+        self._agent_latency = None
+
+    def route(self, prompt: str) -> Optional[RouterResult]:
+        """
+        Answer ``prompt`` directly if exactly one intent parses cleanly.
+
+        Args:
+            prompt: Sanitized user prompt
+
+        Returns:
+            RouterResult, or None to fall back to the agent
+        """
+        start = time.perf_counter()
+        result = None
+
+        matches = self._matches(prompt)
+        if len(matches) == 1:
+            name, tool, args = matches[0]
+            response = tool.invoke(args)
+            result = RouterResult(name, tool.name, response, time.perf_counter() - start)
+
+        self._record(result)
+        return result
+
+    def can_route(self, prompt: str) -> bool:
+        """Whether ``route`` would answer ``prompt`` (no tool call, no stats recorded)"""
+        return len(self._matches(prompt)) == 1
+
+    def _matches(self, prompt: str) -> list:
+        if len(prompt) > ROUTER_MAX_PROMPT_LENGTH or _HANDOFF.search(prompt):
+            return []
+        matches = []
+        for name, parser, tool in _INTENTS:
+            args = parser(prompt.strip())
+            if args is not None:
+                matches.append((name, tool, args))
+        return matches
+
+    def record_agent_latency(self, seconds: float) -> None:
+        """Feed measured agent turn latencies into the time-saved estimate"""
+        with self._lock:
+            if self._agent_latency is None:
+                self._agent_latency = seconds
+            else:
+                self._agent_latency = 0.8 * self._agent_latency + 0.2 * seconds
+
+    def _record(self, result: Optional[RouterResult]) -> None:
+        # Counted as metrics too: the log lines below are sampled (LOG_SAMPLE_RATES)
+        metrics = get_metrics()
+        if result is None:
+            metrics.increment("router_requests", outcome="miss", intent="none")
+        else:
+            metrics.increment("router_requests", outcome="hit", intent=result.intent)
+        with self._lock:
+            self.requests += 1
+            if result is None:
+                logger.info(f"Router miss, using agent (hit rate {self.hit_rate:.0%})")
+                return
+            self.hits += 1
+            self.hits_by_intent[result.intent] += 1
+            agent_latency = self._agent_latency or DEFAULT_AGENT_LATENCY
+            saved = max(0.0, agent_latency - result.elapsed)
+            self.time_saved += saved
+        metrics.increment("router_time_saved_seconds", saved)
+
+        logger.info(
+            f"Router hit: intent={result.intent}, tool={result.tool}, "
+            f"{result.elapsed * 1000:.1f}ms, saved ~{saved * 1000:.0f}ms, "
+            f"hit rate {self.hit_rate:.0%} ({self.hits}/{self.requests})"
+        )
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.requests if self.requests else 0.0
+
+    def stats(self) -> Dict:
+        """Hit rate and estimated latency saved"""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hits": self.hits,
+                "hit_rate": self.hit_rate,
+                "hits_by_intent": dict(self.hits_by_intent),
+                "time_saved_seconds": self.time_saved
+            }
+
+
+_router = IntentRouter()
+
+
+def get_router() -> IntentRouter:
+    """Return the process-wide intent router"""
+    return _router
@@ -0,0 +1,176 @@
+"""
+One chat turn, shared by the Streamlit app and the HTTP API
+
+A turn tries the deterministic fast-path router, then the answer cache (for
+turns that don't depend on earlier ones), and otherwise streams the agent
+over the bounded conversation context. Identical context-free turns that
+arrive while one is already running wait for its answer instead of running
+the agent again. Every path ends with a single 'done' StreamEvent whose
+``source`` says which one answered ('router', 'cache', 'coalesced' or 'agent').
+"""
+import asyncio
+import time
+from typing import AsyncIterator, Iterator, List, Optional
+
+from agent.answer_cache import get_answer_cache, start_warm_up
+from agent.history import ConversationMemory, model_summarizer
+from agent.router import get_router
+from agent.streaming import StreamEvent, astream_agent, iter_agent_events
+from config.settings import ANSWER_CACHE_WARM_UP, EXAMPLE_QUESTIONS
+from utils.logger import setup_logger
+from utils.single_flight import Flight, FlightAborted, SingleFlight
+from utils.tracing import current_span, span
+
+logger = setup_logger(__name__)
+
+_turns = SingleFlight("agent_turn")
+
+
+def warm_up(bundle) -> None:
+    """Precompute the example answers for ``bundle``'s index (once per version)"""
+    if ANSWER_CACHE_WARM_UP:
+        # Routed examples are answered instantly anyway
+        start_warm_up(bundle.agent, bundle.vectorstore.key, EXAMPLE_QUESTIONS, skip=get_router().can_route)
+
+
+def _fast_answer(bundle, prompt: str, context_free: bool) -> Optional[StreamEvent]:
+    with span("router.route"):
+        routed = get_router().route(prompt)
+    if routed is not None:
+        return StreamEvent("done", text=routed.response, source="router")
+
+    if context_free:
+        with span("answer_cache.lookup") as lookup:
+            cached = get_answer_cache().get(prompt, bundle.vectorstore.key)
+            lookup.set(hit=cached.match if cached else "miss")
+        if cached is not None:
+            logger.info(f"Answer cache {cached.match} hit")
+            return StreamEvent("done", text=cached.answer, source="cache")
+    return None
+
+
+def _prepare(messages: List[dict], memory: ConversationMemory):
+    context = memory.context(messages)
+    # Cached answers only stand in for turns without earlier context
+    context_free = len(context) == 1
+    current_span().set(context_messages=len(context))
+    return messages[-1]["content"], context, context_free
+
+
+def _record(bundle, prompt: str, answer: str, context_free: bool, elapsed: float) -> None:
+    get_router().record_agent_latency(elapsed)
+    if context_free:
+        get_answer_cache().put(prompt, answer, bundle.vectorstore.key)
+
+
+def _turn_key(bundle, prompt: str) -> str:
+    # Same identity as the answer cache: normalized prompt, model, temperature, index version
+    return get_answer_cache().key(prompt, bundle.vectorstore.key)
+
+
+def _agent_events(bundle, prompt: str, context, context_free: bool, flight: Flight = None) -> Iterator[StreamEvent]:
+    start = time.perf_counter()
+    for event in iter_agent_events(bundle.agent, context):
+        if event.kind == "done":
+            _record(bundle, prompt, event.text, context_free, time.perf_counter() - start)
+            if flight is not None:
+                flight.resolve(event.text)
+        yield event
+
+
+async def _aagent_events(
+    bundle, prompt: str, context, context_free: bool, flight: Flight = None
+) -> AsyncIterator[StreamEvent]:
+    start = time.perf_counter()
+    async for event in astream_agent(bundle.agent, context):
+        if event.kind == "done":
+            _record(bundle, prompt, event.text, context_free, time.perf_counter() - start)
+            if flight is not None:
+                flight.resolve(event.text)
+        yield event
+
+
+def stream_turn(bundle, messages: List[dict], memory: ConversationMemory) -> Iterator[StreamEvent]:
+    """
+    Answer the last message of ``messages``.
+
+    Args:
+        bundle: AgentBundle to answer with
+        messages: Chat history ending with the user's prompt
+        memory: Conversation memory of this chat
+
+    Yields:
+        StreamEvents, ending with one 'done' event
+    """
+    prompt, context, context_free = _prepare(messages, memory)
+    fast = _fast_answer(bundle, prompt, context_free)
+    if fast is not None:
+        yield fast
+        return
+
+    while context_free:
+        with _turns.join(_turn_key(bundle, prompt)) as flight:
+            if flight.leader:
+                yield from _agent_events(bundle, prompt, context, context_free, flight)
+                return
+            try:
+                with span("agent_turn.coalesced"):
+                    answer = flight.wait()
+            except FlightAborted:
+                continue
+            except TimeoutError:
+                # The leader is stuck; answer this turn independently
+                _turns._timed_out()
+                break
+        yield StreamEvent("done", text=answer, source="coalesced")
+        return
+
+    yield from _agent_events(bundle, prompt, context, context_free)
+
+
+async def astream_turn(bundle, messages: List[dict], memory: ConversationMemory) -> AsyncIterator[StreamEvent]:
+    """Async counterpart of ``stream_turn``, running the agent on the caller's event loop"""
+    prompt, context, context_free = _prepare(messages, memory)
+    # Router tools and the cache are synchronous; keep them off the event loop
+    fast = await asyncio.to_thread(_fast_answer, bundle, prompt, context_free)
+    if fast is not None:
+        yield fast
+        return
+
+    while context_free:
+        with _turns.join(_turn_key(bundle, prompt)) as flight:
+            if flight.leader:
+                async for event in _aagent_events(bundle, prompt, context, context_free, flight):
+                    yield event
+                return
+            try:
+                with span("agent_turn.coalesced"):
+                    answer = await flight.wait_async()
+            except FlightAborted:
+                continue
+            except TimeoutError:
+                # The leader is stuck; answer this turn independently
+                _turns._timed_out()
+                break
+        yield StreamEvent("done", text=answer, source="coalesced")
+        return
+
+    async for event in _aagent_events(bundle, prompt, context, context_free):
+        yield event
+
+
+def finish_turn(bundle, messages: List[dict], memory: ConversationMemory) -> bool:
+    """
+    Fold turns that left the verbatim window into the rolling summary.
+
+    Args:
+        bundle: AgentBundle whose chat model writes the summary
+        messages: Chat history including the answer just given
+        memory: Conversation memory of this chat
+
+    Returns:
+        True if the summary changed
+    """
+    with span("history.compact"):
+        summarizer = model_summarizer(bundle.model) if bundle.model is not None else None
+        return memory.compact(messages, summarizer)
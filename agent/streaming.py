@@ -0,0 +1,130 @@
+"""
+Incremental agent output for chat front-ends
+
+Turns the agent's message/update streams into a flat sequence of events the
+UI can render as they arrive: answer tokens and tool-call progress.
+"""
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterator, List, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
+
+from agent.async_runner import get_agent_loop
+from config.settings import AGENT_EXECUTION_MODE
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+STREAM_MODES = ["messages", "updates"]
+
+
+@dataclass(frozen=True)
+class StreamEvent:
+    """
+    One unit of streamed agent output.
+
+    kind is one of:
+        'token'      - text is the next piece of the answer
+        'tool_start' - tool is being called
+        'tool_end'   - tool returned
+        'done'       - text is the complete final answer; source says what
+                       produced it ('agent', 'router' or 'cache') when known
+    """
+    kind: str
+    text: str = ""
+    tool: Optional[str] = None
+    source: Optional[str] = None
+
+
+class _EventTranslator:
+    """Maps (stream_mode, data) pairs from the agent graph to StreamEvents"""
+
+    def __init__(self):
+        self.answer = ""
+        self._tools_ran = False
+        self._announced = set()
+        # Model turn counter; tool-call chunk indexes restart at 0 every turn
+        self._turn = 0
+        self._turn_ended = False
+
+    def feed(self, mode: str, data) -> List[StreamEvent]:
+        events = []
+
+        if mode == "messages":
+            chunk, _ = data
+            if not isinstance(chunk, AIMessage):
+                return events
+            if self._turn_ended:
+                self._turn += 1
+                self._turn_ended = False
+
+            # Non-streaming models emit one complete AIMessage instead of chunks
+            calls = chunk.tool_call_chunks if isinstance(chunk, AIMessageChunk) else chunk.tool_calls
+            for call in calls or []:
+                key = call.get("id") or (self._turn, call.get("index"))
+                if call.get("name") and key not in self._announced:
+                    self._announced.add(key)
+                    events.append(StreamEvent("tool_start", tool=call["name"]))
+
+            text = chunk.text if isinstance(chunk.text, str) else chunk.text()
+            if text:
+                if self._tools_ran:
+                    # A new model turn after tool results: restart the answer
+                    self.answer = ""
+                    self._tools_ran = False
+                self.answer += text
+                events.append(StreamEvent("token", text=text))
+
+        elif mode == "updates":
+            for update in data.values():
+                if not isinstance(update, dict):
+                    continue
+                for message in update.get("messages", []):
+                    if isinstance(message, ToolMessage):
+                        self._tools_ran = True
+                        self._turn_ended = True
+                        events.append(StreamEvent("tool_end", tool=message.name))
+
+        return events
+
+
+def stream_agent(agent, messages: list) -> Iterator[StreamEvent]:
+    """
+    Run the agent and yield tokens and tool progress as they happen.
+
+    Text written by the model before it decides to call tools is dropped
+    from the final answer, matching the non-streaming behaviour of showing
+    only the last model message.
+
+    Args:
+        agent: Compiled agent graph from ``initialize_agent``
+        messages: Input messages, e.g. [{"role": "user", "content": "..."}]
+
+    Yields:
+        StreamEvent instances, ending with a single 'done' event
+    """
+    translator = _EventTranslator()
+    for mode, data in agent.stream({"messages": messages}, stream_mode=STREAM_MODES):
+        yield from translator.feed(mode, data)
+    yield StreamEvent("done", text=translator.answer, source="agent")
+
+
+async def astream_agent(agent, messages: list) -> AsyncIterator[StreamEvent]:
+    """
+    Async counterpart of ``stream_agent``.
+
+    Under ``astream`` the tool node awaits all tool calls of a model turn
+    concurrently, so a multi-tool turn costs about the slowest tool.
+    """
+    translator = _EventTranslator()
+    async for mode, data in agent.astream({"messages": messages}, stream_mode=STREAM_MODES):
+        for event in translator.feed(mode, data):
+            yield event
+    yield StreamEvent("done", text=translator.answer, source="agent")
+
+
+def iter_agent_events(agent, messages: list) -> Iterator[StreamEvent]:
+    """Stream agent events using the configured execution mode"""
+    if AGENT_EXECUTION_MODE == "async":
+        return get_agent_loop().iterate(astream_agent(agent, messages))
+    return stream_agent(agent, messages)
@@ -1,34 +1,45 @@
 """
 GrabyAI Platform Assistant - Main Streamlit Application
 """
+import uuid
+
 import streamlit as st
-import os
 
 from config.settings import (
     PLATFORM_NAME, 
     SUPPORT_EMAIL, 
     RATE_LIMIT_REQUESTS, 
-    RATE_LIMIT_WINDOW
+    RATE_LIMIT_WINDOW,
+    METRICS_PORT,
+    KB_WATCH,
+    EXAMPLE_QUESTIONS,
+    CHAT_RENDER_WINDOW,
+    API_BASE_URL
 )
 from utils.validation import validate_api_key, sanitize_input
-from utils.rate_limiter import RateLimiter
-from utils.logger import setup_logger
-from agent.agent_setup import initialize_agent
+from utils.rate_limiter import RateLimiter, limiter_key
+from utils.logger import setup_logger, set_request_id
+from utils.tracing import FirstTokenTimer, get_metrics, span, start_metrics_server, tracing_enabled
 
 # Setup
 logger = setup_logger(__name__)
 
+if METRICS_PORT:
+    start_metrics_server(METRICS_PORT)
+
 st.set_page_config(
     page_title=f"{PLATFORM_NAME} Assistant", page_icon="𖣐", layout="wide"
 )
 
-# Initialize session state
+# Initialize session state (per-user only; the agent is shared process-wide)
 if "messages" not in st.session_state:
     st.session_state.messages = []
-if "agent" not in st.session_state:
-    st.session_state.agent = None
-if "rate_limiter" not in st.session_state:
-    st.session_state.rate_limiter = RateLimiter()
+if "api_key" not in st.session_state:
+    st.session_state.api_key = None
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+if "render_limit" not in st.session_state:
+    st.session_state.render_limit = CHAT_RENDER_WINDOW
 
 # Sidebar
 with st.sidebar:
@@ -38,9 +49,11 @@ with st.sidebar:
     if api_key:
         if not validate_api_key(api_key):
             st.error("Invalid API key format")
-        else:
-            os.environ["OPENAI_API_KEY"] = api_key
+        elif api_key != st.session_state.api_key:
+            st.session_state.api_key = api_key
             logger.info("API key configured")
+    else:
+        st.session_state.api_key = None
 
     st.markdown("---")
     st.markdown("### Get Expert Help")
@@ -54,9 +67,62 @@ with st.sidebar:
 
     st.markdown("---")
     st.markdown("### Usage Stats")
-    rate_limiter = st.session_state.rate_limiter
-    st.metric("Total Queries", rate_limiter.get_total())
-    st.metric("Remaining", f"{rate_limiter.get_remaining()}/{RATE_LIMIT_REQUESTS}")
+    if API_BASE_URL:
+        # The API server counts and limits requests; show its numbers for this key
+        usage = None
+        if st.session_state.api_key:
+            from server.client import AssistantClient
+
+            try:
+                usage = AssistantClient(st.session_state.api_key, API_BASE_URL).usage()
+            except Exception as e:
+                logger.warning(f"Could not fetch usage from the API: {str(e)}")
+        # Without a server-side limit nothing is counted, so there is nothing to show
+        if usage and usage["limit"] is not None:
+            st.metric("Total Queries", usage["total"])
+            st.metric("Remaining", f"{usage['remaining']}/{usage['limit']}")
+    else:
+        # Quota is tracked per API key in a shared backend, so new tabs don't reset it
+        rate_limiter = RateLimiter(limiter_key(st.session_state.api_key, st.session_state.session_id))
+        st.metric("Total Queries", rate_limiter.get_total())
+        st.metric("Remaining", f"{rate_limiter.get_remaining()}/{RATE_LIMIT_REQUESTS}")
+    ttft_metric = st.empty()
+    if "last_ttft" in st.session_state:
+        ttft_metric.metric("Time to First Token", f"{st.session_state.last_ttft:.2f}s")
+
+    latency_rows = get_metrics().percentiles() if tracing_enabled() else []
+    if latency_rows:
+        with st.expander("Latency (ms)"):
+            st.dataframe(
+                [
+                    {
+                        "Span": row["span"],
+                        "Count": row["count"],
+                        "p50": round(row["p50_ms"], 1),
+                        "p95": round(row["p95_ms"], 1),
+                        "p99": round(row["p99_ms"], 1)
+                    }
+                    for row in latency_rows
+                ],
+                hide_index=True
+            )
+            # Spans exist only after the agent ran, so the HTTP layer is already imported
+            from utils.http_client import pool_stats
+            from utils.single_flight import single_flight_stats
+
+            pool = pool_stats()
+            st.caption(
+                f"HTTP pool: {pool['active']} active, {pool['idle']}/{pool['open']} idle, "
+                f"{pool['waits']} waits, {pool['requests']} requests"
+            )
+            saved = sum(group["saved"] for group in single_flight_stats().values())
+            st.caption(f"Coalesced duplicate requests: {saved} upstream calls saved")
+            st.download_button(
+                "Export Prometheus metrics",
+                get_metrics().to_prometheus(),
+                file_name="grabyai_metrics.prom",
+                mime="text/plain"
+            )
 
     st.markdown("---")
     st.markdown(f"### About {PLATFORM_NAME}")
@@ -76,43 +142,143 @@ st.title(f"𖣐 {PLATFORM_NAME} Platform Assistant")
 st.markdown("Your guide to designer resale success")
 
 # Check API key
+api_key = st.session_state.api_key
 if not api_key:
     st.warning("Please enter your OpenAI API key in the sidebar")
     st.info("This is a demo for Turing College. In production, keys are managed server-side.")
     st.stop()
 
-# Initialize agent
-try:
-    if st.session_state.agent is None:
-        with st.spinner("Initializing assistant..."):
-            agent, vectorstore = initialize_agent(api_key)
-            st.session_state.agent = agent
-            st.session_state.vectorstore = vectorstore
-        st.success("Assistant is now ready.")
-        logger.info("Agent initialized")
-except Exception as e:
-    st.error(f"Error initializing assistant: {str(e)}")
-    logger.error(f"Initialization error: {str(e)}")
+# Imported only once a key is set, so the landing page doesn't pay for LangChain
+if API_BASE_URL:
+    # Thin client: the API server runs the agent, tools, knowledge index and memory
+    from server.client import AssistantAPIError, AssistantClient, ConversationState
+
+    if "memory" not in st.session_state:
+        st.session_state.memory = ConversationState()
+    memory = st.session_state.memory
+    api_client = AssistantClient(api_key, API_BASE_URL)
+else:
+    from agent.history import ConversationMemory
+    from agent.registry import get_registry
+    from agent.service import finish_turn, stream_turn, warm_up
+
+    if "memory" not in st.session_state:
+        st.session_state.memory = ConversationMemory()
+    memory = st.session_state.memory
+
+    # Get the shared agent (built once per process, reused by every session)
+    try:
+        registry = get_registry()
+        if registry.peek(api_key) is None:
+            with st.spinner("Initializing assistant..."):
+                registry.get(api_key)
+            st.success("Assistant is now ready.")
+            logger.info("Agent initialized")
+        bundle = registry.get(api_key)
+        if KB_WATCH:
+            from retrieval.watcher import start_kb_watcher
+
+            start_kb_watcher(registry.refresh_index)
+    except Exception as e:
+        st.error(f"Error initializing assistant: {str(e)}")
+        logger.error(f"Initialization error: {str(e)}")
+        st.stop()
+
+    warm_up(bundle)
+
+TOOL_STATUS = {
+    "search_knowledge_base": "Searching the platform guide...",
+    "calculate_profit": "Calculating profit...",
+    "calculate_batch_profit": "Ranking your items...",
+    "get_price_range": "Looking up resale prices...",
+    "get_platform_tutorial": "Opening the tutorial...",
+    "check_authentication_tips": "Fetching authentication tips..."
+}
+
+
+def turn_events():
+    """Events of the current turn, from the API server or the in-process agent"""
+    if API_BASE_URL:
+        return api_client.stream_chat(st.session_state.messages, memory)
+    return stream_turn(bundle, st.session_state.messages, memory)
+
+
+def render_response() -> str:
+    """
+    Answer the last user message inside the current chat message, streaming tokens as they arrive.
+
+    The router, answer cache and agent (with the bounded conversation context)
+    are tried in that order, in process or on the API server.
+    Records time-to-first-token for the sidebar.
+    """
+    timer = FirstTokenTimer()
+    status_area = st.empty()
+    answer_area = st.empty()
+    status_lines = []
+    response_text = ""
+
+    with st.spinner("Thinking..."):
+        for event in turn_events():
+            if event.kind in ("token", "done") and timer.first_token is None:
+                timer.mark()
+                ttft_metric.metric("Time to First Token", f"{timer.first_token:.2f}s")
+            if event.kind == "tool_start":
+                status_lines.append(TOOL_STATUS.get(event.tool, f"Running {event.tool}..."))
+                status_area.caption("  \n".join(status_lines))
+            elif event.kind == "token":
+                response_text += event.text
+                answer_area.markdown(response_text + "▌")
+            elif event.kind == "done":
+                response_text = event.text
+                if event.source != "agent":
+                    logger.info(f"Answered by {event.source}")
+
+    answer_area.markdown(response_text)
+    if timer.first_token is not None:
+        st.session_state.last_ttft = timer.first_token
+        logger.info(f"Time to first token: {timer.first_token:.2f}s, total {timer.elapsed:.2f}s")
+    return response_text
+
+def show_rate_limit() -> None:
+    st.error(f"""
+    ⚠️ **Rate Limit Reached**
+    
+    You've exceeded {RATE_LIMIT_REQUESTS} requests in {RATE_LIMIT_WINDOW} seconds.
+    Please wait before sending more messages.
+    """)
+    logger.warning("Rate limit exceeded")
     st.stop()
 
-# Display chat history
-for message in st.session_state.messages:
+
+def show_older_messages() -> None:
+    st.session_state.render_limit += CHAT_RENDER_WINDOW
+
+
+# Display chat history (only a window of recent messages, so reruns stay cheap)
+history = st.session_state.messages
+hidden = max(0, len(history) - st.session_state.render_limit)
+if hidden:
+    st.button(
+        f"Show older messages ({hidden} hidden)",
+        on_click=show_older_messages,
+        key="show_older"
+    )
+for message in history[hidden:]:
     with st.chat_message(message["role"]):
         st.markdown(message["content"])
 
-# Chat input
-if prompt := st.chat_input("Ask about GrabyAI, authentication, pricing..."):
-
-    # Rate limiting
-    if not st.session_state.rate_limiter.check_limit():
-        st.error(f"""
-        ⚠️ **Rate Limit Reached**
-        
-        You've exceeded {RATE_LIMIT_REQUESTS} requests in {RATE_LIMIT_WINDOW} seconds.
-        Please wait before sending more messages.
-        """)
-        logger.warning("Rate limit exceeded")
-        st.stop()
+# Chat input (sidebar example buttons queue their question here too)
+prompt = st.chat_input("Ask about GrabyAI, authentication, pricing...")
+if not prompt:
+    prompt = st.session_state.pop("pending_prompt", None)
+
+if prompt:
+    # Tag every log record of this chat turn, including tool calls on the agent loop
+    set_request_id()
+
+    # Rate limiting (the API server enforces its own limit per key)
+    if not API_BASE_URL and not rate_limiter.check_limit():
+        show_rate_limit()
 
     # Sanitize input
     prompt = sanitize_input(prompt)
@@ -130,67 +296,41 @@ if prompt := st.chat_input("Ask about GrabyAI, authentication, pricing..."):
 
     # Get response
     with st.chat_message("assistant"):
-        with st.spinner("Thinking..."):
-            try:
-                response_text = ""
-                for event in st.session_state.agent.stream(
-                    {"messages": [{"role": "user", "content": prompt}]},
-                    stream_mode="values"
-                ):
-                    last_message = event["messages"][-1]
-                    if hasattr(last_message, 'content') and last_message.content:
-                        response_text = last_message.content
-
-                logger.info("Response generated successfully")
-                st.markdown(response_text)
-                st.session_state.messages.append({
-                    "role": "assistant", 
-                    "content": response_text
-                })
+        try:
+            with span("chat.turn"):
+                response_text = render_response()
 
-            except Exception as e:
-                error_msg = "Error processing request. Please try again."
-                logger.error(f"Response error: {str(e)}")
-                st.error(error_msg)
-                st.session_state.messages.append({
-                    "role": "assistant", 
-                    "content": error_msg
-                })
+            logger.info("Response generated successfully")
+            st.session_state.messages.append({
+                "role": "assistant", 
+                "content": response_text
+            })
+
+            # Fold turns that left the verbatim window into the rolling summary
+            # (the API server does this itself and returns the new summary)
+            if not API_BASE_URL:
+                finish_turn(bundle, st.session_state.messages, memory)
+
+        except Exception as e:
+            if API_BASE_URL and isinstance(e, AssistantAPIError) and e.status_code == 429:
+                st.session_state.messages.pop()
+                show_rate_limit()
+            error_msg = "Error processing request. Please try again."
+            logger.error(f"Response error: {str(e)}")
+            st.error(error_msg)
+            st.session_state.messages.append({
+                "role": "assistant", 
+                "content": error_msg,
+                "error": True
+            })
 
 # Sidebar examples
 with st.sidebar:
     st.markdown("---")
     st.markdown("### Example Questions")
 
-    examples = [
-        "How does Graby AI work?",
-        "How do I authenticate Margiela?",
-        "Calculate profit: buy £200, sell £450",
-        "What do Rick Owens jackets sell for?",
-        "Tips for listing photos?",
-    ]
-
-    for example in examples:
+    for example in EXAMPLE_QUESTIONS:
         if st.button(example, key=example, use_container_width=True):
-            # Add to messages
-            st.session_state.messages.append({"role": "user", "content": example})
-
-            # Trigger response immediately
-            with st.spinner("Thinking..."):
-                try:
-                    response_text = ""
-                    for event in st.session_state.agent.stream(
-                        {"messages": [{"role": "user", "content": example}]},
-                        stream_mode="values",
-                    ):
-                        last_message = event["messages"][-1]
-                        if hasattr(last_message, "content") and last_message.content:
-                            response_text = last_message.content
-
-                    st.session_state.messages.append(
-                        {"role": "assistant", "content": response_text}
-                    )
-                except Exception as e:
-                    logger.error(f"Error: {str(e)}")
-
-            st.rerun()  # This makes it show immediately
+            # Answer through the same streaming path as the chat input
+            st.session_state.pending_prompt = example
+            st.rerun()
@@ -0,0 +1,136 @@
+"""
+HTTP connection pooling benchmark against the local OpenAI stub
+
+Sends chat completions and embeddings through the real LangChain clients to
+benchmarks.stub_openai, comparing a fresh HTTP client per session (new TCP
+connection each time, as when every session builds its own clients) with
+the shared keep-alive pool from utils.http_client. Reports latency, TCP
+connections the server accepted and the pool stats (active, idle, waits).
+
+Usage:
+    python -m benchmarks.bench_http_pool [--requests 300] [--concurrency 8] [--latency-ms 5]
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+from benchmarks.stub_openai import StubOpenAIServer
+from benchmarks.suite import _percentiles
+from config.settings import EMBEDDING_MODEL, MODEL_NAME
+from utils.http_client import get_http_client, get_shared_async_client, pool_stats
+
+
+def _clients(server: StubOpenAIServer, http_client=None, http_async_client=None):
+    from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+
+    common = {"api_key": "sk-stub", "base_url": server.base_url, "max_retries": 0}
+    chat = ChatOpenAI(model=MODEL_NAME, http_client=http_client, http_async_client=http_async_client, **common)
+    embeddings = OpenAIEmbeddings(
+        model=EMBEDDING_MODEL,
+        check_embedding_ctx_length=False,
+        http_client=http_client,
+        http_async_client=http_async_client,
+        **common
+    )
+    return chat, embeddings
+
+
+def _session_call(server: StubOpenAIServer, shared: bool, i: int) -> float:
+    start = time.perf_counter()
+    if shared:
+        chat, embeddings = _clients(server, get_http_client(), get_shared_async_client())
+        chat.invoke(f"question {i}")
+        embeddings.embed_query(f"question {i}")
+    else:
+        # What per-session construction costs: a new client, so new connections
+        with httpx.Client() as client:
+            chat, embeddings = _clients(server, client)
+            chat.invoke(f"question {i}")
+            embeddings.embed_query(f"question {i}")
+    return time.perf_counter() - start
+
+
+def run_sync(requests: int, concurrency: int, latency: float, shared: bool) -> dict:
+    """``requests`` sessions, each one chat call and one embedding, over ``concurrency`` threads"""
+    server = StubOpenAIServer(latency=latency).start()
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = list(pool.map(lambda i: _session_call(server, shared, i), range(requests)))
+        elapsed = time.perf_counter() - start
+        return {
+            "sessions_per_sec": requests / elapsed,
+            "session": _percentiles(samples),
+            "tcp_connections": server.connections,
+            "server_requests": server.requests
+        }
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def run_async(requests: int, concurrency: int, latency: float) -> dict:
+    """Streaming chat calls through the shared async pool, ``concurrency`` at a time"""
+    server = StubOpenAIServer(latency=latency).start()
+    chat, _ = _clients(server, get_http_client(), get_shared_async_client())
+    chat.streaming = True
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+        samples = []
+
+        async def one(i: int):
+            async with semaphore:
+                start = time.perf_counter()
+                async for _ in chat.astream(f"question {i}"):
+                    pass
+                samples.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        return samples, time.perf_counter() - start
+
+    try:
+        samples, elapsed = asyncio.run(main())
+        return {
+            "streams_per_sec": requests / elapsed,
+            "stream": _percentiles(samples),
+            "tcp_connections": server.connections
+        }
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Shared HTTP pool vs per-session clients")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=5)
+    args = parser.parse_args(argv)
+    latency = args.latency_ms / 1000
+
+    print(f"{args.requests} sessions (1 chat + 1 embedding call each), concurrency {args.concurrency}, "
+          f"stub latency {args.latency_ms:.0f} ms")
+    for label, shared in (("per-session clients", False), ("shared pool", True)):
+        result = run_sync(args.requests, args.concurrency, latency, shared)
+        print(
+            f"  {label:<20} {result['sessions_per_sec']:7.1f} sessions/s, "
+            f"p50 {result['session']['p50_ms']:6.1f} ms, p95 {result['session']['p95_ms']:6.1f} ms, "
+            f"{result['tcp_connections']} TCP connections for {result['server_requests']} requests"
+        )
+
+    result = run_async(args.requests, args.concurrency, latency)
+    print(
+        f"  async streaming      {result['streams_per_sec']:7.1f} streams/s, "
+        f"p50 {result['stream']['p50_ms']:6.1f} ms, {result['tcp_connections']} TCP connections"
+    )
+    print(f"Pool stats: {pool_stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
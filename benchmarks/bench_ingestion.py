@@ -0,0 +1,151 @@
+"""
+Embedding ingestion benchmark against the local stub API
+
+Starts benchmarks.stub_openai in-process with a request budget, then embeds
+synthetic chunks through the real OpenAIEmbeddings client at several
+concurrency levels and reports chunks/sec, 429s and retries. With
+--interrupt-after, the first run is aborted after that many batches and a
+second run shows how many chunks were resumed from the progress file.
+
+Usage:
+    python -m benchmarks.bench_ingestion [--chunks 5000] [--batch-size 64] [--concurrency 1,4,8]
+                                         [--rps 20] [--latency-ms 50] [--interrupt-after 10]
+"""
+import argparse
+import os
+import tempfile
+from typing import List
+
+from benchmarks.stub_openai import StubOpenAIServer
+from benchmarks.suite import _synthetic_corpus
+from config.settings import EMBEDDING_MODEL
+from retrieval.index_store import compute_chunk_hash
+from retrieval.ingestion import EmbeddingIngestor
+from utils.http_client import get_http_client
+
+
+class _Interrupted(Exception):
+    pass
+
+
+class _InterruptingEmbeddings:
+    """Wraps an embeddings client and fails after ``batches`` successful calls"""
+
+    def __init__(self, inner, batches: int):
+        self.inner = inner
+        self.remaining = batches
+
+    def embed_documents(self, texts: List[str]):
+        if self.remaining <= 0:
+            raise _Interrupted("simulated crash")
+        self.remaining -= 1
+        return self.inner.embed_documents(texts)
+
+
+def make_client(server: StubOpenAIServer, batch_size: int):
+    from langchain_openai import OpenAIEmbeddings
+
+    return OpenAIEmbeddings(
+        model=EMBEDDING_MODEL,
+        api_key="sk-stub",
+        base_url=server.base_url,
+        http_client=get_http_client(),
+        # Retries and backoff are the ingestor's job
+        max_retries=0,
+        chunk_size=batch_size,
+        check_embedding_ctx_length=False
+    )
+
+
+def run(chunks: int, batch_size: int, concurrency: int, rps: float, latency: float) -> dict:
+    """Embed ``chunks`` synthetic chunks through a fresh stub server"""
+    server = StubOpenAIServer(rps=rps, latency=latency).start()
+    try:
+        texts = _synthetic_corpus(chunks, seed=concurrency)
+        ingestor = EmbeddingIngestor(
+            make_client(server, batch_size), batch_size=batch_size, max_concurrency=concurrency,
+            backoff_base=0.2
+        )
+        vectors = ingestor.embed(texts, [compute_chunk_hash(t) for t in texts])
+        stats = ingestor.last_stats
+        return {
+            "concurrency": concurrency,
+            "embedded": len(vectors),
+            "seconds": stats.elapsed,
+            "chunks_per_sec": stats.chunks_per_sec,
+            "rate_limited": stats.rate_limited,
+            "retries": stats.retries,
+            "final_concurrency": stats.final_concurrency,
+            "server_requests": server.requests
+        }
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def run_resume(chunks: int, batch_size: int, interrupt_after: int) -> dict:
+    """Abort an ingestion part-way, then rerun it from the progress file"""
+    server = StubOpenAIServer().start()
+    try:
+        texts = _synthetic_corpus(chunks, seed=99)
+        hashes = [compute_chunk_hash(t) for t in texts]
+        with tempfile.TemporaryDirectory() as tmp:
+            progress = os.path.join(tmp, "index.progress")
+            client = make_client(server, batch_size)
+
+            first = EmbeddingIngestor(
+                _InterruptingEmbeddings(client, interrupt_after), batch_size=batch_size,
+                max_concurrency=1, max_retries=0, progress_path=progress
+            )
+            try:
+                first.embed(texts, hashes)
+            except _Interrupted:
+                pass
+
+            inputs_before = server.inputs
+            second = EmbeddingIngestor(client, batch_size=batch_size, progress_path=progress)
+            vectors = second.embed(texts, hashes)
+            return {
+                "chunks": chunks,
+                "embedded_before_crash": first.last_stats.embedded,
+                "resumed": second.last_stats.resumed,
+                "embedded_after_resume": server.inputs - inputs_before,
+                "complete": len(vectors) == len(set(hashes))
+            }
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Embedding ingestion throughput against a local stub")
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--concurrency", default="1,4,8")
+    parser.add_argument("--rps", type=float, default=20, help="Stub request budget (0 = unlimited)")
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--interrupt-after", type=int, default=0, help="Also run the crash/resume check")
+    args = parser.parse_args(argv)
+
+    print(f"{args.chunks} chunks, batch {args.batch_size}, stub {args.rps or 'unlimited'} req/s, "
+          f"{args.latency_ms:.0f} ms/request")
+    for concurrency in [int(c) for c in args.concurrency.split(",")]:
+        result = run(args.chunks, args.batch_size, concurrency, args.rps, args.latency_ms / 1000)
+        print(
+            f"  concurrency {concurrency:>2}: {result['chunks_per_sec']:8.1f} chunks/s "
+            f"in {result['seconds']:.1f}s, {result['rate_limited']} x 429, {result['retries']} retries, "
+            f"ended at concurrency {result['final_concurrency']}"
+        )
+
+    if args.interrupt_after:
+        resume = run_resume(args.chunks, args.batch_size, args.interrupt_after)
+        print(
+            f"Resume: {resume['embedded_before_crash']} chunks embedded before the crash, "
+            f"{resume['resumed']} resumed, {resume['embedded_after_resume']} embedded after restart, "
+            f"complete={resume['complete']}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,74 @@
+"""
+Listing scoring pipeline benchmark
+
+Writes synthetic eBay-style listings (titles mixing known brands, aliases,
+item types and noise words, so most titles are unique) and runs the
+pipeline with different worker counts, reporting listings/sec, per-stage
+time and peak memory of the main process.
+
+Usage:
+    python -m benchmarks.bench_pipeline [--listings 200000] [--workers 0,1,4] [--chunk-size 1000]
+"""
+import argparse
+import csv
+import os
+import random
+import resource
+import tempfile
+
+from pipeline.scoring import STAGES, run_pipeline
+
+BRANDS = ["Maison Margiela", "MMM", "Margiela", "Rick Owens", "rick", "DRKSHDW", "Acne Studios", "Zara"]
+ITEMS = ["tabi boots", "boots", "sneakers", "trainers", "GATs", "jacket", "geobasket", "dress"]
+NOISE = ["vintage", "rare", "black", "size", "mens", "womens", "leather", "authentic", "archive", "2019"]
+CONDITIONS = ["New with tags", "Pre-owned", "Used", "Excellent condition", ""]
+
+
+def write_listings(path: str, listings: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "title", "condition", "price", "postage", "url"])
+        for i in range(listings):
+            words = rng.sample(NOISE, 3) + [rng.choice(BRANDS), rng.choice(ITEMS), str(rng.randint(36, 47))]
+            rng.shuffle(words)
+            writer.writerow([
+                f"ebay-{i}",
+                " ".join(words),
+                rng.choice(CONDITIONS),
+                f"£{rng.randint(20, 600)}",
+                rng.choice(["", "0", "4.99", "7.50"]),
+                f"https://www.ebay.co.uk/itm/{i}"
+            ])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk listing scoring throughput")
+    parser.add_argument("--listings", type=int, default=200_000)
+    parser.add_argument("--workers", default="0,1,4", help="Comma-separated worker counts (0 = in process)")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        listings_path = os.path.join(tmp, "listings.csv")
+        write_listings(listings_path, args.listings)
+        print(f"{args.listings:,} listings, chunks of {args.chunk_size}, {os.cpu_count()} CPU(s)")
+        for workers in [int(w) for w in args.workers.split(",")]:
+            report = run_pipeline(
+                listings_path,
+                os.path.join(tmp, "opportunities.csv"),
+                workers=workers,
+                chunk_size=args.chunk_size,
+                top=0
+            )
+            stages = ", ".join(f"{stage} {report.stages[stage]:.2f}s" for stage in STAGES)
+            print(
+                f"  {workers} worker(s): {report.listings_per_sec:9,.0f} listings/sec, "
+                f"{report.opportunities:,} opportunities ({stages})"
+            )
+    print(f"Peak memory of the main process: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
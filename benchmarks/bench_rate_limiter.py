@@ -0,0 +1,93 @@
+"""
+Rate limiter microbenchmark: checks per second under thread contention
+
+Usage:
+    python -m benchmarks.bench_rate_limiter [--threads 8] [--seconds 2] [--backend memory|fakeredis|redis]
+"""
+import argparse
+import threading
+import time
+
+from utils.rate_limiter import MemoryBackend, RateLimiter, RedisBackend
+
+
+def make_backend(name: str):
+    if name == "memory":
+        return MemoryBackend()
+    if name == "fakeredis":
+        import fakeredis
+
+        return RedisBackend(client=fakeredis.FakeRedis())
+    if name == "redis":
+        return RedisBackend()
+    raise ValueError(f"Unknown backend: {name}")
+
+
+def run(backend, threads: int = 8, seconds: float = 2.0, keys: int = 1) -> dict:
+    """
+    Hammer ``check_limit`` from several threads.
+
+    Args:
+        backend: Rate limit backend instance
+        threads: Concurrent callers
+        seconds: Duration of the run
+        keys: Distinct limiter keys (1 = every thread contends on the same key)
+
+    Returns:
+        Dict with total checks, checks/sec and allowed count
+    """
+    # A huge limit keeps every check on the increment path
+    limiters = [RateLimiter(f"bench:{i}", backend=backend, limit=10**12) for i in range(keys)]
+    counts = [0] * threads
+    allowed = [0] * threads
+    stop = threading.Event()
+    start_barrier = threading.Barrier(threads + 1)
+
+    def worker(n: int):
+        limiter = limiters[n % keys]
+        start_barrier.wait()
+        while not stop.is_set():
+            if limiter.check_limit():
+                allowed[n] += 1
+            counts[n] += 1
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for w in workers:
+        w.start()
+
+    start_barrier.wait()
+    start = time.perf_counter()
+    time.sleep(seconds)
+    stop.set()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+
+    total = sum(counts)
+    return {
+        "threads": threads,
+        "keys": keys,
+        "checks": total,
+        "allowed": sum(allowed),
+        "checks_per_sec": total / elapsed
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Rate limiter checks/sec under contention")
+    parser.add_argument("--backend", default="memory", choices=["memory", "fakeredis", "redis"])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--keys", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    result = run(make_backend(args.backend), args.threads, args.seconds, args.keys)
+    print(
+        f"{args.backend}: {result['checks_per_sec']:,.0f} checks/sec "
+        f"({result['threads']} threads, {result['keys']} key(s), {result['checks']:,} checks)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,131 @@
+"""
+Sold-price store benchmark
+
+Generates synthetic sales (brands x item types x conditions x platforms over
+400 days) as Parquet, then measures:
+    - bulk ingest of the initial file and of a later append, including the
+      aggregate refresh (rows/sec)
+    - loading the aggregates in a serving process
+    - get_price_range latency backed by the precomputed aggregates
+    - ad-hoc ``query`` latency over the raw sales (one platform, custom window)
+
+Usage:
+    python -m benchmarks.bench_sales_store [--rows 2000000] [--brands 200] [--lookups 2000]
+"""
+import argparse
+import datetime
+import os
+import random
+import tempfile
+import time
+
+import duckdb
+
+from benchmarks.suite import ITEM_TYPES, _percentiles, _time_calls
+from data.price_store import CONDITIONS
+
+PLATFORMS = ("grailed", "vestiaire collective", "depop")
+AS_OF = datetime.date(2026, 1, 31)
+
+
+def write_sales(path: str, rows: int, brands: int, seed: int = 0) -> None:
+    """Parquet file of ``rows`` random sales over the 400 days before AS_OF"""
+    items = ", ".join(f"'{item}'" for item in ITEM_TYPES)
+    conditions = ", ".join(f"'{c}'" for c in CONDITIONS)
+    platforms = ", ".join(f"'{p}'" for p in PLATFORMS)
+    with duckdb.connect() as connection:
+        connection.execute(f"SELECT setseed({seed / 1000})")
+        connection.execute(f"""
+            COPY (
+                SELECT
+                    'brand ' || CAST(floor(random() * {brands}) AS INTEGER) AS brand,
+                    list_extract([{items}], CAST(floor(random() * {len(ITEM_TYPES)}) AS INTEGER) + 1) AS item_type,
+                    list_extract([{conditions}], CAST(floor(random() * {len(CONDITIONS)}) AS INTEGER) + 1) AS condition,
+                    list_extract([{platforms}], CAST(floor(random() * {len(PLATFORMS)}) AS INTEGER) + 1) AS platform,
+                    round(50 + random() * 900, 2) AS price,
+                    DATE '{AS_OF}' - CAST(floor(random() * 400) AS INTEGER) AS sold_at
+                FROM range({rows})
+            ) TO '{path}' (FORMAT parquet)
+        """)
+
+
+def run(rows: int, brands: int, lookups: int) -> dict:
+    from data import sales_store
+    from data.sales_store import SoldPriceStore
+    from tools import get_price_range
+
+    with tempfile.TemporaryDirectory() as tmp:
+        initial = os.path.join(tmp, "initial.parquet")
+        append = os.path.join(tmp, "append.parquet")
+        write_sales(initial, rows, brands, seed=1)
+        write_sales(append, max(1, rows // 10), brands, seed=2)
+
+        db_path = os.path.join(tmp, "sales.duckdb")
+        writer = SoldPriceStore(path=db_path, aliases_path=None)
+        start = time.perf_counter()
+        writer.ingest(initial, as_of=AS_OF)
+        initial_s = time.perf_counter() - start
+        start = time.perf_counter()
+        writer.ingest(append, as_of=AS_OF)
+        append_s = time.perf_counter() - start
+
+        reader = SoldPriceStore(path=db_path, aliases_path=None)
+        start = time.perf_counter()
+        reader.load()
+        load_s = time.perf_counter() - start
+
+        rng = random.Random(brands)
+        args = [
+            {"brand": f"brand {rng.randrange(brands)}", "item_type": rng.choice(ITEM_TYPES), "condition": "good"}
+            for _ in range(lookups)
+        ]
+        previous = sales_store._store
+        sales_store._store = reader
+        try:
+            tool = _time_calls(get_price_range.invoke, args)
+        finally:
+            sales_store._store = previous
+
+        queries = args[:max(1, lookups // 20)]
+        live = _time_calls(
+            lambda a: reader.query(a["brand"], a["item_type"], platform=rng.choice(PLATFORMS), days=30),
+            queries
+        )
+
+        total = rows + max(1, rows // 10)
+        return {
+            "rows": total,
+            "segments": len(reader),
+            "ingest_rows_per_sec": rows / initial_s,
+            "ingest_s": initial_s,
+            "append_rows": max(1, rows // 10),
+            "append_s": append_s,
+            "load_s": load_s,
+            "db_mb": os.path.getsize(db_path) / 1e6,
+            "get_price_range": _percentiles(tool),
+            "query": _percentiles(live)
+        }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="DuckDB sold-price store ingest and query latency")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--brands", type=int, default=200)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    result = run(args.rows, args.brands, args.lookups)
+    print(f"{result['rows']:,} sales, {result['segments']:,} segments, {result['db_mb']:.0f} MB database")
+    print(f"  ingest        {result['ingest_s']:6.2f} s ({result['ingest_rows_per_sec']:,.0f} rows/s incl. aggregates)")
+    print(f"  append {result['append_rows']:,} {result['append_s']:6.2f} s")
+    print(f"  load          {result['load_s'] * 1000:6.1f} ms")
+    print(
+        f"  get_price_range p50 {result['get_price_range']['p50_ms']:.3f} ms, "
+        f"p95 {result['get_price_range']['p95_ms']:.3f} ms"
+    )
+    print(f"  live query      p50 {result['query']['p50_ms']:.1f} ms, p95 {result['query']['p95_ms']:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
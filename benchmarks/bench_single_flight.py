@@ -0,0 +1,132 @@
+"""
+Request coalescing benchmark
+
+Many sessions send the same question at the same moment. Compares upstream
+calls and wall time with single-flight coalescing off and on, for:
+    - query embeddings in search_knowledge_base (KnowledgeRetriever in vector mode)
+    - whole context-free agent turns, from threads (Streamlit) and from one
+      event loop (HTTP API)
+
+Offline: HashEmbeddings and ScriptedChatModel with simulated latency.
+
+Usage:
+    python -m benchmarks.bench_single_flight [--sessions 32] [--embed-ms 50] [--model-ms 200]
+"""
+import argparse
+import asyncio
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fakes import HashEmbeddings
+from benchmarks.load_test import _DIM, build_index, fake_bundle
+
+QUESTION = "What should I check before reselling designer sneakers, round {n}?"
+
+
+def _concurrently(sessions: int, fn) -> tuple:
+    """Run ``fn(i)`` in ``sessions`` threads released together; returns (results, seconds)"""
+    barrier = threading.Barrier(sessions)
+
+    def call(i: int):
+        barrier.wait()
+        return fn(i)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        results = list(pool.map(call, range(sessions)))
+    return results, time.perf_counter() - start
+
+
+def run_embeddings(index_path: str, sessions: int, embed_ms: float, coalesce: bool) -> dict:
+    """``sessions`` identical knowledge base searches that all miss the query cache"""
+    from retrieval.engine import RetrievalEngine
+    from retrieval.index_store import load_index
+    from retrieval.retriever import KnowledgeRetriever, _query_embeddings
+
+    embedding = HashEmbeddings(_DIM, delay=embed_ms / 1000)
+    retriever = KnowledgeRetriever(RetrievalEngine(load_index(index_path, embedding=embedding)), mode="vector")
+    _query_embeddings.enabled = coalesce
+    try:
+        _, elapsed = _concurrently(sessions, lambda i: retriever.similarity_search(QUESTION.format(n=0), k=4))
+    finally:
+        _query_embeddings.enabled = True
+    return {"upstream_calls": embedding.calls, "seconds": elapsed}
+
+
+def run_turns(bundle, sessions: int, coalesce: bool, round_number: int, use_async: bool) -> dict:
+    """``sessions`` identical first turns; a fresh question per round so the answer cache can't answer"""
+    from agent import service
+    from agent.history import ConversationMemory
+
+    messages = [{"role": "user", "content": QUESTION.format(n=round_number)}]
+    before = service._turns.stats()["upstream"]
+    service._turns.enabled = coalesce
+
+    def last_event(events):
+        return list(events)[-1]
+
+    async def gather():
+        async def one():
+            return [e async for e in service.astream_turn(bundle, messages, ConversationMemory())][-1]
+
+        start = time.perf_counter()
+        done = await asyncio.gather(*(one() for _ in range(sessions)))
+        return done, time.perf_counter() - start
+
+    try:
+        if use_async:
+            done, elapsed = asyncio.run(gather())
+        else:
+            done, elapsed = _concurrently(
+                sessions, lambda i: last_event(service.stream_turn(bundle, messages, ConversationMemory()))
+            )
+    finally:
+        service._turns.enabled = True
+    return {
+        "upstream_calls": service._turns.stats()["upstream"] - before,
+        "sources": dict(Counter(event.source for event in done)),
+        "seconds": elapsed
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Single-flight coalescing of identical concurrent requests")
+    parser.add_argument("--sessions", type=int, default=32)
+    parser.add_argument("--embed-ms", type=float, default=50, help="Fake embeddings latency per request")
+    parser.add_argument("--model-ms", type=float, default=200, help="Fake model latency per call")
+    args = parser.parse_args(argv)
+
+    from utils.single_flight import single_flight_stats
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index_path = build_index(tmp)
+        print(f"{args.sessions} concurrent sessions sending the same question")
+
+        for coalesce in (False, True):
+            result = run_embeddings(index_path, args.sessions, args.embed_ms, coalesce)
+            print(
+                f"  query embedding, coalescing {'on ' if coalesce else 'off'}: "
+                f"{result['upstream_calls']:3d} embeddings requests, {result['seconds'] * 1000:7.1f} ms"
+            )
+
+        bundle = fake_bundle(index_path, args.model_ms)
+        round_number = 1
+        for label, use_async in (("threads", False), ("event loop", True)):
+            for coalesce in (False, True):
+                result = run_turns(bundle, args.sessions, coalesce, round_number, use_async)
+                round_number += 1
+                print(
+                    f"  agent turn ({label:<10}), coalescing {'on ' if coalesce else 'off'}: "
+                    f"{result['upstream_calls']:3d} agent runs, {result['seconds'] * 1000:7.1f} ms, "
+                    f"answered by {result['sources']}"
+                )
+
+    print(f"Saved calls: { {name: s['saved'] for name, s in single_flight_stats().items()} }")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,136 @@
+"""
+Offline stand-ins for the OpenAI clients used by benchmarks
+
+HashEmbeddings maps text to a deterministic bag-of-words vector (feature
+hashing), so texts sharing words get similar vectors and results are stable
+across runs and machines. ScriptedChatModel replays a fixed tool-call /
+answer script without network access.
+"""
+import asyncio
+import json
+import re
+import time
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+class HashEmbeddings(Embeddings):
+    """Deterministic feature-hashing embeddings (``delay`` simulates the request round trip)"""
+
+    def __init__(self, dim: int = 256, delay: float = 0.0):
+        self.dim = dim
+        self.delay = delay
+        self._slots: Dict[str, Tuple[int, float]] = {}
+        self.calls = 0
+
+    def _slot(self, token: str) -> Tuple[int, float]:
+        slot = self._slots.get(token)
+        if slot is None:
+            h = zlib.crc32(token.encode("utf-8"))
+            slot = self._slots[token] = (h % self.dim, 1.0 if (h >> 16) & 1 else -1.0)
+        return slot
+
+    def embed_array(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed ``texts`` into a (len(texts), dim) float32 array"""
+        if self.delay:
+            time.sleep(self.delay)
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in _TOKEN.findall(text.lower()):
+                column, sign = self._slot(token)
+                vectors[row, column] += sign
+        self.calls += 1
+        return vectors
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_array(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_array([text])[0].tolist()
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    Chat model that calls one tool on the first turn, then answers.
+
+    Args (fields):
+        tool_name: Tool to call on the first turn (None answers directly)
+        tool_args: Arguments for that tool call
+        answer: Final answer text, streamed word by word
+        delay: Seconds each model call waits before replying (simulated network/generation time)
+    """
+
+    tool_name: Optional[str] = "calculate_profit"
+    tool_args: dict = {"purchase_price": 200, "selling_price": 450}
+    answer: str = "Your profit is about £188 on Grailed, a 41.8% margin. Nice find!"
+    delay: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _reply(self, messages) -> AIMessage:
+        usage = {"input_tokens": 50 * len(messages), "output_tokens": 20, "total_tokens": 50 * len(messages) + 20}
+        if self.tool_name and not any(isinstance(m, ToolMessage) for m in messages):
+            return AIMessage(
+                content="",
+                tool_calls=[{"name": self.tool_name, "args": self.tool_args, "id": "call_0"}],
+                usage_metadata=usage
+            )
+        return AIMessage(content=self.answer, usage_metadata=usage)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.delay:
+            time.sleep(self.delay)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    def _chunks(self, messages):
+        reply = self._reply(messages)
+        if reply.tool_calls:
+            call = reply.tool_calls[0]
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content="",
+                tool_call_chunks=[{"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": 0}],
+                usage_metadata=reply.usage_metadata
+            ))
+            return
+        words = reply.content.split(" ")
+        for i, word in enumerate(words):
+            text = word if i == len(words) - 1 else word + " "
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content=text,
+                usage_metadata=reply.usage_metadata if i == 0 else None
+            ))
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.delay:
+            time.sleep(self.delay)
+        for chunk in self._chunks(messages):
+            if run_manager and chunk.message.content:
+                run_manager.on_llm_new_token(chunk.message.content, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        # Waits without holding a thread, like a real network-bound model
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        for chunk in self._chunks(messages):
+            if run_manager and chunk.message.content:
+                await run_manager.on_llm_new_token(chunk.message.content, chunk=chunk)
+            yield chunk
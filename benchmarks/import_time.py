@@ -0,0 +1,132 @@
+"""
+Import-time report: what each entry point costs before it can do any work
+
+Each target is imported in a fresh interpreter with ``-X importtime`` and the
+per-module self/cumulative times are aggregated. The 'landing' target is
+the set of modules app.py imports before its API key gate, i.e. what the
+"please enter your API key" page pays on a cold start.
+
+Usage:
+    python -m benchmarks.import_time [--targets landing,agent] [--top 15] [--max-ms 1500] [--json out.json]
+"""
+import argparse
+import ast
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+TARGETS = {
+    "agent": ["agent.agent_setup"],
+    "tools": ["tools"],
+    "all_tools": ["tools.profit_calculator", "tools.batch_profit", "tools.price_lookup",
+                  "tools.tutorial", "tools.authentication"]
+}
+
+
+def landing_modules(app_path: str = os.path.join(ROOT, "app.py")) -> List[str]:
+    """Modules app.py imports at top level before its first ``st.stop()``"""
+    with open(app_path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            modules.append(node.module)
+        elif any(
+            isinstance(call, ast.Call)
+            and isinstance(call.func, ast.Attribute)
+            and call.func.attr == "stop"
+            and isinstance(call.func.value, ast.Name)
+            and call.func.value.id == "st"
+            for call in ast.walk(node)
+        ):
+            break
+    return modules
+
+
+def measure(modules: List[str]) -> dict:
+    """
+    Import ``modules`` in a fresh interpreter and parse the importtime log.
+
+    Returns:
+        Dict with total_ms and per-module rows (self_ms, cumulative_ms, depth)
+    """
+    code = "; ".join(f"import {module}" for module in modules)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {modules} failed:\n{proc.stderr[-2000:]}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append({
+                "module": name,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                "depth": len(indent) // 2
+            })
+
+    total = sum(row["cumulative_ms"] for row in rows if row["depth"] == 0)
+    return {"modules": modules, "total_ms": total, "rows": rows}
+
+
+def by_package(rows: List[dict]) -> Dict[str, float]:
+    """Self time summed per top-level package, largest first"""
+    totals = defaultdict(float)
+    for row in rows:
+        totals[row["module"].split(".")[0]] += row["self_ms"]
+    return dict(sorted(totals.items(), key=lambda item: -item[1]))
+
+
+def _print_report(name: str, result: dict, top: int) -> None:
+    print(f"\n== {name}: {result['total_ms']:.0f} ms ({len(result['rows'])} modules) ==")
+    print(f"   imports: {', '.join(result['modules'])}")
+    print("   by package (self time):")
+    for package, ms in list(by_package(result["rows"]).items())[:top]:
+        print(f"     {ms:9.1f} ms  {package}")
+    print("   slowest modules (self time):")
+    for row in sorted(result["rows"], key=lambda r: -r["self_ms"])[:top]:
+        print(f"     {row['self_ms']:9.1f} ms  {row['module']}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Per-module import cost of the app's entry points")
+    parser.add_argument("--targets", default="landing,agent", help="Comma-separated: landing, " + ", ".join(TARGETS))
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--max-ms", type=float, default=None, help="Fail if the landing import exceeds this")
+    parser.add_argument("--json", help="Also write the raw report to this file")
+    args = parser.parse_args(argv)
+
+    report = {}
+    for name in [t.strip() for t in args.targets.split(",") if t.strip()]:
+        modules = landing_modules() if name == "landing" else TARGETS.get(name, [name])
+        report[name] = measure(modules)
+        _print_report(name, report[name], args.top)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.max_ms is not None and "landing" in report and report["landing"]["total_ms"] > args.max_ms:
+        print(f"\nLanding import {report['landing']['total_ms']:.0f} ms exceeds budget {args.max_ms:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
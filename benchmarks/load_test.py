@@ -0,0 +1,214 @@
+"""
+Load test of the assistant HTTP API against a fake model
+
+Builds a knowledge index with HashEmbeddings, starts ``uvicorn`` with N
+workers serving ``create_fake_app`` (the real API, tools, retrieval and
+agent graph, with ScriptedChatModel in place of OpenAI), then streams
+concurrent /chat requests and reports requests/sec, time to first token
+and p50/p95/p99 latency. Every prompt is distinct, so the answer cache and
+the router don't short-circuit the agent.
+
+Usage:
+    python -m benchmarks.load_test [--requests 500] [--concurrency 32] [--workers 1,4]
+                                   [--model-ms 200] [--output load_test.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+import httpx
+
+from benchmarks.suite import _percentiles
+
+BENCH_API_KEY = "sk-" + "0" * 40
+_INDEX_ENV = "GRABYAI_LOAD_TEST_INDEX"
+_DELAY_ENV = "GRABYAI_LOAD_TEST_MODEL_MS"
+_DIM = 256
+
+
+def fake_bundle(index_path: str, model_ms: float = 0.0):
+    """AgentBundle with the real tools, retrieval and agent graph around ScriptedChatModel"""
+    from langchain.agents import create_agent
+
+    from agent.agent_setup import create_tools
+    from agent.async_runner import ToolTimeoutMiddleware
+    from agent.instrumentation import TracingMiddleware
+    from agent.registry import AgentBundle
+    from benchmarks.fakes import HashEmbeddings, ScriptedChatModel
+    from retrieval.engine import RetrievalEngine
+    from retrieval.index_store import load_index
+    from retrieval.retriever import KnowledgeRetriever
+
+    index = load_index(index_path, embedding=HashEmbeddings(_DIM))
+    vectorstore = KnowledgeRetriever(RetrievalEngine(index))
+    tools = create_tools(vectorstore)
+    model = ScriptedChatModel(delay=model_ms / 1000)
+    agent = create_agent(
+        model,
+        tools,
+        system_prompt="You are a load-test assistant.",
+        middleware=[TracingMiddleware(), ToolTimeoutMiddleware()]
+    )
+    return AgentBundle(agent=agent, tools=tools, vectorstore=vectorstore)
+
+
+def create_fake_app():
+    """uvicorn factory: the API around an offline agent built from the load-test index"""
+    from server.api import create_app
+
+    bundle = fake_bundle(os.environ[_INDEX_ENV], float(os.environ.get(_DELAY_ENV, "0")))
+    return create_app(get_bundle=lambda api_key: bundle, rate_limit=False)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_server(workers: int, index_path: str, model_ms: float) -> tuple:
+    port = _free_port()
+    env = dict(os.environ, **{_INDEX_ENV: index_path, _DELAY_ENV: str(model_ms)})
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "benchmarks.load_test:create_fake_app", "--factory",
+            "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--log-level", "warning"
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("API server exited during startup")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return process, base_url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("API server did not become healthy")
+
+
+async def _one_chat(client: httpx.AsyncClient, base_url: str, i: int) -> dict:
+    body = {"messages": [{"role": "user", "content": f"Load test question {i}: is this listing worth it?"}]}
+    start = time.perf_counter()
+    first_token = None
+    source = None
+    async with client.stream(
+        "POST", f"{base_url}/chat", json=body, headers={"Authorization": f"Bearer {BENCH_API_KEY}"}
+    ) as response:
+        if response.status_code != 200:
+            return {"ok": False, "status": response.status_code}
+        event = None
+        async for line in response.aiter_lines():
+            if line.startswith("event:"):
+                event = line[6:].strip()
+                if first_token is None and event in ("token", "done"):
+                    first_token = time.perf_counter() - start
+            elif line.startswith("data:") and event == "done":
+                source = json.loads(line[5:])["source"]
+            elif line.startswith("data:") and event == "error":
+                return {"ok": False, "status": 500}
+    return {"ok": True, "latency": time.perf_counter() - start, "ttft": first_token, "source": source}
+
+
+async def _drive(base_url: str, requests: int, concurrency: int) -> tuple:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=120) as client:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def bounded(i: int):
+            async with semaphore:
+                try:
+                    return await _one_chat(client, base_url, i)
+                except httpx.HTTPError:
+                    return {"ok": False, "status": None}
+
+        # Warm every worker's connection and agent before timing
+        await asyncio.gather(*(bounded(-1 - i) for i in range(concurrency)))
+        start = time.perf_counter()
+        results = await asyncio.gather(*(bounded(i) for i in range(requests)))
+        return results, time.perf_counter() - start
+
+
+def run(requests: int, concurrency: int, workers: int, index_path: str, model_ms: float) -> dict:
+    """Start a server with ``workers`` processes and stream ``requests`` chats at it"""
+    process, base_url = _start_server(workers, index_path, model_ms)
+    try:
+        results, elapsed = asyncio.run(_drive(base_url, requests, concurrency))
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+    ok = [r for r in results if r["ok"]]
+    report = {
+        "workers": workers,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": len(results) - len(ok),
+        "seconds": elapsed,
+        "requests_per_sec": len(ok) / elapsed if elapsed else 0.0
+    }
+    if ok:
+        report["latency"] = _percentiles([r["latency"] for r in ok])
+        report["ttft"] = _percentiles([r["ttft"] for r in ok if r["ttft"] is not None])
+        report["agent_answers"] = sum(1 for r in ok if r["source"] == "agent")
+    return report
+
+
+def build_index(directory: str) -> str:
+    """Knowledge base index with offline embeddings, shared by every worker"""
+    from benchmarks.fakes import HashEmbeddings
+    from data.knowledge_base import load_documents
+    from retrieval.index_store import build_index as build
+
+    path = os.path.join(directory, "index.bin")
+    build(load_documents(), HashEmbeddings(_DIM), path)
+    return path
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Load test the assistant API with a fake model")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--workers", default="1,4", help="Comma-separated worker counts to compare")
+    parser.add_argument("--model-ms", type=float, default=200, help="Fake model latency per call")
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args(argv)
+
+    reports: List[dict] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        index_path = build_index(tmp)
+        print(f"{args.requests} streamed chats, concurrency {args.concurrency}, "
+              f"fake model {args.model_ms:.0f} ms/call (2 calls per chat)")
+        for workers in [int(w) for w in args.workers.split(",")]:
+            report = run(args.requests, args.concurrency, workers, index_path, args.model_ms)
+            reports.append(report)
+            if "latency" not in report:
+                print(f"  {workers} worker(s): all {report['errors']} requests failed")
+                continue
+            print(
+                f"  {workers} worker(s): {report['requests_per_sec']:7.1f} req/s, "
+                f"p50 {report['latency']['p50_ms']:7.1f} ms, p95 {report['latency']['p95_ms']:7.1f} ms, "
+                f"TTFT p95 {report['ttft']['p95_ms']:7.1f} ms, {report['errors']} errors"
+            )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"created": time.time(), "results": reports}, f, indent=2)
+        print(f"Wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
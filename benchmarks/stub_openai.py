@@ -0,0 +1,246 @@
+"""
+Local stub of the OpenAI embeddings and chat completions endpoints
+
+Serves POST /v1/embeddings with deterministic HashEmbeddings vectors and
+POST /v1/chat/completions with a fixed answer (streamed as SSE chunks when
+the request asks for it), with a configurable per-request latency and a
+requests-per-second budget. Requests over budget get HTTP 429 with a
+Retry-After header, like the real API, so ingestion backoff and connection
+pooling can be exercised without network access or cost. ``connections``
+counts accepted TCP connections, which shows keep-alive reuse.
+
+Usage:
+    python -m benchmarks.stub_openai [--port 8765] [--rps 20] [--latency-ms 50] [--dim 256]
+
+Point a client at it with base_url="http://127.0.0.1:8765/v1".
+"""
+import argparse
+import base64
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from benchmarks.fakes import HashEmbeddings
+
+
+class _TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> float:
+        """Consume one token; returns 0 on success, else seconds until one is available"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+
+class StubOpenAIServer(ThreadingHTTPServer):
+    """OpenAI-compatible server with latency and rate limiting"""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        port: int = 0,
+        dim: int = 256,
+        rps: float = 0,
+        latency: float = 0.0,
+        host: str = "127.0.0.1",
+        answer: str = "This is a stub answer from the local test server."
+    ):
+        """
+        Args:
+            port: TCP port (0 picks a free one, see ``base_url``)
+            dim: Embedding dimension
+            rps: Allowed requests per second (0 disables rate limiting)
+            latency: Seconds added to every successful request
+            host: Interface to bind
+            answer: Text of every chat completion
+        """
+        super().__init__((host, port), _OpenAIHandler)
+        self.embedding = HashEmbeddings(dim)
+        self.bucket = _TokenBucket(rps, max(1.0, rps)) if rps else None
+        self.latency = latency
+        self.answer = answer
+        self.connections = 0
+        self.requests = 0
+        self.rate_limited = 0
+        self.inputs = 0
+        self._embed_lock = threading.Lock()
+        self._counter_lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "StubOpenAIServer":
+        threading.Thread(target=self.serve_forever, name="stub-openai", daemon=True).start()
+        return self
+
+    def embed(self, inputs: list) -> np.ndarray:
+        # Token-id inputs (sent when the client splits by context length) are embedded as text
+        texts = [x if isinstance(x, str) else " ".join(f"t{t}" for t in x) for x in inputs]
+        with self._embed_lock:
+            return self.embedding.embed_array(texts)
+
+
+class _OpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; without TCP_NODELAY kept-alive
+    # connections stall on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server._counter_lock:
+            self.server.connections += 1
+
+    def _send_json(self, status: int, payload: dict, headers: dict = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+
+        path = self.path.rstrip("/")
+        if path not in ("/v1/embeddings", "/v1/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found", "type": "invalid_request_error"}})
+            return
+
+        with server._counter_lock:
+            server.requests += 1
+
+        if server.bucket is not None:
+            wait = server.bucket.take()
+            if wait:
+                with server._counter_lock:
+                    server.rate_limited += 1
+                self._send_json(
+                    429,
+                    {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+                    {"Retry-After": f"{wait:.3f}"}
+                )
+                return
+
+        if server.latency:
+            time.sleep(server.latency)
+
+        if path == "/v1/chat/completions":
+            self._chat_completion(request)
+            return
+
+        inputs = request.get("input", [])
+        if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+            inputs = [inputs]
+        vectors = server.embed(inputs)
+        with server._counter_lock:
+            server.inputs += len(inputs)
+
+        as_base64 = request.get("encoding_format") == "base64"
+        data = [
+            {
+                "object": "embedding",
+                "index": i,
+                "embedding": base64.b64encode(v.astype("<f4").tobytes()).decode("ascii") if as_base64 else v.tolist()
+            }
+            for i, v in enumerate(vectors)
+        ]
+        self._send_json(200, {
+            "object": "list",
+            "data": data,
+            "model": request.get("model", "stub"),
+            "usage": {"prompt_tokens": 0, "total_tokens": 0}
+        })
+
+    def _chat_completion(self, request: dict) -> None:
+        answer = self.server.answer
+        created = int(time.time())
+        model = request.get("model", "stub")
+        usage = {"prompt_tokens": 10, "completion_tokens": len(answer.split()), "total_tokens": 10 + len(answer.split())}
+
+        if not request.get("stream"):
+            self._send_json(200, {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": answer},
+                    "finish_reason": "stop"
+                }],
+                "usage": usage
+            })
+            return
+
+        def chunk(delta: dict, finish_reason=None, chunk_usage=None) -> bytes:
+            payload = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}] if delta is not None else [],
+                "usage": chunk_usage
+            }
+            return f"data: {json.dumps(payload)}\n\n".encode("utf-8")
+
+        events = [chunk({"role": "assistant", "content": ""})]
+        events += [chunk({"content": word + " "}) for word in answer.split()]
+        events.append(chunk({}, "stop"))
+        if (request.get("stream_options") or {}).get("include_usage"):
+            events.append(chunk(None, chunk_usage=usage))
+        events.append(b"data: [DONE]\n\n")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        # One write, so the terminating chunk arrives with [DONE]; clients that stop
+        # reading at [DONE] can then return the connection to their pool
+        body = b"".join(f"{len(event):X}\r\n".encode("ascii") + event + b"\r\n" for event in events)
+        self.wfile.write(body + b"0\r\n\r\n")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Local OpenAI embeddings and chat stub")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--rps", type=float, default=0, help="Requests per second before 429s (0 = unlimited)")
+    parser.add_argument("--latency-ms", type=float, default=50)
+    args = parser.parse_args(argv)
+
+    server = StubOpenAIServer(args.port, args.dim, args.rps, args.latency_ms / 1000)
+    print(f"Stub OpenAI API on {server.base_url} (rps={args.rps or 'unlimited'}, latency={args.latency_ms}ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
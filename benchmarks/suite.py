@@ -0,0 +1,473 @@
+"""
+Offline benchmark suite for the assistant's hot paths
+
+Runs without network access: embeddings come from HashEmbeddings and the
+agent turn uses ScriptedChatModel. Results are written as JSON so runs from
+different commits can be compared.
+
+Usage:
+    python -m benchmarks.suite [--output bench.json] [--sizes 10,100,1000,10000,100000]
+                               [--brands 10,100,1000,10000] [--compare previous.json] [--quick]
+"""
+import argparse
+import contextlib
+import csv
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from benchmarks.fakes import HashEmbeddings, ScriptedChatModel
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000]
+QUICK_SIZES = [10, 100, 1000]
+DEFAULT_BRANDS = [10, 100, 1000, 10000]
+QUICK_BRANDS = [10, 100]
+BENCH_API_KEY = "sk-benchmark-" + "0" * 40
+
+ITEM_TYPES = ["sneakers", "boots", "jacket", "hoodie", "trousers"]
+CONDITIONS = ["new", "excellent", "good", "fair"]
+
+
+def _percentiles(samples: List[float]) -> dict:
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    return {
+        "p50_ms": pick(0.5),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "mean_ms": statistics.fmean(ordered) * 1000
+    }
+
+
+def _time_calls(func: Callable, args_list: list) -> List[float]:
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        func(args)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _throughput(func: Callable, seconds: float) -> float:
+    """Calls per second of ``func`` over roughly ``seconds``"""
+    calls = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while True:
+        for _ in range(100):
+            func()
+        calls += 100
+        now = time.perf_counter()
+        if now >= deadline:
+            return calls / (now - start)
+
+
+@contextlib.contextmanager
+def _measure_memory():
+    """Yield a dict that receives the peak traced allocation (MiB) of the block"""
+    result = {}
+    tracemalloc.start()
+    try:
+        yield result
+    finally:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["peak_mib"] = peak / 2**20
+
+
+def _synthetic_corpus(size: int, words_per_chunk: int = 60, vocab: int = 20000, seed: int = 7) -> List[str]:
+    rng = np.random.default_rng(seed)
+    # Zipf-distributed word ids give a realistic long tail of rare terms
+    ids = np.minimum(rng.zipf(1.2, size=(size, words_per_chunk)), vocab) - 1
+    return [" ".join(f"w{i}" for i in row) for row in ids]
+
+
+def _build_retriever(texts: List[str], embedding: HashEmbeddings):
+    from retrieval.engine import RetrievalEngine
+    from retrieval.index_store import KnowledgeIndex
+    from retrieval.retriever import KnowledgeRetriever
+
+    vectors = embedding.embed_array(texts)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    index = KnowledgeIndex(
+        key=f"bench-{len(texts)}",
+        texts=texts,
+        metadatas=[{"source": "benchmark"}] * len(texts),
+        vectors=vectors / norms,
+        embedding=embedding
+    )
+    return KnowledgeRetriever(RetrievalEngine(index))
+
+
+def bench_initialize_agent(dim: int) -> dict:
+    """Index build/load, initialize_agent and one scripted agent turn"""
+    from langchain.agents import create_agent
+
+    from agent.agent_setup import create_tools, initialize_agent
+    from agent.async_runner import ToolTimeoutMiddleware
+    from agent.instrumentation import TracingMiddleware
+    from data.knowledge_base import load_documents
+    from retrieval.engine import RetrievalEngine
+    from retrieval.index_store import build_index, load_index
+    from retrieval.retriever import KnowledgeRetriever
+
+    embedding = HashEmbeddings(dim)
+    documents = load_documents()
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "index.bin")
+
+        with _measure_memory() as memory:
+            start = time.perf_counter()
+            built = build_index(documents, embedding, path)
+            results["index_build_s"] = time.perf_counter() - start
+        results["index_build_peak_mib"] = memory["peak_mib"]
+
+        with _measure_memory() as memory:
+            start = time.perf_counter()
+            index = load_index(path, expected_key=built.key, embedding=embedding)
+            vectorstore = KnowledgeRetriever(RetrievalEngine(index))
+            results["index_load_s"] = time.perf_counter() - start
+        results["index_load_peak_mib"] = memory["peak_mib"]
+        results["chunks"] = len(vectorstore)
+
+        with _measure_memory() as memory:
+            start = time.perf_counter()
+            tools = create_tools(vectorstore)
+            initialize_agent(BENCH_API_KEY, vectorstore=vectorstore, tools=tools)
+            results["initialize_agent_s"] = time.perf_counter() - start
+        results["initialize_agent_peak_mib"] = memory["peak_mib"]
+
+        agent = create_agent(
+            ScriptedChatModel(),
+            tools,
+            system_prompt="benchmark",
+            middleware=[TracingMiddleware(), ToolTimeoutMiddleware()]
+        )
+        messages = {"messages": [{"role": "user", "content": "Calculate profit: buy £200, sell £450"}]}
+        agent.invoke(messages)
+        samples = _time_calls(lambda _: agent.invoke(messages), range(20))
+        results["scripted_turn"] = _percentiles(samples)
+
+        # Drop memory-mapped views before the temporary directory is removed
+        del agent, tools, vectorstore, index, built
+
+    return results
+
+
+def bench_search(sizes: List[int], dim: int, queries: int = 200) -> Dict[str, dict]:
+    """search_knowledge_base latency as the knowledge base grows"""
+    from agent.agent_setup import create_tools
+
+    results = {}
+    for size in sizes:
+        embedding = HashEmbeddings(dim)
+        texts = _synthetic_corpus(size)
+
+        start = time.perf_counter()
+        retriever = _build_retriever(texts, embedding)
+        build_s = time.perf_counter() - start
+
+        search_tool = create_tools(retriever)[0]
+        rng = random.Random(size)
+        # Queries reuse corpus words so every search has real matches; all distinct to miss the cache
+        query_list = [" ".join(rng.sample(texts[rng.randrange(size)].split(), 4)) + f" q{i}" for i in range(queries)]
+
+        cold = _time_calls(lambda q: search_tool.invoke({"query": q}), query_list)
+        cached = _time_calls(lambda q: search_tool.invoke({"query": q}), query_list[:50])
+
+        stats = retriever.stats()
+        results[str(size)] = {
+            "build_s": build_s,
+            "backend": retriever.engine.backend,
+            "uncached": _percentiles(cold),
+            "cached": _percentiles(cached),
+            "lexical_fast_path": stats["lexical_fast_path"],
+            "embedding_calls": stats["embedding_calls"]
+        }
+        print(f"  search {size:>7} chunks: p50 {results[str(size)]['uncached']['p50_ms']:.2f} ms "
+              f"({results[str(size)]['backend']})", file=sys.stderr)
+    return results
+
+
+def _write_price_table(directory: str, brands: int) -> str:
+    path = os.path.join(directory, f"prices_{brands}.csv")
+    rng = random.Random(brands)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["brand", "item_type", "condition", "low", "high"])
+        for b in range(brands):
+            for item in ITEM_TYPES:
+                for condition in CONDITIONS:
+                    low = rng.randint(50, 800)
+                    writer.writerow([f"brand {b}", item, condition, low, low + rng.randint(50, 400)])
+    return path
+
+
+@contextlib.contextmanager
+def _using_price_store(store):
+    """Point the get_price_range tool at ``store`` for the duration of the block"""
+    import data.price_store as price_store
+
+    previous = price_store._store
+    price_store._store = store
+    try:
+        yield
+    finally:
+        price_store._store = previous
+
+
+def _write_guides(directory: str, brands: int) -> str:
+    """Guide directory with ``brands`` authentication guides, each with a few aliases"""
+    path = os.path.join(directory, f"guides_{brands}")
+    auth_dir = os.path.join(path, "authentication")
+    os.makedirs(auth_dir)
+    os.makedirs(os.path.join(path, "tutorials"))
+    for b in range(brands):
+        with open(os.path.join(auth_dir, f"brand_{b}.md"), "w", encoding="utf-8") as f:
+            f.write(
+                f"---\nbrand: Brand {b}\naliases: label {b}, brnd {b}, maison brand {b}\n---\n"
+                f"Check the labels of Brand {b}. Email {{email}} for help.\n"
+            )
+    with open(os.path.join(auth_dir, "general.md"), "w", encoding="utf-8") as f:
+        f.write("General checklist. Email {email} for help.\n")
+    return path
+
+
+@contextlib.contextmanager
+def _using_guide_registry(registry):
+    """Point the guide tools at ``registry`` for the duration of the block"""
+    import data.guides as guides
+
+    previous = guides._registry
+    guides._registry = registry
+    try:
+        yield
+    finally:
+        guides._registry = previous
+
+
+def bench_lookups(brand_counts: List[int], lookups: int = 2000) -> dict:
+    """get_price_range and check_authentication_tips latency as brand counts grow"""
+    from data.guides import GuideRegistry
+    from data.price_store import PriceStore
+    from tools import check_authentication_tips, get_price_range
+
+    price_results = {}
+    auth_results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for brands in brand_counts:
+            path = _write_price_table(tmp, brands)
+            start = time.perf_counter()
+            store = PriceStore(data_path=path, aliases_path=None)
+            load_s = time.perf_counter() - start
+
+            rng = random.Random(brands)
+            args = [
+                {"brand": f"brand {rng.randrange(brands)}", "item_type": rng.choice(ITEM_TYPES), "condition": "good"}
+                for _ in range(lookups)
+            ]
+            free_text = [
+                {"brand": f"vintage brand {rng.randrange(brands)} piece", "item_type": "leather jacket"}
+                for _ in range(lookups)
+            ]
+            with _using_price_store(store):
+                exact = _time_calls(get_price_range.invoke, args)
+                fuzzy = _time_calls(get_price_range.invoke, free_text)
+
+            price_results[str(brands)] = {
+                "rows": len(store),
+                "load_s": load_s,
+                "exact": _percentiles(exact),
+                "free_text": _percentiles(fuzzy)
+            }
+
+            guides_path = _write_guides(tmp, brands)
+            start = time.perf_counter()
+            registry = GuideRegistry(directory=guides_path)
+            load_s = time.perf_counter() - start
+
+            # Single brands, collaborations of two, and misses
+            def auth_query(i: int) -> str:
+                if i % 3 == 0:
+                    return f"brnd {rng.randrange(brands)}"
+                if i % 3 == 1:
+                    return f"maison brand {rng.randrange(brands)} x label {rng.randrange(brands)} jacket"
+                return "some unknown designer"
+
+            auth_args = [{"brand": auth_query(i)} for i in range(lookups)]
+            with _using_guide_registry(registry):
+                auth = _time_calls(check_authentication_tips.invoke, auth_args)
+
+            auth_results[str(brands)] = {
+                "guides": len(registry.auth_guides),
+                "load_s": load_s,
+                "lookup": _percentiles(auth)
+            }
+
+    return {"get_price_range": price_results, "check_authentication_tips": auth_results}
+
+
+def bench_profit(seconds: float) -> dict:
+    """calculate_profit throughput through the tool interface and the batch engine"""
+    from tools import calculate_profit
+    from tools.batch_profit import calculate_profit_batch
+
+    args = {"purchase_price": 200, "selling_price": 450, "platform": "ebay"}
+    tool_rate = _throughput(lambda: calculate_profit.invoke(args), seconds)
+    direct_rate = _throughput(lambda: calculate_profit.func(200, 450, "ebay"), seconds)
+
+    rng = np.random.default_rng(1)
+    n = 100_000
+    purchase = rng.uniform(20, 800, n)
+    selling = purchase * rng.uniform(0.8, 3.0, n)
+    start = time.perf_counter()
+    calculate_profit_batch(purchase, selling, "grailed")
+    batch_s = time.perf_counter() - start
+
+    return {
+        "tool_calls_per_sec": tool_rate,
+        "direct_calls_per_sec": direct_rate,
+        "batch_items_per_sec": n / batch_s
+    }
+
+
+def bench_rate_limiter(seconds: float) -> dict:
+    """RateLimiter.check_limit throughput on the in-memory backend"""
+    from benchmarks.bench_rate_limiter import run
+    from utils.rate_limiter import MemoryBackend
+
+    return {
+        "single_thread": run(MemoryBackend(), threads=1, seconds=seconds),
+        "eight_threads_one_key": run(MemoryBackend(), threads=8, seconds=seconds)
+    }
+
+
+def _metadata() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count()
+    }
+
+
+def _flatten(data, prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in data.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(current: dict, baseline: dict, threshold: float = 0.10) -> List[str]:
+    """
+    Compare two result files.
+
+    Latency metrics (``_ms``/``_s``) regress when they grow, throughput
+    metrics (``_per_sec``) when they shrink, by more than ``threshold``.
+
+    Returns:
+        One line per metric that moved by more than ``threshold``
+    """
+    now, before = _flatten(current["results"]), _flatten(baseline["results"])
+    lines = []
+    for name in sorted(now.keys() & before.keys()):
+        old, new = before[name], now[name]
+        if old == 0:
+            continue
+        change = (new - old) / old
+        if abs(change) < threshold:
+            continue
+        if name.endswith("_per_sec"):
+            verdict = "faster" if change > 0 else "REGRESSION"
+        elif name.endswith(("_ms", "_s")):
+            verdict = "faster" if change < 0 else "REGRESSION"
+        else:
+            continue
+        lines.append(f"{verdict:<10} {name}: {old:.4g} -> {new:.4g} ({change:+.0%})")
+    return lines
+
+
+def run(sizes: List[int], brands: List[int], dim: int = 256, seconds: float = 1.0) -> dict:
+    """Run every benchmark and return the JSON-ready report"""
+    results = {}
+    steps = [
+        ("initialize_agent", lambda: bench_initialize_agent(dim)),
+        ("search_knowledge_base", lambda: bench_search(sizes, dim)),
+        ("lookups", lambda: bench_lookups(brands)),
+        ("calculate_profit", lambda: bench_profit(seconds)),
+        ("rate_limiter", lambda: bench_rate_limiter(seconds))
+    ]
+    for name, step in steps:
+        print(f"Running {name}...", file=sys.stderr)
+        start = time.perf_counter()
+        results[name] = step()
+        print(f"  done in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    return {"meta": dict(_metadata(), sizes=sizes, brands=brands, embedding_dim=dim), "results": results}
+
+
+def _int_list(text: str) -> List[int]:
+    return [int(part) for part in text.split(",") if part.strip()]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the assistant's hot paths")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--sizes", type=_int_list, default=None, help="Knowledge base sizes (chunks)")
+    parser.add_argument("--brands", type=_int_list, default=None, help="Brand counts for lookup benchmarks")
+    parser.add_argument("--dim", type=int, default=256, help="Fake embedding dimension")
+    parser.add_argument("--seconds", type=float, default=1.0, help="Duration of each throughput run")
+    parser.add_argument("--compare", help="Previous result file to diff against")
+    parser.add_argument("--quick", action="store_true", help="Small sizes for a fast smoke run")
+    parser.add_argument("--with-logging", action="store_true", help="Keep INFO logging on during runs")
+    args = parser.parse_args(argv)
+
+    if not args.with_logging:
+        # Per-call INFO lines would otherwise dominate the console and the timings
+        logging.disable(logging.INFO)
+
+    sizes = args.sizes or (QUICK_SIZES if args.quick else DEFAULT_SIZES)
+    brands = args.brands or (QUICK_BRANDS if args.quick else DEFAULT_BRANDS)
+    report = run(sizes, brands, args.dim, args.seconds)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        lines = compare(report, baseline)
+        print(f"Compared with {args.compare} ({baseline['meta'].get('commit')}):")
+        print("\n".join(lines) if lines else "  no changes above 10%")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -5,24 +5,146 @@ Configuration settings for GrabyAI Assistant
 # Rate limiting
 RATE_LIMIT_REQUESTS = 10  # requests per time window
 RATE_LIMIT_WINDOW = 60  # seconds
+RATE_LIMIT_BACKEND = "memory"  # 'memory' (per process) or 'redis' (shared by all workers)
+RATE_LIMIT_REDIS_URL = "redis://localhost:6379/0"
+RATE_LIMIT_KEY_PREFIX = "grabyai:ratelimit"
 
 # Price validation
 MIN_PRICE = 1
 MAX_PRICE = 100000
 
+# Price data (CSV or Parquet, loaded on first lookup)
+PRICE_DATA_PATH = "data/prices.csv"
+PRICE_ALIASES_PATH = "data/price_aliases.csv"
+
+# Sold-price history (DuckDB; fill with `python -m data.sales_store ingest sales.csv`)
+SALES_DB_PATH = "data/sales.duckdb"
+SALES_WINDOW_DAYS = 365  # sales behind the median/p25/p75 quoted by get_price_range
+SALES_MIN_SAMPLES = 5  # thinner segments fall back to all conditions, then to PRICE_DATA_PATH
+SALES_RELOAD_INTERVAL = 60  # seconds between checks for newly ingested sales
+
+# Authentication guides and tutorials (markdown with front matter, loaded once)
+GUIDES_DIR = "data/guides"
+AUTH_MAX_BRANDS = 3  # brand guides returned when a query names several brands
+
 # Model configuration
 MODEL_NAME = "gpt-4o-mini"
 MODEL_TEMPERATURE = 0.7
 EMBEDDING_MODEL = "text-embedding-3-small"
 
+# HTTP client (one keep-alive pool shared by the chat model and embeddings)
+HTTP_MAX_CONNECTIONS = 20  # per pool; further requests wait up to HTTP_POOL_TIMEOUT
+HTTP_MAX_KEEPALIVE = 10  # idle connections kept open
+HTTP_KEEPALIVE_EXPIRY = 30.0  # seconds an idle connection is kept
+HTTP_HTTP2 = True  # used when the h2 package is installed
+HTTP_CONNECT_TIMEOUT = 5.0
+HTTP_READ_TIMEOUT = 60.0
+HTTP_WRITE_TIMEOUT = 10.0
+HTTP_POOL_TIMEOUT = 10.0
+
+# Agent execution
+AGENT_EXECUTION_MODE = "async"  # 'async' runs a turn's tool calls concurrently, 'sync' one thread
+TOOL_TIMEOUT = 20  # seconds per tool call
+TOOL_TIMEOUTS = {"search_knowledge_base": 10}  # per-tool overrides
+TOOL_MAX_WORKERS = 8  # threads running sync tool calls; a queued call's wait counts toward its timeout
+
 # RAG configuration
 CHUNK_SIZE = 1500
 CHUNK_OVERLAP = 300
 SIMILARITY_SEARCH_K = 3
+KB_DIR = "data/kb"  # knowledge base source files
+KB_FILE_EXTENSIONS = (".md", ".markdown", ".txt")
+KB_WATCH = False  # hot-reload the index when files in KB_DIR change (needs watchfiles)
+KB_WATCH_DEBOUNCE_MS = 1500
+INDEX_PATH = "data/knowledge_index.bin"  # prebuilt index (python -m retrieval.build_index)
+
+# Embedding ingestion
+EMBED_BATCH_SIZE = 128  # chunks per embeddings request
+EMBED_MAX_CONCURRENCY = 4  # requests in flight; halved on every 429, regrown on success
+EMBED_MAX_RETRIES = 6
+EMBED_BACKOFF_BASE = 1.0  # seconds, doubled per retry (Retry-After wins when sent)
+EMBED_BACKOFF_MAX = 60.0
+
+# Retrieval engine
+HNSW_MIN_CORPUS = 20000  # chunks; smaller corpora use exact NumPy search
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+
+# Hybrid retrieval
+RETRIEVAL_MODE = "hybrid"  # 'vector', 'bm25' or 'hybrid'
+HYBRID_CANDIDATES = 20  # results taken from each ranking before fusion
+RRF_K = 60  # reciprocal rank fusion constant
+BM25_K1 = 1.5
+BM25_B = 0.75
+BM25_FAST_PATH_MIN_SCORE = 4.0  # skip the embedding call when the top BM25 hit
+BM25_FAST_PATH_RATIO = 1.5  # scores this high and beats the runner-up by this factor
+
+# Query cache
+QUERY_CACHE_SIZE = 512  # entries
+QUERY_CACHE_TTL = 3600  # seconds
+QUERY_CACHE_SIMILARITY = 0.95  # cosine similarity for a semantic hit
+
+# Bulk listing scoring (python -m pipeline)
+PIPELINE_CHUNK_SIZE = 1000  # listings per task sent to a worker process
+PIPELINE_MIN_MARGIN = 30  # % margin for a listing to be written as an opportunity
+PIPELINE_PLATFORM = "grailed"  # resale platform whose fees are applied
+
+# Request coalescing (identical in-flight query embeddings and context-free chat turns share one upstream call)
+SINGLE_FLIGHT_ENABLED = True
+SINGLE_FLIGHT_WAIT_TIMEOUT = 120.0  # seconds a follower waits on a stuck leader before calling upstream itself
+
+# Conversation memory
+HISTORY_MAX_TOKENS = 3000  # budget for recent messages sent verbatim with each prompt
+HISTORY_RECENT_TURNS = 6  # user/assistant turns kept verbatim; older ones are summarized
+HISTORY_SUMMARY_MAX_TOKENS = 400
+CHAT_RENDER_WINDOW = 20  # messages rendered per rerun; older ones are paged in on demand
+
+# Answer cache (final agent answers, keyed on prompt, model, temperature and index version)
+ANSWER_CACHE_SIZE = 256  # entries; 0 disables the cache
+ANSWER_CACHE_TTL = 24 * 3600  # seconds
+ANSWER_CACHE_SIMILARITY = 0.9  # character-trigram Jaccard for a near-duplicate hit
+ANSWER_CACHE_DIR = None  # e.g. ".answer_cache" to persist answers with diskcache
+ANSWER_CACHE_WARM_UP = True  # precompute EXAMPLE_QUESTIONS answers at startup
+EXAMPLE_QUESTIONS = [
+    "How does Graby AI work?",
+    "How do I authenticate Margiela?",
+    "Calculate profit: buy £200, sell £450",
+    "What do Rick Owens jackets sell for?",
+    "Tips for listing photos?",
+]
 
 # Logging
 LOG_FILE = "grabyai_assistant.log"
 LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+LOG_MODE = "queue"  # 'queue' (background writer thread) or 'sync'
+LOG_JSON = True  # JSON lines in LOG_FILE; the console stays human-readable
+LOG_ROTATION = "size"  # 'size', 'time' or 'none'
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+LOG_ROTATE_WHEN = "midnight"  # TimedRotatingFileHandler interval when LOG_ROTATION = 'time'
+LOG_SAMPLE_RATES = {
+    # Fraction of INFO records kept per module; warnings and errors are never sampled.
+    # Both log every request. Their counts stay exact in /metrics: router hits and
+    # misses in router_requests, profit calculations in the tool.calculate_profit
+    # span (agent) and router_requests{intent="profit"} (router).
+    "agent.router": 0.2,
+    "tools.profit_calculator": 0.2
+}
+
+# Tracing
+TRACING_ENABLED = True
+TRACE_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]  # seconds
+TRACE_WINDOW = 1000  # recent samples per span used for p50/p95/p99
+TRACE_SLOW_TURN = 10.0  # seconds; slower root spans are logged with their span tree
+METRICS_PORT = None  # e.g. 9100 to serve Prometheus /metrics alongside the app
+
+# HTTP API server (python -m server)
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8000
+SERVER_WORKERS = 2  # processes; they share the memory-mapped index via the page cache
+SERVER_RATE_LIMIT = True  # per-key limit on /chat (use RATE_LIMIT_BACKEND = "redis" with several workers)
+API_BASE_URL = None  # e.g. "http://127.0.0.1:8000" to run app.py as a thin client of the API server
 
 # Platform info
 PLATFORM_NAME = "Graby AI"
@@ -0,0 +1,306 @@
+"""
+Authentication guides and platform tutorials
+
+Guides are markdown files under GUIDES_DIR with a small front-matter header:
+
+    ---
+    brand: Maison Margiela
+    aliases: margiela, maison margiela, mmm, margela
+    ---
+    ...guide text, may use {email}, {support_email}, {platform}...
+
+They are read and rendered once into a registry. Brand names in free text
+are resolved by an Aho-Corasick automaton over every alias (misspellings
+included), so one pass over the text finds all mentioned brands no matter
+how many guides exist. Simple plurals of aliases ("margielas") match too.
+Matches are ranked by specificity: longer aliases first, then earlier
+mentions.
+
+A guide that can't be read or rendered is skipped; if the general checklist
+or the tutorial overview is missing, the built-in fallbacks below are used.
+"""
+import os
+import threading
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from config.settings import (
+    GUIDES_DIR,
+    AUTH_MAX_BRANDS,
+    WHATSAPP_GROUP_EMAIL,
+    SUPPORT_EMAIL,
+    PLATFORM_NAME
+)
+from data.price_store import normalize_name
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+AUTH_SUBDIR = "authentication"
+TUTORIAL_SUBDIR = "tutorials"
+GENERAL_GUIDE = "general"
+DEFAULT_TUTORIAL = "overview"
+
+# Used when the guide files are missing or can't be loaded
+FALLBACK_AUTH_GUIDE = f"""
+🔍 **Universal Authentication Checklist**
+
+1. Check labels and tags
+2. Verify construction quality
+3. Review seller profile
+4. Analyze description
+5. Check seller location
+6. Combine all factors
+
+📧 **Email {WHATSAPP_GROUP_EMAIL} to join our WhatsApp group** for expert authentication help!
+"""
+FALLBACK_TUTORIAL = f"""
+📚 **{PLATFORM_NAME} Platform Tutorial - Overview**
+
+Quick Start Steps:
+1️⃣ Browse opportunities
+2️⃣ Evaluate profit & authenticity
+3️⃣ Purchase from eBay UK
+4️⃣ Verify on arrival
+5️⃣ List for resale
+6️⃣ Ship & profit!
+
+Ask about specific steps for detailed guidance!
+"""
+
+
+@dataclass(frozen=True)
+class BrandMatch:
+    """One brand mention found in free text"""
+    brand: str
+    alias: str
+    start: int
+    end: int
+
+
+def _plurals(alias: str) -> List[str]:
+    """The alias and its simple plural ('margiela' -> 'margielas', 'gucci' -> 'guccis')"""
+    if alias.endswith("s"):
+        return [alias, alias + "es"]
+    return [alias, alias + "s"]
+
+
+class BrandMatcher:
+    """Aho-Corasick automaton matching whole-word aliases in normalized text"""
+
+    def __init__(self, aliases: Dict[str, str]):
+        """
+        Args:
+            aliases: Alias -> brand key (aliases are normalized here)
+        """
+        # Trie as parallel lists: goto transitions, failure links, outputs
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[str, int]]] = [[]]
+
+        for alias, brand in aliases.items():
+            normalized = normalize_name(alias)
+            if not normalized:
+                continue
+            # Padding with spaces makes every match a whole-word match
+            for variant in {normalized, normalized.replace(" ", "")}:
+                for form in _plurals(variant):
+                    self._add(f" {form} ", brand)
+        self._build()
+
+    def __len__(self) -> int:
+        return len(self._goto)
+
+    def _add(self, pattern: str, brand: str) -> None:
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = next_node
+        self._out[node].append((brand, len(pattern)))
+
+    def _build(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def find_all(self, text: str) -> List[BrandMatch]:
+        """Every alias occurrence in ``text`` (positions refer to the normalized text)"""
+        normalized = f" {normalize_name(text)} "
+        matches = []
+        node = 0
+        for i, char in enumerate(normalized):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for brand, length in self._out[node]:
+                start = i - length + 1
+                # Offsets without the padding spaces
+                matches.append(BrandMatch(brand, normalized[start + 1:i], start, i - 1))
+        return matches
+
+    def match(self, text: str) -> List[str]:
+        """
+        Brands mentioned in ``text``, most specific first.
+
+        A mention inside a longer alias of another brand (e.g. a short alias
+        that is part of a collaboration name) is dropped in favour of the
+        longer one.
+
+        Returns:
+            Distinct brand keys ranked by alias length, then position
+        """
+        found = sorted(self.find_all(text), key=lambda m: (-(m.end - m.start), m.start))
+        kept: List[BrandMatch] = []
+        for m in found:
+            if any(k.start <= m.start and m.end <= k.end and k.brand != m.brand for k in kept):
+                continue
+            kept.append(m)
+
+        brands = []
+        for m in kept:
+            if m.brand not in brands:
+                brands.append(m.brand)
+        return brands
+
+
+def _parse_guide(path: str) -> Tuple[Dict[str, str], str]:
+    """Split a guide file into its front-matter fields and body"""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+
+    meta: Dict[str, str] = {}
+    if text.startswith("---\n"):
+        header, _, text = text[4:].partition("\n---\n")
+        for line in header.splitlines():
+            key, _, value = line.partition(":")
+            if key.strip():
+                meta[key.strip().lower()] = value.strip()
+    return meta, text
+
+
+def _aliases(meta: Dict[str, str], key: str) -> List[str]:
+    aliases = [a.strip() for a in meta.get("aliases", "").split(",") if a.strip()]
+    return [key.replace("_", " ")] + aliases
+
+
+class _Placeholders(dict):
+    def __missing__(self, key):
+        return "{" + key + "}"
+
+
+class GuideRegistry:
+    """Authentication guides and tutorials loaded once from GUIDES_DIR"""
+
+    def __init__(self, directory: str = GUIDES_DIR, max_brands: int = AUTH_MAX_BRANDS):
+        """
+        Args:
+            directory: Directory with 'authentication' and 'tutorials' subdirectories
+            max_brands: Most brand guides returned for one query
+        """
+        self.directory = directory
+        self.max_brands = max_brands
+        placeholders = _Placeholders(email=WHATSAPP_GROUP_EMAIL, support_email=SUPPORT_EMAIL, platform=PLATFORM_NAME)
+
+        self.auth_guides: Dict[str, str] = {}
+        self.brand_names: Dict[str, str] = {}
+        brand_aliases: Dict[str, str] = {}
+        for key, meta, body in self._read(AUTH_SUBDIR, placeholders):
+            self.auth_guides[key] = body
+            self.brand_names[key] = meta.get("brand", key)
+            if key != GENERAL_GUIDE:
+                for alias in _aliases(meta, key):
+                    brand_aliases[alias] = key
+
+        self.tutorials: Dict[str, str] = {}
+        self._tutorial_aliases: Dict[str, str] = {}
+        for key, meta, body in self._read(TUTORIAL_SUBDIR, placeholders):
+            self.tutorials[key] = body
+            for alias in _aliases(meta, key):
+                self._tutorial_aliases[normalize_name(alias)] = key
+
+        self.matcher = BrandMatcher(brand_aliases)
+        self.vocabulary = frozenset(word for alias in brand_aliases for word in normalize_name(alias).split())
+        self._combined = lru_cache(maxsize=1024)(self._combine)
+
+        logger.info(
+            f"Loaded {len(self.auth_guides)} authentication guides ({len(brand_aliases)} aliases) "
+            f"and {len(self.tutorials)} tutorials"
+        )
+
+    def _read(self, subdir: str, placeholders: dict):
+        """(key, front matter, rendered body) of every readable guide in ``subdir``"""
+        path = os.path.join(self.directory, subdir)
+        if not os.path.isdir(path):
+            logger.warning(f"Guide directory not found: {path}")
+            return
+        for name in sorted(os.listdir(path)):
+            if not name.endswith(".md"):
+                continue
+            try:
+                meta, body = _parse_guide(os.path.join(path, name))
+                body = body.format_map(placeholders)
+            except (OSError, UnicodeDecodeError, ValueError, IndexError) as e:
+                logger.error(f"Error reading guide {name}: {str(e)}")
+                continue
+            yield os.path.splitext(name)[0], meta, body
+
+    def match_brands(self, text: str) -> List[str]:
+        """Guide keys of the brands mentioned in ``text``, most specific first"""
+        return self.matcher.match(text)[:self.max_brands]
+
+    def _combine(self, keys: Tuple[str, ...]) -> str:
+        return "\n---\n".join(self.auth_guides[k] for k in keys)
+
+    def authentication_guide(self, brand: str) -> str:
+        """
+        Guide text for the brand(s) in ``brand``.
+
+        Args:
+            brand: Free text naming one or more brands, or 'general'
+
+        Returns:
+            The matched brand guides (joined, most specific first), else the general checklist
+        """
+        keys = self.match_brands(brand)
+        if not keys:
+            return self.auth_guides.get(GENERAL_GUIDE, FALLBACK_AUTH_GUIDE)
+        if len(keys) == 1:
+            return self.auth_guides[keys[0]]
+        return self._combined(tuple(keys))
+
+    def tutorial(self, step: str) -> str:
+        """Tutorial section for ``step`` (name or alias), else the overview"""
+        key = self._tutorial_aliases.get(normalize_name(step))
+        if key is None:
+            key = DEFAULT_TUTORIAL
+        return self.tutorials.get(key) or self.tutorials.get(DEFAULT_TUTORIAL, FALLBACK_TUTORIAL)
+
+
+_registry: Optional[GuideRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_guide_registry() -> GuideRegistry:
+    """Return the process-wide guide registry, loading it on first use"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = GuideRegistry()
+    return _registry
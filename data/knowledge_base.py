@@ -1,20 +1,42 @@
 """
 GrabyAI platform knowledge base content
+
+The knowledge base is a directory of markdown files (KB_DIR, one topic per
+file). Add, edit or delete files there; only the chunks that changed are
+re-embedded on the next index build.
 """
+import os
+from typing import List
 
-KNOWLEDGE_BASE = """
-# GrabyAI Platform Comprehensive Guide
+from langchain_core.documents import Document
 
-## What is GrabyAI?
+from config.settings import KB_DIR, KB_FILE_EXTENSIONS
 
-GrabyAI is an advanced fashion arbitrage platform that uses artificial intelligence to identify underpriced designer items on eBay UK and matches them with historical pricing data from premium resale marketplaces (Grailed and Vestiaire Collective) to help users discover profitable resale opportunities.
 
-[... rest of your knowledge base content - I'll spare the full text here for brevity ...]
+def list_source_files(directory: str = KB_DIR) -> List[str]:
+    """Knowledge base files under ``directory``, as sorted relative paths"""
+    files = []
+    for root, _, names in os.walk(directory):
+        for name in names:
+            if name.endswith(KB_FILE_EXTENSIONS) and not name.startswith("."):
+                files.append(os.path.relpath(os.path.join(root, name), directory))
+    return sorted(files)
 
-"""
 
-# You can also break this into separate sections if preferred:
-PLATFORM_OVERVIEW = """..."""
-AUTHENTICATION_GUIDE = """..."""
-MARKET_INSIGHTS = """..."""
-# etc.
\ No newline at end of file
+def load_documents(directory: str = KB_DIR) -> List[Document]:
+    """
+    Read every knowledge base file.
+
+    Args:
+        directory: Knowledge base directory
+
+    Returns:
+        One document per file, with its relative path as metadata 'source'
+    """
+    documents = []
+    for relative_path in list_source_files(directory):
+        with open(os.path.join(directory, relative_path), encoding="utf-8") as f:
+            text = f.read()
+        if text.strip():
+            documents.append(Document(page_content=text, metadata={"source": relative_path}))
+    return documents
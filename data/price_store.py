@@ -0,0 +1,237 @@
+"""
+Indexed resale price store
+
+Price rows (brand, item type, condition, low, high) are loaded lazily from a
+CSV or Parquet file into packed NumPy arrays. Each row gets an integer key
+built from the brand, item and condition ids; keys are kept sorted so a
+lookup is a single binary search. Brand and item aliases are normalized into
+dictionaries once, so resolving user text never scans the whole table.
+"""
+import csv
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from config.settings import PRICE_DATA_PATH, PRICE_ALIASES_PATH
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+CONDITIONS = ("new", "excellent", "good", "fair")
+DEFAULT_CONDITION = "excellent"
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_MAX_ALIAS_WORDS = 4
+
+
+def normalize_name(text: str) -> str:
+    """Lowercase and collapse punctuation/whitespace to single spaces"""
+    return _NON_ALNUM.sub(" ", text.lower()).strip()
+
+
+def normalize_item(text: str) -> str:
+    """Normalize an item type and strip a plural 's' ('jackets' -> 'jacket')"""
+    words = normalize_name(text).split()
+    if words and len(words[-1]) > 3 and words[-1].endswith("s") and not words[-1].endswith("ss"):
+        words[-1] = words[-1][:-1]
+    return " ".join(words)
+
+
+@dataclass(frozen=True)
+class PriceRange:
+    """Resolved price range in GBP"""
+    brand: str
+    item_type: str
+    condition: str
+    low: float
+    high: float
+
+    def format(self) -> str:
+        return f"£{self.low:,.0f}-£{self.high:,.0f}"
+
+
+def _read_rows(path: str) -> Iterator[Dict[str, str]]:
+    """Yield rows from a CSV or Parquet file as dicts"""
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(path)
+        yield from table.to_pylist()
+        return
+
+    with open(path, newline="", encoding="utf-8") as f:
+        yield from csv.DictReader(f)
+
+
+def alias_table(ids: Dict[str, int], kind: str, aliases_path: Optional[str]) -> Dict[str, int]:
+    """
+    Map every known spelling of the ``kind`` names in ``ids`` to their id.
+
+    Canonical names are their own aliases (brands also without spaces); the
+    aliases file adds rows of ``kind`` whose canonical name is in ``ids``.
+    """
+    normalize = normalize_name if kind == "brand" else normalize_item
+    aliases = dict(ids)
+    if kind == "brand":
+        for name, name_id in ids.items():
+            aliases[name.replace(" ", "")] = name_id
+
+    if aliases_path and os.path.exists(aliases_path):
+        for row in _read_rows(aliases_path):
+            if row["kind"].strip() != kind:
+                continue
+            target = ids.get(normalize(row["canonical"]))
+            if target is not None:
+                aliases[normalize(row["alias"])] = target
+    return aliases
+
+
+def resolve_alias(text: str, aliases: Dict[str, int], normalize) -> Optional[int]:
+    """Exact alias hit, else the longest alias found as a word n-gram of ``text``"""
+    normalized = normalize(text)
+    if normalized in aliases:
+        return aliases[normalized]
+
+    words = normalize_name(text).split()
+    for size in range(min(_MAX_ALIAS_WORDS, len(words)), 0, -1):
+        for start in range(len(words) - size + 1):
+            candidate = normalize(" ".join(words[start:start + size]))
+            if candidate in aliases:
+                return aliases[candidate]
+    return None
+
+
+class PriceStore:
+    """Packed, alias-indexed price table"""
+
+    def __init__(self, data_path: str = PRICE_DATA_PATH, aliases_path: str = PRICE_ALIASES_PATH):
+        self.data_path = data_path
+        self.aliases_path = aliases_path
+
+        self.brands: List[str] = []
+        self.items: List[str] = []
+        self.item_labels: List[str] = []
+        self._brand_ids: Dict[str, int] = {}
+        self._item_ids: Dict[str, int] = {}
+        self._condition_ids = {c: i for i, c in enumerate(CONDITIONS)}
+
+        self._keys = np.empty(0, dtype=np.int64)
+        self._low = np.empty(0, dtype=np.float32)
+        self._high = np.empty(0, dtype=np.float32)
+
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _key(self, brand_id, item_id, condition_id):
+        return (np.int64(brand_id) << 32) | (np.int64(item_id) << 8) | np.int64(condition_id)
+
+    def _intern(self, table: Dict[str, int], names: List[str], name: str) -> int:
+        if name not in table:
+            table[name] = len(names)
+            names.append(name)
+        return table[name]
+
+    def _load(self) -> None:
+        keys, low, high = [], [], []
+
+        for row in _read_rows(self.data_path):
+            condition = normalize_name(str(row["condition"]))
+            if condition not in self._condition_ids:
+                logger.warning(f"Skipping price row with unknown condition: {condition}")
+                continue
+            brand_id = self._intern(self._brand_ids, self.brands, normalize_name(str(row["brand"])))
+            item_id = self._intern(self._item_ids, self.items, normalize_item(str(row["item_type"])))
+            if item_id == len(self.item_labels):
+                self.item_labels.append(normalize_name(str(row["item_type"])))
+            keys.append(self._key(brand_id, item_id, self._condition_ids[condition]))
+            low.append(float(row["low"]))
+            high.append(float(row["high"]))
+
+        order = np.argsort(np.array(keys, dtype=np.int64), kind="stable")
+        self._keys = np.array(keys, dtype=np.int64)[order]
+        self._low = np.array(low, dtype=np.float32)[order]
+        self._high = np.array(high, dtype=np.float32)[order]
+
+        self._brand_aliases = alias_table(self._brand_ids, "brand", self.aliases_path)
+        self._item_aliases = alias_table(self._item_ids, "item", self.aliases_path)
+        # Words of every brand and item alias, to tell whether a phrase names only known things
+        self.vocabulary = frozenset(
+            word for aliases in (self._brand_aliases, self._item_aliases) for alias in aliases for word in alias.split()
+        )
+
+        logger.info(
+            f"Loaded {len(self._keys)} price rows "
+            f"({len(self.brands)} brands, {len(self.items)} item types)"
+        )
+
+    def resolve_brand(self, text: str) -> Optional[str]:
+        """Canonical brand name for free text, or None"""
+        brand_id = resolve_alias(text, self._brand_aliases, normalize_name)
+        return None if brand_id is None else self.brands[brand_id]
+
+    def resolve_item(self, text: str) -> Optional[str]:
+        """Canonical item type for free text, or None"""
+        item_id = resolve_alias(text, self._item_aliases, normalize_item)
+        return None if item_id is None else self.item_labels[item_id]
+
+    def _find(self, brand_id: int, item_id: int, condition_id: int) -> Optional[int]:
+        key = self._key(brand_id, item_id, condition_id)
+        pos = int(np.searchsorted(self._keys, key))
+        if pos < len(self._keys) and self._keys[pos] == key:
+            return pos
+        return None
+
+    def lookup(self, brand: str, item_type: str, condition: str = DEFAULT_CONDITION) -> Optional[PriceRange]:
+        """
+        Look up a price range.
+
+        Args:
+            brand: Brand name or alias (free text)
+            item_type: Item type or alias (free text)
+            condition: Item condition, falls back to 'excellent' when missing
+
+        Returns:
+            PriceRange, or None if the brand/item combination is unknown
+        """
+        brand_id = resolve_alias(brand, self._brand_aliases, normalize_name)
+        item_id = resolve_alias(item_type, self._item_aliases, normalize_item)
+        if brand_id is None or item_id is None:
+            return None
+
+        condition = normalize_name(condition)
+        pos = None
+        if condition in self._condition_ids:
+            pos = self._find(brand_id, item_id, self._condition_ids[condition])
+        if pos is None:
+            condition = DEFAULT_CONDITION
+            pos = self._find(brand_id, item_id, self._condition_ids[condition])
+        if pos is None:
+            return None
+
+        return PriceRange(
+            brand=self.brands[brand_id],
+            item_type=self.item_labels[item_id],
+            condition=condition,
+            low=float(self._low[pos]),
+            high=float(self._high[pos])
+        )
+
+
+_store: Optional[PriceStore] = None
+_store_lock = threading.Lock()
+
+
+def get_price_store() -> PriceStore:
+    """Return the process-wide price store, loading it on first use"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = PriceStore()
+    return _store
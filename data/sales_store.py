@@ -0,0 +1,558 @@
+"""
+Sold-price history store
+
+Individual sales (brand, item type, condition, platform, price in GBP, sale
+date) are appended to a DuckDB table in bulk from CSV or Parquet files, or
+from Python records. Names are normalized the same way as the price table,
+and each batch is written sorted by segment, so DuckDB's zone maps keep
+per-segment scans short.
+
+After every ingest, per-segment aggregates are precomputed in one pass:
+median/p25/p75 over the last SALES_WINDOW_DAYS, 30- and 90-day medians with
+their change against the previous window, sample counts, the last sale
+date and the platforms sold on. Each segment is (brand, item type,
+condition), plus an all-conditions rollup per brand and item.
+
+Serving processes open the database read-only, copy the aggregates into a
+dict and close it again, so a lookup never touches DuckDB. They also never
+hold the file lock, and an ingest can run while the app serves. Newly
+ingested data is picked up within SALES_RELOAD_INTERVAL. Ad-hoc questions
+(one platform, a custom window) go to ``query``, which scans the raw
+sales.
+
+Usage:
+    python -m data.sales_store ingest sales.csv [more.parquet ...] [--as-of 2026-01-31]
+    python -m data.sales_store refresh [--as-of 2026-01-31]
+    python -m data.sales_store query "rick owens" sneakers [--condition good] [--platform grailed] [--days 90]
+"""
+import argparse
+import datetime
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from config.settings import (
+    SALES_DB_PATH,
+    SALES_WINDOW_DAYS,
+    SALES_MIN_SAMPLES,
+    SALES_RELOAD_INTERVAL,
+    PRICE_ALIASES_PATH
+)
+from data.price_store import (
+    CONDITIONS,
+    DEFAULT_CONDITION,
+    alias_table,
+    normalize_item,
+    normalize_name,
+    resolve_alias
+)
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Imported on first use, so importing the store (e.g. via the price tool or
+# the router in client mode) doesn't load DuckDB
+duckdb = None
+
+
+def _load_duckdb():
+    """The duckdb module, or None when it isn't installed"""
+    global duckdb
+    if duckdb is None:
+        try:
+            import duckdb as module
+        except ImportError:  # pragma: no cover - duckdb is optional
+            return None
+        duckdb = module
+    return duckdb
+
+ALL_CONDITIONS = "all"
+COLUMNS = ("brand", "item_type", "condition", "platform", "price", "sold_at")
+
+# Same rules as normalize_name / normalize_item, evaluated inside DuckDB
+_MACROS = [
+    r"CREATE OR REPLACE TEMP MACRO norm_name(x) AS trim(regexp_replace(lower(CAST(x AS VARCHAR)), '[^a-z0-9]+', ' ', 'g'))",
+    r"CREATE OR REPLACE TEMP MACRO norm_item(x) AS regexp_replace(norm_name(x), '([a-z0-9]{2}[a-rt-z0-9])s$', '\1')"
+]
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS sales (
+        brand VARCHAR NOT NULL,
+        item_type VARCHAR NOT NULL,
+        condition VARCHAR NOT NULL,
+        platform VARCHAR NOT NULL,
+        price DOUBLE NOT NULL,
+        sold_at DATE NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS sales_meta (
+        as_of DATE,
+        window_days INTEGER,
+        refreshed_at TIMESTAMP,
+        rows BIGINT
+    )
+    """
+]
+
+# Headline quartiles over the window, medians of the last and previous 30/90 days
+_STATS = """
+    count(*) FILTER (WHERE sold_at > $as_of - $window) AS sales,
+    quantile_cont(price, [0.25, 0.5, 0.75]) FILTER (WHERE sold_at > $as_of - $window) AS quartiles,
+    count(*) FILTER (WHERE sold_at > $as_of - 30) AS sales_30,
+    median(price) FILTER (WHERE sold_at > $as_of - 30) AS median_30,
+    median(price) FILTER (WHERE sold_at > $as_of - 60 AND sold_at <= $as_of - 30) AS previous_30,
+    count(*) FILTER (WHERE sold_at > $as_of - 90) AS sales_90,
+    median(price) FILTER (WHERE sold_at > $as_of - 90) AS median_90,
+    median(price) FILTER (WHERE sold_at > $as_of - 180 AND sold_at <= $as_of - 90) AS previous_90,
+    max(sold_at) AS last_sold,
+    list(DISTINCT platform ORDER BY platform) FILTER (WHERE sold_at > $as_of - $window) AS platforms
+"""
+
+_AGGREGATES = f"""
+CREATE OR REPLACE TABLE segment_stats AS
+SELECT brand, item_type, coalesce(condition, '{ALL_CONDITIONS}') AS condition, {_STATS}
+FROM sales
+WHERE sold_at <= $as_of
+GROUP BY GROUPING SETS ((brand, item_type, condition), (brand, item_type))
+"""
+
+_VALID = "condition IN ({}) AND brand <> '' AND item_type <> '' AND price > 0 AND sold_at IS NOT NULL".format(
+    ", ".join(f"'{c}'" for c in CONDITIONS)
+)
+
+_SEGMENT_COLUMNS = (
+    "brand, item_type, condition, sales, quartiles, sales_30, median_30, previous_30, "
+    "sales_90, median_90, previous_90, last_sold, platforms"
+)
+
+
+def _change(current: Optional[float], previous: Optional[float]) -> Optional[float]:
+    if current is None or not previous:
+        return None
+    return current / previous - 1
+
+
+@dataclass(frozen=True)
+class SegmentStats:
+    """Sold-price statistics of one brand / item type / condition segment (GBP)"""
+    brand: str
+    item_type: str
+    condition: str
+    sales: int
+    p25: Optional[float]
+    median: Optional[float]
+    p75: Optional[float]
+    sales_30: int
+    median_30: Optional[float]
+    trend_30: Optional[float]
+    sales_90: int
+    median_90: Optional[float]
+    trend_90: Optional[float]
+    last_sold: Optional[datetime.date]
+    platforms: Tuple[str, ...]
+
+    @classmethod
+    def from_row(cls, row) -> "SegmentStats":
+        (brand, item_type, condition, sales, quartiles, sales_30, median_30, previous_30,
+         sales_90, median_90, previous_90, last_sold, platforms) = row
+        p25, median, p75 = quartiles if quartiles else (None, None, None)
+        return cls(
+            brand=brand,
+            item_type=item_type,
+            condition=condition,
+            sales=int(sales),
+            p25=p25,
+            median=median,
+            p75=p75,
+            sales_30=int(sales_30),
+            median_30=median_30,
+            trend_30=_change(median_30, previous_30),
+            sales_90=int(sales_90),
+            median_90=median_90,
+            trend_90=_change(median_90, previous_90),
+            last_sold=last_sold,
+            platforms=tuple(platforms or ())
+        )
+
+    def format_range(self) -> str:
+        return f"£{self.p25:,.0f}-£{self.p75:,.0f}"
+
+
+class SoldPriceStore:
+    """Append-only DuckDB table of sales with in-memory per-segment aggregates"""
+
+    def __init__(
+        self,
+        path: str = SALES_DB_PATH,
+        aliases_path: str = PRICE_ALIASES_PATH,
+        window_days: int = SALES_WINDOW_DAYS,
+        min_samples: int = SALES_MIN_SAMPLES,
+        reload_interval: float = SALES_RELOAD_INTERVAL
+    ):
+        """
+        Args:
+            path: DuckDB database file
+            aliases_path: Brand/item aliases CSV shared with the price table
+            window_days: Days of sales behind the median/p25/p75
+            min_samples: Fewest sales a segment needs to be quoted
+            reload_interval: Seconds between checks for a newer database file
+        """
+        self.path = path
+        self.aliases_path = aliases_path
+        self.window_days = window_days
+        self.min_samples = min_samples
+        self.reload_interval = reload_interval
+
+        # Swapped as one tuple so a lookup sees segments and aliases of the same load
+        self._state = ({}, {}, {}, [], [])
+        self.as_of: Optional[datetime.date] = None
+        self._mtime = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._state[0])
+
+    def _connect(self, read_only: bool = False):
+        if _load_duckdb() is None:
+            raise RuntimeError("duckdb is not installed")
+        connection = duckdb.connect(self.path, read_only=read_only)
+        for macro in _MACROS:
+            connection.execute(macro)
+        return connection
+
+    def ingest(
+        self,
+        source: Union[str, List[str], Iterable[dict]],
+        as_of: Optional[datetime.date] = None
+    ) -> Dict[str, int]:
+        """
+        Append sales and refresh the segment aggregates.
+
+        Args:
+            source: CSV/Parquet path(s) or glob, or records with the COLUMNS keys
+            as_of: Date the 30/90-day windows end on (default: today)
+
+        Returns:
+            Dict with rows read, rows appended and rows rejected (unknown
+            condition, missing fields or non-positive price)
+        """
+        start = time.perf_counter()
+        with self._connect() as connection:
+            for statement in _SCHEMA:
+                connection.execute(statement)
+            connection.execute(f"CREATE OR REPLACE TEMP TABLE batch AS {self._source_sql(connection, source)}")
+            read = connection.execute("SELECT count(*) FROM batch").fetchone()[0]
+            self._canonicalize(connection)
+            # Sorted by segment so each segment's rows sit in few row groups
+            appended = connection.execute(
+                f"INSERT INTO sales SELECT * FROM batch WHERE {_VALID} ORDER BY brand, item_type, condition, sold_at"
+            ).fetchone()[0]
+            connection.execute("DROP TABLE batch")
+            self._refresh(connection, as_of)
+
+        result = {"read": read, "appended": appended, "rejected": read - appended}
+        logger.info(
+            f"Ingested {appended} sales ({read - appended} rejected) in {time.perf_counter() - start:.2f}s"
+        )
+        self.load()
+        return result
+
+    def _source_sql(self, connection, source) -> str:
+        """SELECT producing normalized COLUMNS from ``source``"""
+        if isinstance(source, str):
+            source = [source]
+        if isinstance(source, (list, tuple)) and all(isinstance(p, str) for p in source):
+            quoted = ", ".join("'" + p.replace("'", "''") + "'" for p in source)
+            if all(p.endswith(".parquet") for p in source):
+                relation = f"read_parquet([{quoted}])"
+            else:
+                relation = f"read_csv([{quoted}], header = true)"
+        else:
+            import pyarrow as pa
+
+            # Everything as text; the SELECT below casts price and date
+            schema = pa.schema([(column, pa.string()) for column in COLUMNS])
+            records = [
+                {column: None if row.get(column) is None else str(row[column]) for column in COLUMNS}
+                for row in source
+            ]
+            connection.register("incoming", pa.Table.from_pylist(records, schema=schema))
+            relation = "incoming"
+
+        return f"""
+            SELECT
+                norm_name(brand) AS brand,
+                norm_item(item_type) AS item_type,
+                norm_name(condition) AS condition,
+                coalesce(norm_name(platform), '') AS platform,
+                TRY_CAST(price AS DOUBLE) AS price,
+                TRY_CAST(sold_at AS DATE) AS sold_at
+            FROM {relation}
+        """
+
+    def _canonicalize(self, connection) -> None:
+        """Store aliased names ('maison margiela', 'tabi boots') under their canonical name"""
+        if not self.aliases_path or not os.path.exists(self.aliases_path):
+            return
+        connection.execute(f"""
+            CREATE OR REPLACE TEMP TABLE aliases AS
+            SELECT kind, alias, canonical FROM (
+                SELECT trim(kind) AS kind,
+                       CASE WHEN trim(kind) = 'item' THEN norm_item(alias) ELSE norm_name(alias) END AS alias,
+                       CASE WHEN trim(kind) = 'item' THEN norm_item(canonical) ELSE norm_name(canonical) END AS canonical
+                FROM read_csv('{self.aliases_path.replace("'", "''")}', header = true, all_varchar = true)
+            )
+        """)
+        for kind, column in (("brand", "brand"), ("item", "item_type")):
+            connection.execute(f"""
+                UPDATE batch SET {column} = aliases.canonical
+                FROM aliases
+                WHERE aliases.kind = '{kind}' AND batch.{column} = aliases.alias
+            """)
+        connection.execute("DROP TABLE aliases")
+
+    def refresh(self, as_of: Optional[datetime.date] = None) -> None:
+        """Recompute the segment aggregates (e.g. daily, so the 30/90-day windows move)"""
+        with self._connect() as connection:
+            for statement in _SCHEMA:
+                connection.execute(statement)
+            self._refresh(connection, as_of)
+        self.load()
+
+    def _refresh(self, connection, as_of: Optional[datetime.date]) -> None:
+        as_of = as_of or datetime.date.today()
+        start = time.perf_counter()
+        connection.execute(_AGGREGATES, {"as_of": as_of, "window": self.window_days})
+        rows = connection.execute("SELECT count(*) FROM sales").fetchone()[0]
+        connection.execute("DELETE FROM sales_meta")
+        connection.execute(
+            "INSERT INTO sales_meta VALUES (?, ?, now(), ?)", [as_of, self.window_days, rows]
+        )
+        logger.info(
+            f"Refreshed sold-price aggregates over {rows} sales as of {as_of} "
+            f"in {time.perf_counter() - start:.2f}s"
+        )
+
+    def load(self) -> bool:
+        """
+        Copy the segment aggregates into memory.
+
+        Returns:
+            True if aggregates were loaded (False when the database is missing,
+            empty or locked by a running ingest)
+        """
+        if not os.path.exists(self.path) or _load_duckdb() is None:
+            return False
+        try:
+            mtime = os.path.getmtime(self.path)
+            with self._connect(read_only=True) as connection:
+                tables = {row[0] for row in connection.execute("SHOW TABLES").fetchall()}
+                if "segment_stats" not in tables:
+                    return False
+                rows = connection.execute(f"SELECT {_SEGMENT_COLUMNS} FROM segment_stats").fetchall()
+                meta = connection.execute("SELECT as_of FROM sales_meta").fetchone()
+        except duckdb.Error as e:
+            logger.warning(f"Sold-price store not loaded: {str(e)}")
+            return False
+
+        segments = {}
+        brand_ids: Dict[str, int] = {}
+        item_ids: Dict[str, int] = {}
+        brands: List[str] = []
+        items: List[str] = []
+        for row in rows:
+            stats = SegmentStats.from_row(row)
+            segments[(stats.brand, stats.item_type, stats.condition)] = stats
+            if stats.brand not in brand_ids:
+                brand_ids[stats.brand] = len(brands)
+                brands.append(stats.brand)
+            if stats.item_type not in item_ids:
+                item_ids[stats.item_type] = len(items)
+                items.append(stats.item_type)
+
+        brand_aliases = alias_table(brand_ids, "brand", self.aliases_path)
+        item_aliases = alias_table(item_ids, "item", self.aliases_path)
+        self._state = (segments, brand_aliases, item_aliases, brands, items)
+        self.as_of = meta[0] if meta else None
+        self._mtime = mtime
+        logger.info(f"Loaded {len(segments)} sold-price segments as of {self.as_of}")
+        return True
+
+    def _maybe_reload(self) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return
+        with self._lock:
+            if now - self._checked_at < self.reload_interval:
+                return
+            self._checked_at = now
+            try:
+                mtime = os.path.getmtime(self.path)
+            except OSError:
+                return
+            if mtime != self._mtime:
+                self.load()
+
+    def resolve_brand(self, text: str) -> Optional[str]:
+        """Canonical brand name with recorded sales for free text, or None"""
+        self._maybe_reload()
+        _, brand_aliases, _, brands, _ = self._state
+        brand_id = resolve_alias(text, brand_aliases, normalize_name)
+        return None if brand_id is None else brands[brand_id]
+
+    def resolve_item(self, text: str) -> Optional[str]:
+        """Canonical item type with recorded sales for free text, or None"""
+        self._maybe_reload()
+        _, _, item_aliases, _, items = self._state
+        item_id = resolve_alias(text, item_aliases, normalize_item)
+        return None if item_id is None else items[item_id]
+
+    def segment(self, brand: str, item_type: str, condition: str = DEFAULT_CONDITION) -> Optional[SegmentStats]:
+        """
+        Precomputed statistics for a brand and item type.
+
+        Args:
+            brand: Brand name or alias (free text)
+            item_type: Item type or alias (free text)
+            condition: Item condition; segments with fewer than ``min_samples``
+                sales fall back to the all-conditions rollup
+
+        Returns:
+            SegmentStats, or None when there are too few recorded sales
+        """
+        self._maybe_reload()
+        segments, brand_aliases, item_aliases, brands, items = self._state
+        if not segments:
+            return None
+
+        brand_id = resolve_alias(brand, brand_aliases, normalize_name)
+        item_id = resolve_alias(item_type, item_aliases, normalize_item)
+        if brand_id is None or item_id is None:
+            return None
+
+        for candidate in (normalize_name(condition), ALL_CONDITIONS):
+            stats = segments.get((brands[brand_id], items[item_id], candidate))
+            if stats is not None and stats.sales >= self.min_samples:
+                return stats
+        return None
+
+    def query(
+        self,
+        brand: str,
+        item_type: str,
+        condition: Optional[str] = None,
+        platform: Optional[str] = None,
+        days: Optional[int] = None,
+        as_of: Optional[datetime.date] = None
+    ) -> Optional[SegmentStats]:
+        """
+        Statistics computed from the raw sales, for filters the aggregates don't cover.
+
+        Args:
+            brand: Brand name or alias (free text)
+            item_type: Item type or alias (free text)
+            condition: Only this condition (default: all)
+            platform: Only sales on this platform
+            days: Window for the median/p25/p75 (default: ``window_days``)
+            as_of: Date the windows end on (default: the aggregates' date, else today)
+
+        Returns:
+            SegmentStats, or None if the brand/item is unknown or has no matching sales
+        """
+        brand_name = self.resolve_brand(brand)
+        item_name = self.resolve_item(item_type)
+        if brand_name is None or item_name is None:
+            return None
+
+        filters = ["brand = $brand", "item_type = $item"]
+        params = {
+            "brand": brand_name,
+            "item": item_name,
+            "as_of": as_of or self.as_of or datetime.date.today(),
+            "window": days or self.window_days
+        }
+        if condition:
+            filters.append("condition = $condition")
+            params["condition"] = normalize_name(condition)
+        if platform:
+            filters.append("platform = $platform")
+            params["platform"] = normalize_name(platform)
+
+        params["label"] = params.get("condition", ALL_CONDITIONS)
+        sql = (
+            f"SELECT brand, item_type, $label AS condition, {_STATS} FROM sales "
+            f"WHERE sold_at <= $as_of AND {' AND '.join(filters)} GROUP BY brand, item_type"
+        )
+        with self._connect(read_only=True) as connection:
+            row = connection.execute(sql, params).fetchone()
+        if row is None or not row[3]:
+            return None
+        return SegmentStats.from_row(row)
+
+
+_store: Optional[SoldPriceStore] = None
+_store_lock = threading.Lock()
+
+
+def get_sales_store() -> SoldPriceStore:
+    """Return the process-wide sold-price store, loading its aggregates on first use"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                store = SoldPriceStore()
+                store.load()
+                _store = store
+    return _store
+
+
+def _date(text: str) -> datetime.date:
+    return datetime.date.fromisoformat(text)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Sold-price history store")
+    parser.add_argument("--db", default=SALES_DB_PATH, help="DuckDB database file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="Append sales from CSV/Parquet files")
+    ingest.add_argument("paths", nargs="+")
+    ingest.add_argument("--as-of", type=_date, help="End date of the 30/90-day windows (default: today)")
+
+    refresh = commands.add_parser("refresh", help="Recompute the segment aggregates")
+    refresh.add_argument("--as-of", type=_date)
+
+    query = commands.add_parser("query", help="Statistics of one brand and item type")
+    query.add_argument("brand")
+    query.add_argument("item_type")
+    query.add_argument("--condition")
+    query.add_argument("--platform")
+    query.add_argument("--days", type=int)
+    args = parser.parse_args(argv)
+
+    store = SoldPriceStore(path=args.db)
+    if args.command == "ingest":
+        result = store.ingest(args.paths, as_of=args.as_of)
+        print(f"Appended {result['appended']} of {result['read']} rows ({result['rejected']} rejected); "
+              f"{len(store)} segments as of {store.as_of}")
+    elif args.command == "refresh":
+        store.refresh(as_of=args.as_of)
+        print(f"{len(store)} segments as of {store.as_of}")
+    else:
+        store.load()
+        stats = store.query(args.brand, args.item_type, args.condition, args.platform, args.days)
+        if stats is None:
+            print("No matching sales")
+            return 1
+        for field, value in stats.__dict__.items():
+            print(f"{field:>10}: {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
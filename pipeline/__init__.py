@@ -0,0 +1,6 @@
+"""
+Bulk listing scoring pipeline (``python -m pipeline``)
+"""
+from pipeline.scoring import ListingScorer, PipelineReport, read_listings, run_pipeline
+
+__all__ = ["ListingScorer", "PipelineReport", "read_listings", "run_pipeline"]
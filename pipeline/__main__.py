@@ -0,0 +1,52 @@
+"""
+Score a file of listings and write the resale opportunities
+
+Usage:
+    python -m pipeline listings.csv --output opportunities.csv [--workers 4] [--chunk-size 1000]
+                       [--platform grailed] [--min-margin 30] [--shipping 8] [--top 10]
+                       [--report report.json]
+"""
+import argparse
+import json
+import sys
+
+from config.settings import PIPELINE_CHUNK_SIZE, PIPELINE_MIN_MARGIN, PIPELINE_PLATFORM, SALES_DB_PATH
+from pipeline.scoring import run_pipeline
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Score marketplace listings as resale opportunities")
+    parser.add_argument("input", help="Listings as CSV or JSONL")
+    parser.add_argument("--output", required=True, help="Opportunities file (.csv or .jsonl)")
+    parser.add_argument("--workers", type=int, help="Scoring processes (default: CPU count, 0 = in process)")
+    parser.add_argument("--chunk-size", type=int, default=PIPELINE_CHUNK_SIZE)
+    parser.add_argument("--platform", default=PIPELINE_PLATFORM, help="Resale platform whose fees apply")
+    parser.add_argument("--min-margin", type=float, default=PIPELINE_MIN_MARGIN, help="Lowest margin (%%) to keep")
+    parser.add_argument("--shipping", type=float, help="Shipping to the buyer in GBP")
+    parser.add_argument("--sales-db", default=SALES_DB_PATH, help="Sold-price DuckDB file")
+    parser.add_argument("--top", type=int, default=10, help="Best opportunities listed in the report")
+    parser.add_argument("--report", help="Also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = run_pipeline(
+        args.input,
+        args.output,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        top=args.top,
+        platform=args.platform,
+        min_margin=args.min_margin,
+        shipping_cost=args.shipping,
+        sales_db_path=args.sales_db
+    )
+    sys.stdout.write(report.format())
+    print(f"Wrote {report.opportunities:,} opportunities to {args.output}")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({**report.__dict__, "listings_per_sec": report.listings_per_sec}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
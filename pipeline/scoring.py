@@ -0,0 +1,409 @@
+"""
+Bulk listing scoring
+
+Scores marketplace listings (e.g. an eBay UK export) as resale
+opportunities:
+
+    read      stream CSV/JSONL rows in chunks (main process, constant memory)
+    resolve   brand, item type and condition from the listing's fields or title
+    price     expected selling price: median sold price from the sold-price
+              store, else the midpoint of the reference range behind
+              get_price_range
+    profit    calculate_profit_batch, the vectorized calculate_profit fee logic
+    write     opportunities of each chunk, best first, as soon as the chunk is
+              scored (main process)
+
+Resolve, price and profit run in a process pool; each worker loads the price
+data once. Only a bounded number of chunks are in flight, so memory stays
+flat however large the input is.
+"""
+import csv
+import heapq
+import io
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from config.settings import (
+    PIPELINE_CHUNK_SIZE,
+    PIPELINE_MIN_MARGIN,
+    PIPELINE_PLATFORM,
+    PRICE_DATA_PATH,
+    PRICE_ALIASES_PATH,
+    SALES_DB_PATH
+)
+from data.price_store import CONDITIONS, DEFAULT_CONDITION, PriceStore, normalize_name
+from data.sales_store import SoldPriceStore
+from tools.batch_profit import DEFAULT_SHIPPING_COST, calculate_profit_batch
+from tools.profit_calculator import TIER_NAMES
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+STAGES = ("read", "resolve", "price", "profit", "write")
+
+OUTPUT_FIELDS = [
+    "id", "title", "brand", "item_type", "condition", "buy_price", "expected_sale", "price_source",
+    "sales", "platform", "platform_fees", "profit", "margin", "tier", "url"
+]
+
+# Listing condition wording that isn't one of CONDITIONS
+_CONDITION_WORDS = {
+    "new with tags": "new",
+    "new without tags": "new",
+    "bnwt": "new",
+    "unworn": "new",
+    "never worn": "new",
+    "unused": "new",
+    "like new": "excellent",
+    "mint": "excellent",
+    "very good": "excellent",
+    "pre owned": "good",
+    "used": "good",
+    "worn": "good",
+    "damaged": "fair"
+}
+
+# Matched as whole words, most specific first: longer phrases win ("like new"
+# over "new"), and a canonical condition wins a tie ("excellent used")
+_CONDITION_PHRASES = sorted(
+    [(condition, condition) for condition in CONDITIONS] + list(_CONDITION_WORDS.items()),
+    key=lambda item: -len(item[0].split())
+)
+
+
+def _number(value) -> Optional[float]:
+    text = str(value if value is not None else "").replace("£", "").replace(",", "").strip()
+    try:
+        return float(text) if text else None
+    except ValueError:
+        return None
+
+
+def read_listings(path: str, chunk_size: int = PIPELINE_CHUNK_SIZE) -> Iterator[List[dict]]:
+    """
+    Stream listings from a CSV or JSONL file in chunks.
+
+    Args:
+        path: .csv, .jsonl or .ndjson file
+        chunk_size: Listings per chunk
+
+    Yields:
+        Lists of at most ``chunk_size`` row dicts
+    """
+    jsonl = path.endswith((".jsonl", ".ndjson"))
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = (json.loads(line) for line in f if line.strip()) if jsonl else csv.DictReader(f)
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+class OpportunityWriter:
+    """Appends scored listings to a CSV or JSONL file, flushing after every chunk"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._jsonl = path.endswith((".jsonl", ".ndjson"))
+        self._csv = None if self._jsonl else csv.DictWriter(self._file, fieldnames=OUTPUT_FIELDS)
+        if self._csv is not None:
+            self._csv.writeheader()
+        self.rows = 0
+
+    def write(self, rows: List[dict]) -> None:
+        if self._jsonl:
+            self._file.write("".join(json.dumps(row) + "\n" for row in rows))
+        else:
+            self._csv.writerows(rows)
+        self._file.flush()
+        self.rows += len(rows)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ListingScorer:
+    """Resolves, prices and scores chunks of listings (one per worker process)"""
+
+    def __init__(
+        self,
+        platform: str = PIPELINE_PLATFORM,
+        min_margin: float = PIPELINE_MIN_MARGIN,
+        shipping_cost: Optional[float] = None,
+        price_data_path: str = PRICE_DATA_PATH,
+        aliases_path: str = PRICE_ALIASES_PATH,
+        sales_db_path: str = SALES_DB_PATH
+    ):
+        """
+        Args:
+            platform: Platform the items would be resold on (sets the fee rate)
+            min_margin: Lowest margin (%) written as an opportunity
+            shipping_cost: Shipping to the buyer in GBP (default: the calculator's)
+            price_data_path: Reference price ranges (CSV or Parquet)
+            aliases_path: Brand/item aliases CSV
+            sales_db_path: Sold-price DuckDB file (used when it exists)
+        """
+        self.platform = platform
+        self.min_margin = min_margin
+        self.shipping_cost = DEFAULT_SHIPPING_COST if shipping_cost is None else shipping_cost
+        self.prices = PriceStore(data_path=price_data_path, aliases_path=aliases_path)
+        self.sales = SoldPriceStore(path=sales_db_path, aliases_path=aliases_path)
+        self.sales.load()
+        self.expected_price = lru_cache(maxsize=65536)(self._expected_price)
+        self._resolve_brand = lru_cache(maxsize=65536)(self._resolve_brand)
+        self._resolve_item = lru_cache(maxsize=65536)(self._resolve_item)
+
+    def _resolve_brand(self, text: str) -> Optional[str]:
+        return self.prices.resolve_brand(text) or self.sales.resolve_brand(text)
+
+    def _resolve_item(self, text: str) -> Optional[str]:
+        return self.prices.resolve_item(text) or self.sales.resolve_item(text)
+
+    @staticmethod
+    def _condition(text: str) -> str:
+        normalized = f" {normalize_name(text or '')} "
+        return next(
+            (condition for phrase, condition in _CONDITION_PHRASES if f" {phrase} " in normalized),
+            DEFAULT_CONDITION
+        )
+
+    def _expected_price(self, brand: str, item_type: str, condition: str) -> Optional[Tuple[float, str, int]]:
+        """(expected selling price, 'sales' or 'guide', sales behind it) or None"""
+        stats = self.sales.segment(brand, item_type, condition)
+        if stats is not None:
+            return stats.median, "sales", stats.sales
+        price = self.prices.lookup(brand, item_type, condition)
+        if price is not None:
+            return (price.low + price.high) / 2, "guide", 0
+        return None
+
+    def resolve(self, row: dict) -> Optional[Tuple[str, str, str]]:
+        """Canonical (brand, item type, condition) of a listing, or None"""
+        title = str(row.get("title") or "")
+        brand = self._resolve_brand(str(row.get("brand") or title))
+        if brand is None and row.get("brand"):
+            brand = self._resolve_brand(title)
+        item_type = self._resolve_item(str(row.get("item_type") or title))
+        if item_type is None and row.get("item_type"):
+            item_type = self._resolve_item(title)
+        if brand is None or item_type is None:
+            return None
+        return brand, item_type, self._condition(str(row.get("condition") or ""))
+
+    def score(self, listings: List[dict]) -> "ChunkResult":
+        """Score one chunk; returns its opportunities (best first), counts and stage timings"""
+        result = ChunkResult(listings=len(listings))
+
+        start = time.perf_counter()
+        resolved = []
+        for row in listings:
+            buy = _number(row.get("price"))
+            if buy is None:
+                continue
+            segment = self.resolve(row)
+            if segment is not None:
+                resolved.append((row, buy + (_number(row.get("postage") or row.get("shipping")) or 0.0), segment))
+        result.resolved = len(resolved)
+        result.timings["resolve"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        priced = []
+        for row, buy, segment in resolved:
+            expected = self.expected_price(*segment)
+            if expected is not None:
+                priced.append((row, buy, segment, expected))
+        result.priced = len(priced)
+        result.timings["price"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        if priced:
+            scored = calculate_profit_batch(
+                [buy for _, buy, _, _ in priced],
+                [expected[0] for _, _, _, expected in priced],
+                self.platform,
+                self.shipping_cost
+            )
+            keep = scored["valid"] & (scored["margin"] >= self.min_margin)
+            for i in sorted(keep.nonzero()[0], key=lambda i: -scored["profit"][i]):
+                row, buy, (brand, item_type, condition), (sale, source, sales) = priced[i]
+                result.opportunities.append({
+                    "id": row.get("id") or row.get("item_id") or "",
+                    "title": row.get("title") or "",
+                    "brand": brand,
+                    "item_type": item_type,
+                    "condition": condition,
+                    "buy_price": round(buy, 2),
+                    "expected_sale": round(sale, 2),
+                    "price_source": source,
+                    "sales": sales,
+                    "platform": self.platform,
+                    "platform_fees": round(float(scored["platform_fees"][i]), 2),
+                    "profit": round(float(scored["profit"][i]), 2),
+                    "margin": round(float(scored["margin"][i]), 1),
+                    "tier": TIER_NAMES[scored["tier"][i]],
+                    "url": row.get("url") or ""
+                })
+        result.timings["profit"] = time.perf_counter() - start
+        return result
+
+
+@dataclass
+class ChunkResult:
+    listings: int
+    resolved: int = 0
+    priced: int = 0
+    opportunities: List[dict] = field(default_factory=list)
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class PipelineReport:
+    """Totals of a run; stage times are summed over worker processes"""
+    listings: int = 0
+    resolved: int = 0
+    priced: int = 0
+    opportunities: int = 0
+    seconds: float = 0.0
+    workers: int = 0
+    stages: Dict[str, float] = field(default_factory=lambda: dict.fromkeys(STAGES, 0.0))
+    top: List[dict] = field(default_factory=list)
+
+    @property
+    def listings_per_sec(self) -> float:
+        return self.listings / self.seconds if self.seconds else 0.0
+
+    def add(self, chunk: ChunkResult) -> None:
+        self.listings += chunk.listings
+        self.resolved += chunk.resolved
+        self.priced += chunk.priced
+        self.opportunities += len(chunk.opportunities)
+        for stage, seconds in chunk.timings.items():
+            self.stages[stage] += seconds
+
+    def format(self) -> str:
+        buffer = io.StringIO()
+        pct = lambda n: f"{n / self.listings:.1%}" if self.listings else "0%"
+        buffer.write(
+            f"Scored {self.listings:,} listings in {self.seconds:.2f}s "
+            f"({self.listings_per_sec:,.0f} listings/sec, {self.workers} worker(s))\n"
+            f"  resolved {self.resolved:,} ({pct(self.resolved)}), priced {self.priced:,} ({pct(self.priced)}), "
+            f"opportunities {self.opportunities:,} ({pct(self.opportunities)})\n"
+            f"  stage times (s, summed over workers):\n"
+        )
+        busy = sum(self.stages.values()) or 1.0
+        for stage in STAGES:
+            seconds = self.stages[stage]
+            buffer.write(f"    {stage:<8} {seconds:8.3f}  {seconds / busy:6.1%}\n")
+        if self.top:
+            buffer.write(f"  top {len(self.top)} by profit:\n")
+            for rank, row in enumerate(self.top, start=1):
+                buffer.write(
+                    f"    {rank:>2}. £{row['profit']:,.2f} ({row['margin']:.1f}%) {row['brand']} {row['item_type']} "
+                    f"[{row['condition']}] buy £{row['buy_price']:,.2f} -> £{row['expected_sale']:,.2f} "
+                    f"{row['id']}\n"
+                )
+        return buffer.getvalue()
+
+
+_scorer: Optional[ListingScorer] = None
+
+
+def _init_worker(options: dict) -> None:
+    global _scorer
+    _scorer = ListingScorer(**options)
+
+
+def _score_chunk(listings: List[dict]) -> ChunkResult:
+    return _scorer.score(listings)
+
+
+def run_pipeline(
+    input_path: str,
+    output_path: str,
+    workers: int = None,
+    chunk_size: int = PIPELINE_CHUNK_SIZE,
+    top: int = 10,
+    **options
+) -> PipelineReport:
+    """
+    Score every listing in ``input_path`` and write the opportunities to ``output_path``.
+
+    Args:
+        input_path: Listings as CSV or JSONL (price, title and/or brand + item_type;
+            optional id, condition, postage, url)
+        output_path: Opportunities file (.csv or .jsonl), written chunk by chunk
+        workers: Scoring processes (default: CPU count; 0 scores in this process)
+        chunk_size: Listings per chunk
+        top: Best opportunities kept for the report
+        **options: ListingScorer arguments (platform, min_margin, shipping_cost, ...)
+
+    Returns:
+        PipelineReport with counts, throughput and per-stage timings
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    report = PipelineReport(workers=workers)
+    best: List[tuple] = []
+    sequence = itertools.count()
+    writer = OpportunityWriter(output_path)
+    start = time.perf_counter()
+
+    def collect(chunk: ChunkResult) -> None:
+        write_start = time.perf_counter()
+        writer.write(chunk.opportunities)
+        chunk.timings["write"] = time.perf_counter() - write_start
+        report.add(chunk)
+        for row in chunk.opportunities:
+            # Earlier rows win ties, so the sequence number is negated
+            entry = (row["profit"], -next(sequence), row)
+            if len(best) < top:
+                heapq.heappush(best, entry)
+            elif top:
+                heapq.heappushpop(best, entry)
+
+    def chunks() -> Iterator[List[dict]]:
+        listings = read_listings(input_path, chunk_size)
+        while True:
+            read_start = time.perf_counter()
+            chunk = next(listings, None)
+            report.stages["read"] += time.perf_counter() - read_start
+            if chunk is None:
+                return
+            yield chunk
+
+    try:
+        if workers == 0:
+            scorer = ListingScorer(**options)
+            for chunk in chunks():
+                collect(scorer.score(chunk))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(options,)) as pool:
+                # At most two chunks per worker in flight keeps memory flat
+                pending = []
+                for chunk in chunks():
+                    pending.append(pool.submit(_score_chunk, chunk))
+                    if len(pending) >= 2 * workers:
+                        collect(pending.pop(0).result())
+                for future in pending:
+                    collect(future.result())
+    finally:
+        writer.close()
+
+    report.seconds = time.perf_counter() - start
+    report.top = [row for _, _, row in sorted(best, key=lambda e: (e[0], e[1]), reverse=True)]
+    logger.info(
+        f"Scored {report.listings} listings ({report.opportunities} opportunities) "
+        f"in {report.seconds:.2f}s with {workers} worker(s)"
+    )
+    return report
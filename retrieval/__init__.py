@@ -0,0 +1,20 @@
+"""
+Knowledge base indexing and retrieval
+"""
+from .index_store import KnowledgeIndex, compute_index_key, build_index, update_index, load_index
+from .engine import RetrievalEngine
+from .cache import QueryCache
+from .bm25 import BM25Index
+from .retriever import KnowledgeRetriever
+
+__all__ = [
+    'KnowledgeIndex',
+    'compute_index_key',
+    'build_index',
+    'update_index',
+    'load_index',
+    'RetrievalEngine',
+    'QueryCache',
+    'BM25Index',
+    'KnowledgeRetriever'
+]
@@ -0,0 +1,116 @@
+"""
+Local BM25 inverted index over knowledge base chunks
+
+Per-posting BM25 weights are precomputed at build time (they only depend on
+the term and the document), so scoring a query is a handful of scatter-adds
+over the postings of its terms.
+"""
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from config.settings import BM25_K1, BM25_B
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a about an and are as at be but by can do does for from get how i if in is it
+its me my of on or should so that the their them there this to up was what
+when where which who why will with you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens without stopwords"""
+    return [t for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of texts"""
+
+    def __init__(self, texts: Sequence[str], k1: float = BM25_K1, b: float = BM25_B):
+        """
+        Args:
+            texts: Chunk texts, position = document id
+            k1: Term frequency saturation
+            b: Length normalization strength
+        """
+        self.size = len(texts)
+        self.k1 = k1
+        self.b = b
+
+        doc_tokens = [tokenize(text) for text in texts]
+        lengths = np.array([len(tokens) for tokens in doc_tokens], dtype=np.float32)
+        avg_length = float(lengths.mean()) if self.size and lengths.sum() else 1.0
+
+        postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        for doc_id, tokens in enumerate(doc_tokens):
+            for term, tf in Counter(tokens).items():
+                postings[term].append((doc_id, tf))
+
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for term, entries in postings.items():
+            ids = np.fromiter((d for d, _ in entries), dtype=np.int32, count=len(entries))
+            tfs = np.fromiter((tf for _, tf in entries), dtype=np.float32, count=len(entries))
+            idf = math.log(1.0 + (self.size - len(entries) + 0.5) / (len(entries) + 0.5))
+            norm = k1 * (1.0 - b + b * lengths[ids] / avg_length)
+            self._postings[term] = (ids, (idf * tfs * (k1 + 1.0) / (tfs + norm)).astype(np.float32))
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def vocabulary_size(self) -> int:
+        return len(self._postings)
+
+    def search(self, query: str, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k documents by BM25 score.
+
+        Args:
+            query: Free text query
+            k: Maximum number of results
+
+        Returns:
+            Tuple of (doc ids, scores), best first; only documents with a
+            positive score are returned
+        """
+        terms = [t for t in set(tokenize(query)) if t in self._postings]
+        if not terms or self.size == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        scores = np.zeros(self.size, dtype=np.float32)
+        for term in terms:
+            ids, weights = self._postings[term]
+            scores[ids] += weights
+
+        candidates = np.flatnonzero(scores)
+        if len(candidates) > k:
+            top = np.argpartition(-scores[candidates], k - 1)[:k]
+            candidates = candidates[top]
+
+        order = np.argsort(-scores[candidates])
+        candidates = candidates[order]
+        return candidates.astype(np.int64), scores[candidates]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[int]], k: int, rrf_k: int) -> List[int]:
+    """
+    Fuse several rankings of document ids with reciprocal rank fusion.
+
+    Args:
+        rankings: Ranked doc id lists, best first
+        k: Number of fused results to return
+        rrf_k: RRF smoothing constant
+
+    Returns:
+        Fused doc ids, best first
+    """
+    fused: Dict[int, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            fused[int(doc_id)] += 1.0 / (rrf_k + rank + 1)
+    return sorted(fused, key=fused.get, reverse=True)[:k]
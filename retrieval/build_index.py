@@ -0,0 +1,65 @@
+"""
+Build or update the prebuilt knowledge base index
+
+Only chunks that were added or changed since the last build are embedded,
+in concurrent batches; an interrupted build resumes where it stopped.
+
+Usage:
+    OPENAI_API_KEY=sk-... python -m retrieval.build_index [--kb-dir DIR] [--output PATH] [--force]
+"""
+import argparse
+
+from config.settings import EMBED_BATCH_SIZE, EMBEDDING_MODEL, INDEX_PATH, KB_DIR
+from data.knowledge_base import load_documents
+from retrieval.index_store import (
+    compute_chunk_hash,
+    compute_index_key,
+    load_index,
+    split_documents,
+    update_index
+)
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Build the knowledge base vector index")
+    parser.add_argument("--kb-dir", default=KB_DIR, help="Directory of knowledge base files")
+    parser.add_argument("--output", default=INDEX_PATH, help="Index file to write")
+    parser.add_argument("--force", action="store_true", help="Re-embed every chunk")
+    args = parser.parse_args(argv)
+
+    documents = load_documents(args.kb_dir)
+    splits = split_documents(documents)
+    key = compute_index_key(
+        [compute_chunk_hash(doc.page_content) for doc in splits],
+        metadatas=[doc.metadata for doc in splits]
+    )
+    previous = None if args.force else load_index(args.output)
+
+    if previous is not None and previous.key == key:
+        print(f"Index {key[:12]} at {args.output} is up to date")
+        return 0
+
+    from langchain_openai import OpenAIEmbeddings
+
+    from utils.http_client import get_http_client
+
+    # Batching, concurrency and 429 backoff are handled by retrieval.ingestion
+    embedding = OpenAIEmbeddings(
+        model=EMBEDDING_MODEL,
+        max_retries=0,
+        chunk_size=EMBED_BATCH_SIZE,
+        http_client=get_http_client()
+    )
+    index, changes = update_index(documents, embedding, args.output, previous=previous)
+    print(
+        f"Built index {index.key[:12]}: {len(index)} chunks from {len(documents)} files, dim={index.dim} "
+        f"({changes['added']} embedded, {changes['reused']} reused, {changes['removed']} removed) -> {args.output}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,207 @@
+"""
+Two-tier LRU + TTL cache for knowledge base queries
+
+Tier 1 is keyed on the normalized query string and costs nothing to check.
+Tier 2 compares the query embedding with cached ones and reuses a result when
+the cosine similarity is above a threshold, which saves the similarity scan
+for paraphrases. All entries are tied to an index version and dropped as soon
+as the version changes.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+import numpy as np
+
+from config.settings import (
+    QUERY_CACHE_SIZE,
+    QUERY_CACHE_TTL,
+    QUERY_CACHE_SIMILARITY
+)
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = re.compile(r"[\s?!.,;:]+$")
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation"""
+    query = _WHITESPACE.sub(" ", query.strip().lower())
+    return _TRAILING_PUNCTUATION.sub("", query)
+
+
+class _Entry:
+    __slots__ = ("value", "vector", "expires_at", "scope")
+
+    def __init__(self, value, vector, expires_at, scope):
+        self.value = value
+        self.vector = vector
+        self.expires_at = expires_at
+        self.scope = scope
+
+
+class QueryCache:
+    """Thread-safe LRU + TTL cache with exact and semantic lookup"""
+
+    def __init__(
+        self,
+        max_size: int = QUERY_CACHE_SIZE,
+        ttl: float = QUERY_CACHE_TTL,
+        similarity_threshold: float = QUERY_CACHE_SIMILARITY
+    ):
+        """
+        Args:
+            max_size: Maximum number of cached queries
+            ttl: Seconds an entry stays valid
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._version: Optional[str] = None
+
+        # Semantic tier: stacked vectors of entries that have one, rebuilt lazily
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_keys: list = []
+        self._matrix_dirty = True
+
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.semantic_misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def ensure_version(self, version: str) -> None:
+        """Drop every entry if the index version changed"""
+        if version == self._version:
+            return
+        with self._lock:
+            if version != self._version:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._matrix_dirty = True
+                self._version = version
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Exact lookup; every lookup counts as a hit or a miss"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at <= now:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def get_similar(self, vector: np.ndarray, scope: Hashable = None) -> Optional[Any]:
+        """
+        Semantic lookup by normalized query embedding.
+
+        Args:
+            vector: L2-normalized query embedding
+            scope: Only entries stored with the same scope are considered
+
+        Returns:
+            Cached value of the most similar entry above the threshold, or None
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._matrix_dirty:
+                self._rebuild_matrix()
+
+            if self._matrix is not None and len(self._matrix_keys):
+                scores = self._matrix @ np.asarray(vector, dtype=np.float32).ravel()
+                for i in np.argsort(-scores):
+                    if scores[i] < self.similarity_threshold:
+                        break
+                    key = self._matrix_keys[i]
+                    entry = self._entries.get(key)
+                    if entry is None or entry.scope != scope:
+                        continue
+                    if entry.expires_at <= now:
+                        continue
+                    self._entries.move_to_end(key)
+                    self.semantic_hits += 1
+                    return entry.value
+
+            self.semantic_misses += 1
+            return None
+
+    def put(
+        self,
+        key: Hashable,
+        value: Any,
+        vector: np.ndarray = None,
+        scope: Hashable = None,
+        version: Optional[str] = None
+    ) -> None:
+        """
+        Store ``value`` under ``key``, evicting the least recently used entry if full.
+
+        A ``version`` other than the current one (a search that finished after
+        the index was swapped) is ignored rather than cached.
+        """
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            if version is not None and version != self._version:
+                return
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self._entries[key] = _Entry(
+                value,
+                None if vector is None else np.asarray(vector, dtype=np.float32).ravel(),
+                time.monotonic() + self.ttl,
+                scope
+            )
+            self._matrix_dirty = True
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._matrix_dirty = True
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss/eviction counters; ``misses`` includes lookups the semantic tier then served"""
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "semantic_misses": self.semantic_misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+        self._matrix_dirty = True
+
+    def _rebuild_matrix(self) -> None:
+        keys = [k for k, e in self._entries.items() if e.vector is not None]
+        self._matrix_keys = keys
+        self._matrix = (
+            np.stack([self._entries[k].vector for k in keys]) if keys else None
+        )
+        self._matrix_dirty = False
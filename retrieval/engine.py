@@ -0,0 +1,232 @@
+"""
+Vectorized retrieval engine over a KnowledgeIndex
+
+Exact search is one matrix product against the contiguous, L2-normalized
+embedding matrix followed by ``argpartition`` for top-k. Above
+HNSW_MIN_CORPUS chunks the engine switches to an approximate hnswlib graph.
+
+The graph's search ef is set once, high enough for the retriever's
+candidate counts, because it is shared by every serving thread. A query
+with a larger k changes ef under a lock and restores it afterwards.
+"""
+import copy
+import os
+import threading
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from config.settings import (
+    HNSW_MIN_CORPUS,
+    HNSW_M,
+    HNSW_EF_CONSTRUCTION,
+    HNSW_EF_SEARCH,
+    HYBRID_CANDIDATES
+)
+from retrieval.index_store import KnowledgeIndex
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+try:
+    import hnswlib
+except ImportError:  # pragma: no cover - hnswlib is optional
+    hnswlib = None
+
+# Search ef of every graph: covers plain top-k and hybrid candidate queries
+_GRAPH_EF = max(HNSW_EF_SEARCH, HYBRID_CANDIDATES)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors.reshape(1, -1)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class RetrievalEngine:
+    """Top-k cosine search with exact (NumPy) and approximate (HNSW) backends"""
+
+    def __init__(
+        self,
+        index: KnowledgeIndex,
+        hnsw_min_corpus: int = HNSW_MIN_CORPUS,
+        hnsw_path: Optional[str] = None
+    ):
+        """
+        Args:
+            index: Knowledge index with normalized vectors
+            hnsw_min_corpus: Corpus size from which the HNSW backend is used
+            hnsw_path: Optional file to load/save the HNSW graph
+        """
+        self.index = index
+        # Memory-mapped rows are already contiguous float32, so this is a no-op view
+        self.matrix = np.ascontiguousarray(index.vectors, dtype=np.float32)
+        self._hnsw = None
+        # Shared with copies from with_embedding, like the graph itself
+        self._hnsw_lock = threading.Lock()
+
+        if len(index) >= hnsw_min_corpus:
+            if hnswlib is None:
+                logger.warning("hnswlib not installed, using exact search for large corpus")
+            else:
+                self._hnsw = self._load_or_build_hnsw(hnsw_path)
+
+        logger.info(f"Retrieval engine ready: {len(index)} chunks, backend={self.backend}")
+
+    @property
+    def backend(self) -> str:
+        return "hnsw" if self._hnsw is not None else "exact"
+
+    @property
+    def embedding(self):
+        return self.index.embedding
+
+    @property
+    def key(self) -> str:
+        return self.index.key
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def with_embedding(self, embedding) -> "RetrievalEngine":
+        """Return an engine sharing this matrix and HNSW graph with another query embedder"""
+        engine = copy.copy(self)
+        engine.index = self.index.with_embedding(embedding)
+        return engine
+
+    def _load_or_build_hnsw(self, path: Optional[str]):
+        n, dim = self.matrix.shape
+        graph = hnswlib.Index(space="ip", dim=dim)
+
+        if path and os.path.exists(path):
+            try:
+                graph.load_index(path, max_elements=n)
+                if graph.get_current_count() == n:
+                    graph.set_ef(_GRAPH_EF)
+                    logger.info(f"Loaded HNSW graph from {path}")
+                    return graph
+            except RuntimeError as e:
+                logger.warning(f"Could not load HNSW graph from {path}: {str(e)}")
+            graph = hnswlib.Index(space="ip", dim=dim)
+
+        logger.info(f"Building HNSW graph over {n} chunks")
+        graph.init_index(max_elements=n, ef_construction=HNSW_EF_CONSTRUCTION, M=HNSW_M)
+        graph.add_items(self.matrix, np.arange(n))
+        graph.set_ef(_GRAPH_EF)
+
+        if path:
+            graph.save_index(path)
+
+        self._hnsw = graph
+        self.measure_recall()
+        return graph
+
+    def embed_queries(self, queries: Sequence[str]) -> np.ndarray:
+        """Embed and normalize queries in a single embeddings request"""
+        if self.embedding is None:
+            raise ValueError("Retrieval engine has no embedding model attached")
+        if len(queries) == 1:
+            vectors = [self.embedding.embed_query(queries[0])]
+        else:
+            vectors = self.embedding.embed_documents(list(queries))
+        return _normalize(vectors)
+
+    def exact_search_vectors(self, query_vectors: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Exact top-k by inner product.
+
+        Args:
+            query_vectors: Normalized query matrix, shape (n_queries, dim)
+            k: Results per query
+
+        Returns:
+            Tuple of (indices, scores), each shape (n_queries, k), best first
+        """
+        n = len(self)
+        k = min(k, n)
+        if k == 0:
+            empty = np.empty((len(query_vectors), 0))
+            return empty.astype(np.int64), empty.astype(np.float32)
+
+        scores = query_vectors @ self.matrix.T
+        if k < n:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.tile(np.arange(n), (len(scores), 1))
+
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+    def search_vectors(self, query_vectors: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k with the active backend; same contract as ``exact_search_vectors``"""
+        query_vectors = _normalize(query_vectors)
+        if self._hnsw is None:
+            return self.exact_search_vectors(query_vectors, k)
+
+        k = min(k, len(self))
+        if k <= _GRAPH_EF:
+            labels, distances = self._hnsw.knn_query(query_vectors, k=k)
+        else:
+            with self._hnsw_lock:
+                self._hnsw.set_ef(k)
+                try:
+                    labels, distances = self._hnsw.knn_query(query_vectors, k=k)
+                finally:
+                    self._hnsw.set_ef(_GRAPH_EF)
+        # hnswlib "ip" distance is 1 - inner product
+        return labels.astype(np.int64), (1.0 - distances).astype(np.float32)
+
+    def search_batch(self, queries: Sequence[str], k: int) -> List[List[Document]]:
+        """
+        Search several queries with one embeddings request and one matrix product.
+
+        Args:
+            queries: Natural language queries
+            k: Results per query
+
+        Returns:
+            One list of documents per query, best first
+        """
+        if not queries or len(self) == 0:
+            return [[] for _ in queries]
+
+        indices, _ = self.search_vectors(self.embed_queries(queries), k)
+        return [[self.index.document(int(i)) for i in row] for row in indices]
+
+    def similarity_search(self, query: str, k: int = 4) -> List[Document]:
+        """Vector-store compatible single query search"""
+        return self.search_batch([query], k)[0]
+
+    def measure_recall(self, k: int = 10, sample: int = 200, query_vectors: np.ndarray = None) -> float:
+        """
+        Recall@k of the active backend against exact search.
+
+        Args:
+            k: Neighbours compared per query
+            sample: Number of corpus rows used as queries when none are given
+            query_vectors: Optional explicit query matrix
+
+        Returns:
+            Fraction of exact top-k results also returned by the active backend
+        """
+        if len(self) == 0:
+            return 1.0
+
+        if query_vectors is None:
+            rng = np.random.default_rng(0)
+            rows = rng.choice(len(self), size=min(sample, len(self)), replace=False)
+            query_vectors = np.asarray(self.matrix[np.sort(rows)])
+
+        query_vectors = _normalize(query_vectors)
+        exact, _ = self.exact_search_vectors(query_vectors, k)
+        found, _ = self.search_vectors(query_vectors, k)
+
+        hits = sum(len(set(e) & set(f)) for e, f in zip(exact.tolist(), found.tolist()))
+        recall = hits / exact.size if exact.size else 1.0
+        logger.info(f"Recall@{k} ({self.backend} vs exact): {recall:.3f}")
+        return recall
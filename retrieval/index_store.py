@@ -0,0 +1,354 @@
+"""
+Persistent on-disk vector index for the knowledge base
+
+File layout (single file, little-endian):
+    8 bytes   magic (b"GRBYIDX1")
+    8 bytes   header length (uint64)
+    N bytes   JSON header (key, model, dim, count, chunks with content hashes)
+    padding   to a 64-byte boundary
+    rest      float32 vectors, shape (count, dim), L2-normalized
+
+The vector block is memory-mapped on load, so opening the index costs no
+embedding calls and no copy of the matrix.
+"""
+import hashlib
+import json
+import os
+import struct
+import tempfile
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from config.settings import (
+    CHUNK_SIZE,
+    CHUNK_OVERLAP,
+    EMBEDDING_MODEL,
+    INDEX_PATH
+)
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+INDEX_MAGIC = b"GRBYIDX1"
+INDEX_FORMAT_VERSION = 2
+_ALIGNMENT = 64
+
+
+def compute_chunk_hash(text: str, embedding_model: str = EMBEDDING_MODEL) -> str:
+    """Content hash of one chunk; equal hashes mean the stored embedding can be reused"""
+    return hashlib.sha256(f"{embedding_model}\0{text}".encode("utf-8")).hexdigest()
+
+
+def compute_index_key(
+    chunk_hashes: Sequence[str],
+    embedding_model: str = EMBEDDING_MODEL,
+    metadatas: Optional[Sequence[Dict]] = None
+) -> str:
+    """
+    Hash everything that determines the index contents.
+
+    Chunking settings are covered implicitly: they change the chunk texts
+    and therefore the chunk hashes. Metadata is part of the key but not of
+    the chunk hashes, so a metadata-only change rewrites the index without
+    re-embedding anything.
+
+    Args:
+        chunk_hashes: Hashes of the chunks, in index order
+        embedding_model: Embedding model name
+        metadatas: Metadata of the chunks, in index order
+
+    Returns:
+        Hex digest identifying this exact index build
+    """
+    metadata = json.dumps(list(metadatas or []), sort_keys=True, default=str)
+    payload = json.dumps({
+        "format": INDEX_FORMAT_VERSION,
+        "chunks": hashlib.sha256("\n".join(chunk_hashes).encode("utf-8")).hexdigest(),
+        "metadata": hashlib.sha256(metadata.encode("utf-8")).hexdigest(),
+        "embedding_model": embedding_model
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class KnowledgeIndex:
+    """Chunk texts, metadata, content hashes and a normalized float32 embedding matrix"""
+
+    def __init__(
+        self,
+        key: str,
+        texts: List[str],
+        metadatas: List[Dict],
+        vectors: np.ndarray,
+        embedding=None,
+        hashes: Optional[List[str]] = None
+    ):
+        self.key = key
+        self.texts = texts
+        self.metadatas = metadatas
+        self.vectors = vectors
+        self.embedding = embedding
+        self.hashes = hashes if hashes is not None else [compute_chunk_hash(t) for t in texts]
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    @property
+    def dim(self) -> int:
+        return int(self.vectors.shape[1]) if self.vectors.ndim == 2 else 0
+
+    def with_embedding(self, embedding) -> "KnowledgeIndex":
+        """Return a view sharing this index's data with a different query embedder"""
+        return KnowledgeIndex(self.key, self.texts, self.metadatas, self.vectors, embedding, self.hashes)
+
+    def document(self, i: int) -> Document:
+        """Return chunk ``i`` as a LangChain document"""
+        return Document(page_content=self.texts[i], metadata=dict(self.metadatas[i]))
+
+
+def split_documents(documents: List[Document]) -> List[Document]:
+    """Split knowledge base files into chunks with the configured splitter"""
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP
+    )
+    return text_splitter.split_documents(documents)
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def update_index(
+    documents: List[Document],
+    embedding,
+    path: str = INDEX_PATH,
+    previous: Optional[KnowledgeIndex] = None
+) -> Tuple[KnowledgeIndex, Dict[str, int]]:
+    """
+    Split ``documents`` and write their index, embedding only new chunks.
+
+    Chunks whose content hash already exists in ``previous`` keep their
+    stored vector; chunks that no longer exist are simply not carried over.
+
+    Args:
+        documents: Knowledge base files, see ``data.knowledge_base.load_documents``
+        embedding: LangChain embeddings instance
+        path: Destination file (replaced atomically)
+        previous: Index to reuse vectors from
+
+    Returns:
+        Tuple of (index memory-mapped from disk, counts of added/reused/removed chunks)
+    """
+    splits = split_documents(documents)
+    texts = [doc.page_content for doc in splits]
+    metadatas = [doc.metadata for doc in splits]
+    hashes = [compute_chunk_hash(t) for t in texts]
+    key = compute_index_key(hashes, metadatas=metadatas)
+
+    reusable = {}
+    if previous is not None and len(previous):
+        reusable = {h: i for i, h in enumerate(previous.hashes)}
+
+    new_rows = [i for i, h in enumerate(hashes) if h not in reusable]
+    new_texts = list(dict.fromkeys(texts[i] for i in new_rows))
+    kept = set(hashes)
+    changes = {
+        "added": len(new_texts),
+        "reused": len(hashes) - len(new_rows),
+        "removed": sum(1 for h in reusable if h not in kept)
+    }
+    logger.info(
+        f"Indexing {len(texts)} chunks: {changes['added']} to embed, "
+        f"{changes['reused']} reused, {changes['removed']} removed"
+    )
+
+    fresh = {}
+    ingestor = None
+    if new_texts:
+        from retrieval.ingestion import EmbeddingIngestor
+
+        # Batches already embedded by an interrupted run are read back from the progress file
+        ingestor = EmbeddingIngestor(embedding, progress_path=f"{path}.progress")
+        new_hashes = [compute_chunk_hash(t) for t in new_texts]
+        embedded = ingestor.embed(new_texts, new_hashes)
+        new_vectors = _normalize_rows(np.stack([embedded[h] for h in new_hashes]))
+        fresh = dict(zip(new_hashes, new_vectors))
+
+    dim = next(iter(fresh.values())).shape[0] if fresh else (previous.dim if previous is not None else 0)
+    vectors = np.empty((len(texts), dim), dtype=np.float32)
+    for row, h in enumerate(hashes):
+        vectors[row] = fresh[h] if h in fresh else previous.vectors[reusable[h]]
+
+    write_index(path, key, texts, metadatas, vectors, hashes)
+    if ingestor is not None:
+        ingestor.finish()
+    index = load_index(path, expected_key=key, embedding=embedding)
+    if index is None:
+        raise RuntimeError(f"Index written to {path} could not be read back")
+    return index, changes
+
+
+def build_index(documents: List[Document], embedding, path: str = INDEX_PATH) -> KnowledgeIndex:
+    """
+    Split, embed and write the knowledge base index to ``path`` from scratch.
+
+    Args:
+        documents: Knowledge base files
+        embedding: LangChain embeddings instance
+        path: Destination file
+
+    Returns:
+        The freshly built index (memory-mapped from disk)
+    """
+    index, _ = update_index(documents, embedding, path)
+    return index
+
+
+def write_index(
+    path: str,
+    key: str,
+    texts: List[str],
+    metadatas: List[Dict],
+    vectors: np.ndarray,
+    hashes: Optional[List[str]] = None
+) -> None:
+    """Atomically write an index file"""
+    if hashes is None:
+        hashes = [compute_chunk_hash(t) for t in texts]
+    vectors = np.ascontiguousarray(vectors, dtype="<f4")
+    count = len(texts)
+    dim = int(vectors.shape[1]) if count else 0
+
+    header = json.dumps({
+        "format": INDEX_FORMAT_VERSION,
+        "key": key,
+        "embedding_model": EMBEDDING_MODEL,
+        "count": count,
+        "dim": dim,
+        "chunks": [
+            {"text": t, "metadata": m, "hash": h} for t, m, h in zip(texts, metadatas, hashes)
+        ]
+    }).encode("utf-8")
+
+    prefix_len = len(INDEX_MAGIC) + 8 + len(header)
+    padding = (-prefix_len) % _ALIGNMENT
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    # A unique temporary file per writer: processes building the same index
+    # concurrently each replace the destination with a complete file
+    with tempfile.NamedTemporaryFile(
+        dir=directory, prefix=f"{os.path.basename(path)}.", suffix=".tmp", delete=False
+    ) as f:
+        tmp_path = f.name
+        try:
+            f.write(INDEX_MAGIC)
+            f.write(struct.pack("<Q", len(header)))
+            f.write(header)
+            f.write(b"\0" * padding)
+            f.write(vectors.tobytes())
+        except BaseException:
+            f.close()
+            os.unlink(tmp_path)
+            raise
+
+    # NamedTemporaryFile creates 0600 files; the index is read by other processes
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, path)
+    logger.info(f"Wrote index {key[:12]} ({count} chunks, dim={dim}) to {path}")
+
+
+def load_index(
+    path: str = INDEX_PATH,
+    expected_key: Optional[str] = None,
+    embedding=None
+) -> Optional[KnowledgeIndex]:
+    """
+    Memory-map an index file.
+
+    Args:
+        path: Index file
+        expected_key: If given, only return the index when its key matches
+        embedding: Embeddings used for queries against the loaded index
+
+    Returns:
+        The index, or None if the file is missing, invalid or stale
+    """
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                logger.warning(f"Ignoring {path}: not a knowledge index file")
+                return None
+            (header_len,) = struct.unpack("<Q", f.read(8))
+            header = json.loads(f.read(header_len).decode("utf-8"))
+
+        if header.get("format") != INDEX_FORMAT_VERSION:
+            logger.info(f"Index format changed, {path} needs rebuilding")
+            return None
+
+        if expected_key is not None and header["key"] != expected_key:
+            logger.info(f"Index {header['key'][:12]} is stale (want {expected_key[:12]})")
+            return None
+
+        prefix_len = len(INDEX_MAGIC) + 8 + header_len
+        offset = prefix_len + (-prefix_len) % _ALIGNMENT
+        count, dim = header["count"], header["dim"]
+
+        if count:
+            vectors = np.memmap(path, dtype="<f4", mode="r", offset=offset, shape=(count, dim))
+        else:
+            vectors = np.zeros((0, 0), dtype=np.float32)
+
+        chunks = header["chunks"]
+        return KnowledgeIndex(
+            key=header["key"],
+            texts=[c["text"] for c in chunks],
+            metadatas=[c["metadata"] for c in chunks],
+            vectors=vectors,
+            embedding=embedding,
+            hashes=[c["hash"] for c in chunks]
+        )
+
+    except (OSError, ValueError, KeyError, struct.error) as e:
+        logger.warning(f"Could not load index from {path}: {str(e)}")
+        return None
+
+
+def load_or_build_index(documents: List[Document], embedding, path: str = INDEX_PATH) -> KnowledgeIndex:
+    """
+    Load the prebuilt index if it matches ``documents`` and settings, else update it.
+
+    An outdated index is updated incrementally: only chunks that were added
+    or changed since it was written are embedded.
+
+    Args:
+        documents: Knowledge base files
+        embedding: LangChain embeddings instance
+        path: Index file
+
+    Returns:
+        Ready-to-query index
+    """
+    splits = split_documents(documents)
+    key = compute_index_key(
+        [compute_chunk_hash(doc.page_content) for doc in splits],
+        metadatas=[doc.metadata for doc in splits]
+    )
+    previous = load_index(path, embedding=embedding)
+
+    if previous is not None and previous.key == key:
+        logger.info(f"Loaded prebuilt index {key[:12]} ({len(previous)} chunks), no embedding needed")
+        return previous
+
+    logger.info("Prebuilt index missing or outdated, updating it")
+    index, _ = update_index(documents, embedding, path, previous=previous)
+    return index
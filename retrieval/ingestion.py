@@ -0,0 +1,287 @@
+"""
+Batched, concurrent embedding ingestion
+
+Chunks are embedded in fixed-size batches by a bounded pool of concurrent
+requests. Rate-limit responses (HTTP 429) shrink the number of requests in
+flight and back off exponentially (honouring Retry-After when the server
+sends it); successful batches grow concurrency back up to the configured
+maximum (AIMD). Each finished batch is appended to a progress file keyed by
+chunk hash, so an interrupted ingestion resumes without re-embedding
+anything it already paid for.
+"""
+import base64
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from config.settings import (
+    EMBED_BATCH_SIZE,
+    EMBED_MAX_CONCURRENCY,
+    EMBED_MAX_RETRIES,
+    EMBED_BACKOFF_BASE,
+    EMBED_BACKOFF_MAX
+)
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """True for OpenAI RateLimitError and any HTTP error with status 429"""
+    if type(error).__name__ == "RateLimitError":
+        return True
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class _AdaptiveLimit:
+    """Concurrency limit that halves on rate limits and grows by one on success"""
+
+    def __init__(self, maximum: int):
+        self.maximum = maximum
+        self.limit = maximum
+        self._active = 0
+        self._successes = 0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self._active >= self.limit:
+                self._cond.wait()
+            self._active += 1
+
+    def release(self, rate_limited: bool = False) -> None:
+        with self._cond:
+            self._active -= 1
+            if rate_limited:
+                self.limit = max(1, self.limit // 2)
+                self._successes = 0
+            else:
+                self._successes += 1
+                # Additive increase: one more slot per `limit` clean batches
+                if self.limit < self.maximum and self._successes >= self.limit:
+                    self.limit += 1
+                    self._successes = 0
+            self._cond.notify_all()
+
+
+class ProgressLog:
+    """
+    Append-only record of finished batches: one JSON line per batch with the
+    chunk hashes and their float32 vectors (base64).
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def load(self) -> Dict[str, np.ndarray]:
+        """Vectors from earlier (possibly interrupted) runs; a torn last line is ignored"""
+        vectors: Dict[str, np.ndarray] = {}
+        if not self.path or not os.path.exists(self.path):
+            return vectors
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    matrix = np.frombuffer(base64.b64decode(record["vectors"]), dtype="<f4")
+                    matrix = matrix.reshape(len(record["hashes"]), record["dim"])
+                except (ValueError, KeyError):
+                    continue
+                vectors.update(zip(record["hashes"], matrix))
+        return vectors
+
+    def append(self, hashes: Sequence[str], vectors: np.ndarray) -> None:
+        if not self.path:
+            return
+        vectors = np.ascontiguousarray(vectors, dtype="<f4")
+        line = json.dumps({
+            "hashes": list(hashes),
+            "dim": int(vectors.shape[1]),
+            "vectors": base64.b64encode(vectors.tobytes()).decode("ascii")
+        })
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def remove(self) -> None:
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+@dataclass
+class IngestionStats:
+    """Counters of one ingestion run"""
+    chunks: int = 0
+    embedded: int = 0
+    resumed: int = 0
+    batches: int = 0
+    retries: int = 0
+    rate_limited: int = 0
+    elapsed: float = 0.0
+    final_concurrency: int = 0
+
+    @property
+    def chunks_per_sec(self) -> float:
+        return self.embedded / self.elapsed if self.elapsed else 0.0
+
+
+class EmbeddingIngestor:
+    """Embeds many chunks through a LangChain embeddings client"""
+
+    def __init__(
+        self,
+        embedding,
+        batch_size: int = EMBED_BATCH_SIZE,
+        max_concurrency: int = EMBED_MAX_CONCURRENCY,
+        max_retries: int = EMBED_MAX_RETRIES,
+        backoff_base: float = EMBED_BACKOFF_BASE,
+        backoff_max: float = EMBED_BACKOFF_MAX,
+        progress_path: Optional[str] = None
+    ):
+        """
+        Args:
+            embedding: LangChain embeddings instance (``embed_documents`` is called per batch)
+            batch_size: Chunks per request
+            max_concurrency: Upper bound on requests in flight
+            max_retries: Attempts per batch after the first, for rate limits and errors
+            backoff_base: First backoff delay in seconds (doubles per retry, with jitter)
+            backoff_max: Cap on a single backoff delay
+            progress_path: Checkpoint file for resuming; None disables resuming
+        """
+        self.embedding = embedding
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.progress = ProgressLog(progress_path)
+        self.last_stats: Optional[IngestionStats] = None
+        self._stats_lock = threading.Lock()
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        delay = _retry_after(error)
+        if delay is None:
+            delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+            delay *= 0.5 + random.random() / 2
+        return delay
+
+    def _embed_batch(self, texts: List[str], limit: _AdaptiveLimit, stats: IngestionStats) -> np.ndarray:
+        attempt = 0
+        while True:
+            limit.acquire()
+            rate_limited = False
+            try:
+                vectors = self.embedding.embed_documents(texts)
+                return np.asarray(vectors, dtype=np.float32).reshape(len(texts), -1)
+            except Exception as e:
+                rate_limited = is_rate_limit_error(e)
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt, e)
+                with self._stats_lock:
+                    stats.retries += 1
+                    stats.rate_limited += int(rate_limited)
+                reason = "rate limited" if rate_limited else f"failed ({str(e)[:100]})"
+                logger.warning(f"Embedding batch {reason}, retry {attempt + 1} in {delay:.1f}s")
+            finally:
+                limit.release(rate_limited)
+            time.sleep(delay)
+            attempt += 1
+
+    def embed(self, texts: Sequence[str], hashes: Sequence[str]) -> Dict[str, np.ndarray]:
+        """
+        Embed ``texts`` and return their vectors keyed by chunk hash.
+
+        Hashes already in the progress file are not sent again. The progress
+        file is kept on failure so the next run resumes; call ``finish`` once
+        the vectors are safely stored elsewhere.
+
+        Args:
+            texts: Chunk texts
+            hashes: Content hash of each text (same order)
+
+        Returns:
+            Dict of hash -> unnormalized float32 vector
+        """
+        stats = IngestionStats(chunks=len(texts))
+        vectors = self.progress.load()
+        wanted = set(hashes)
+        stats.resumed = sum(1 for h in vectors if h in wanted)
+
+        pending = {}
+        for text, h in zip(texts, hashes):
+            if h not in vectors:
+                pending.setdefault(h, text)
+        pending_hashes = list(pending)
+        batches = [
+            pending_hashes[i:i + self.batch_size]
+            for i in range(0, len(pending_hashes), self.batch_size)
+        ]
+        if stats.resumed:
+            logger.info(f"Resuming ingestion: {stats.resumed} chunks already embedded")
+
+        limit = _AdaptiveLimit(self.max_concurrency)
+        start = time.perf_counter()
+        last_report = start
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="embed") as pool:
+            futures = {
+                pool.submit(self._embed_batch, [pending[h] for h in batch], limit, stats): batch
+                for batch in batches
+            }
+            try:
+                for future in as_completed(futures):
+                    batch = futures[future]
+                    matrix = future.result()
+                    self.progress.append(batch, matrix)
+                    vectors.update(zip(batch, matrix))
+                    stats.batches += 1
+                    stats.embedded += len(batch)
+
+                    now = time.perf_counter()
+                    if now - last_report >= 5:
+                        last_report = now
+                        logger.info(
+                            f"Embedded {stats.embedded}/{len(pending_hashes)} chunks "
+                            f"({stats.embedded / (now - start):.1f} chunks/s, concurrency {limit.limit})"
+                        )
+            except BaseException:
+                for other in futures:
+                    other.cancel()
+                raise
+            finally:
+                stats.elapsed = time.perf_counter() - start
+                stats.final_concurrency = limit.limit
+                self.last_stats = stats
+
+        logger.info(
+            f"Ingestion done: {stats.embedded} embedded, {stats.resumed} resumed in {stats.elapsed:.1f}s "
+            f"({stats.chunks_per_sec:.1f} chunks/s, {stats.rate_limited} rate limits, {stats.retries} retries)"
+        )
+        return {h: vectors[h] for h in wanted if h in vectors}
+
+    def finish(self) -> None:
+        """Delete the progress file after its vectors were persisted"""
+        self.progress.remove()
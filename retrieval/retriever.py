@@ -0,0 +1,183 @@
+"""
+Knowledge base retriever used by the search_knowledge_base tool
+"""
+from typing import List
+
+from langchain_core.documents import Document
+
+from config.settings import (
+    RETRIEVAL_MODE,
+    HYBRID_CANDIDATES,
+    RRF_K,
+    BM25_FAST_PATH_MIN_SCORE,
+    BM25_FAST_PATH_RATIO,
+    TOOL_TIMEOUT,
+    TOOL_TIMEOUTS
+)
+from retrieval.bm25 import BM25Index, reciprocal_rank_fusion
+from retrieval.cache import QueryCache, normalize_query
+from retrieval.engine import RetrievalEngine
+from utils.logger import setup_logger
+from utils.single_flight import SingleFlight
+from utils.tracing import span
+
+logger = setup_logger(__name__)
+
+RETRIEVAL_MODES = ("vector", "bm25", "hybrid")
+
+# Sessions asking the same question at once share one embeddings request,
+# waiting for it no longer than the search tool's own time budget
+_query_embeddings = SingleFlight(
+    "query_embedding",
+    wait_timeout=TOOL_TIMEOUTS.get("search_knowledge_base", TOOL_TIMEOUT)
+)
+
+
+def _embedding_key(embedding) -> tuple:
+    return type(embedding).__name__, getattr(embedding, "model", None), getattr(embedding, "dimensions", None)
+
+
+class KnowledgeRetriever:
+    """Hybrid BM25 + vector retrieval fronted by a semantic query cache"""
+
+    def __init__(
+        self,
+        engine: RetrievalEngine,
+        cache: QueryCache = None,
+        bm25: BM25Index = None,
+        mode: str = RETRIEVAL_MODE
+    ):
+        """
+        Args:
+            engine: Vector retrieval engine
+            cache: Query cache (a private one is created if omitted)
+            bm25: Lexical index over the same chunks (built if omitted)
+            mode: 'vector', 'bm25' or 'hybrid'
+        """
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode: {mode}")
+
+        # Engine and lexical index are swapped together as one tuple, so a
+        # search always sees a consistent pair (see ``swap``)
+        self._state = (engine, bm25 if bm25 is not None else BM25Index(engine.index.texts))
+        self.cache = cache if cache is not None else QueryCache()
+        self.mode = mode
+
+        self.embedding_calls = 0
+        self.lexical_fast_path = 0
+
+    def __len__(self) -> int:
+        return len(self.engine)
+
+    @property
+    def engine(self) -> RetrievalEngine:
+        return self._state[0]
+
+    @property
+    def bm25(self) -> BM25Index:
+        return self._state[1]
+
+    def swap(self, engine: RetrievalEngine, bm25: BM25Index) -> None:
+        """
+        Atomically replace the index being searched.
+
+        Searches already running finish against the old engine; the query
+        cache is invalidated by the new index key on the next search.
+        """
+        old_key = self.engine.key
+        self._state = (engine, bm25)
+        logger.info(f"Swapped index {old_key[:12]} -> {engine.key[:12]} ({len(engine)} chunks)")
+
+    @property
+    def key(self) -> str:
+        return self.engine.key
+
+    def with_embedding(self, embedding) -> "KnowledgeRetriever":
+        """Return a retriever sharing this engine's data, lexical index and cache"""
+        return KnowledgeRetriever(
+            self.engine.with_embedding(embedding), self.cache, self.bm25, self.mode
+        )
+
+    def _lexical_is_confident(self, scores) -> bool:
+        if len(scores) == 0 or scores[0] < BM25_FAST_PATH_MIN_SCORE:
+            return False
+        return len(scores) == 1 or scores[0] >= BM25_FAST_PATH_RATIO * scores[1]
+
+    @staticmethod
+    def _documents(engine: RetrievalEngine, doc_ids) -> List[Document]:
+        return [engine.index.document(int(i)) for i in doc_ids]
+
+    def similarity_search(self, query: str, k: int = 4) -> List[Document]:
+        """
+        Return the ``k`` chunks most relevant to ``query``.
+
+        Keyword-heavy queries with a clear BM25 winner are answered from the
+        lexical index alone, without an embedding call.
+
+        Args:
+            query: Natural language query
+            k: Number of chunks to return
+
+        Returns:
+            Matching documents, best first
+        """
+        engine, bm25 = self._state
+
+        with span("retrieval.search", k=k) as trace:
+            self.cache.ensure_version(engine.key)
+
+            cache_key = (k, normalize_query(query))
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                trace.set(path="cache")
+                return cached
+
+            lexical_ids = lexical_scores = ()
+            if self.mode != "vector":
+                lexical_ids, lexical_scores = bm25.search(query, max(k, HYBRID_CANDIDATES))
+
+                if self.mode == "bm25" or self._lexical_is_confident(lexical_scores):
+                    self.lexical_fast_path += 1
+                    docs = self._documents(engine, lexical_ids[:k])
+                    self.cache.put(cache_key, docs, scope=k, version=engine.key)
+                    trace.set(path="lexical")
+                    return docs
+
+            with span("retrieval.embed"):
+                query_vector = _query_embeddings.do(
+                    (_embedding_key(engine.embedding), cache_key[1]), engine.embed_queries, [query]
+                )
+            self.embedding_calls += 1
+
+            cached = self.cache.get_similar(query_vector, scope=k)
+            if cached is not None:
+                self.cache.put(cache_key, cached, query_vector, scope=k, version=engine.key)
+                trace.set(path="semantic_cache")
+                return cached
+
+            with span("retrieval.vector_search"):
+                if self.mode == "hybrid" and len(lexical_ids):
+                    vector_ids, _ = engine.search_vectors(query_vector, max(k, HYBRID_CANDIDATES))
+                    doc_ids = reciprocal_rank_fusion([vector_ids[0], lexical_ids], k, RRF_K)
+                else:
+                    vector_ids, _ = engine.search_vectors(query_vector, k)
+                    doc_ids = vector_ids[0]
+
+            docs = self._documents(engine, doc_ids)
+            self.cache.put(cache_key, docs, query_vector, scope=k, version=engine.key)
+            trace.set(path=self.mode)
+            return docs
+
+    def search_batch(self, queries: List[str], k: int) -> List[List[Document]]:
+        """Uncached vector batch search, see ``RetrievalEngine.search_batch``"""
+        return self.engine.search_batch(queries, k)
+
+    def stats(self) -> dict:
+        """Retrieval and cache counters"""
+        stats = self.cache.stats()
+        stats.update({
+            "mode": self.mode,
+            "embedding_calls": self.embedding_calls,
+            "lexical_fast_path": self.lexical_fast_path
+        })
+        return stats
@@ -0,0 +1,91 @@
+"""
+Knowledge base file watcher
+
+Watches KB_DIR from a daemon thread and calls a refresh callback after a
+burst of changes settles. The callback (``AgentRegistry.refresh_index``)
+re-embeds only the changed chunks and hot-swaps the live index.
+"""
+import threading
+from typing import Callable, Optional
+
+from config.settings import KB_DIR, KB_FILE_EXTENSIONS, KB_WATCH_DEBOUNCE_MS
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+try:
+    import watchfiles
+except ImportError:  # pragma: no cover - watchfiles is optional
+    watchfiles = None
+
+
+class KnowledgeBaseWatcher:
+    """Runs ``on_change`` whenever knowledge base files are added, edited or deleted"""
+
+    def __init__(
+        self,
+        on_change: Callable[[], object],
+        directory: str = KB_DIR,
+        debounce_ms: int = KB_WATCH_DEBOUNCE_MS
+    ):
+        """
+        Args:
+            on_change: Called (from the watcher thread) after each settled batch of changes
+            directory: Directory to watch recursively
+            debounce_ms: Quiet period that ends a batch of changes
+        """
+        self.on_change = on_change
+        self.directory = directory
+        self.debounce_ms = debounce_ms
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        """Start watching; returns False if watchfiles is not installed"""
+        if watchfiles is None:
+            logger.warning("watchfiles not installed, knowledge base hot reload disabled")
+            return False
+        if not self.running:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="kb-watcher", daemon=True)
+            self._thread.start()
+            logger.info(f"Watching {self.directory} for knowledge base changes")
+        return True
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        for changes in watchfiles.watch(
+            self.directory,
+            watch_filter=lambda change, path: path.endswith(KB_FILE_EXTENSIONS),
+            debounce=self.debounce_ms,
+            stop_event=self._stop
+        ):
+            logger.info(f"Knowledge base changed ({len(changes)} file events), refreshing index")
+            try:
+                self.on_change()
+            except Exception as e:
+                logger.error(f"Knowledge base refresh failed: {str(e)}")
+
+
+_watcher: Optional[KnowledgeBaseWatcher] = None
+_watcher_lock = threading.Lock()
+
+
+def start_kb_watcher(on_change: Callable[[], object]) -> Optional[KnowledgeBaseWatcher]:
+    """Start the process-wide watcher once (safe to call on every Streamlit rerun)"""
+    global _watcher
+    with _watcher_lock:
+        if _watcher is None:
+            watcher = KnowledgeBaseWatcher(on_change)
+            if not watcher.start():
+                return None
+            _watcher = watcher
+        return _watcher
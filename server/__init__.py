@@ -0,0 +1,28 @@
+"""
+HTTP API for the assistant (FastAPI, Server-Sent Events) and its client
+
+Names are imported on first access, so the thin Streamlit client can use
+``AssistantClient`` without loading FastAPI or the agent stack.
+"""
+import importlib
+
+_EXPORTS = {
+    'create_app': '.api',
+    'AssistantClient': '.client',
+    'AssistantAPIError': '.client'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,60 @@
+"""
+Run the assistant API
+
+The knowledge index is built or updated once here, before the workers
+start, so every worker only memory-maps the finished file (and the HNSW
+graph cached next to it) instead of racing to build its own copy.
+
+Usage:
+    OPENAI_API_KEY=sk-... python -m server [--host 127.0.0.1] [--port 8000] [--workers 2]
+"""
+import argparse
+import os
+
+from config.settings import KB_DIR, SERVER_HOST, SERVER_PORT, SERVER_WORKERS
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def prepare_index() -> bool:
+    """Build or update the shared index file; returns False if that wasn't possible"""
+    from agent.agent_setup import create_embeddings, create_engine
+    from data.knowledge_base import load_documents
+    from retrieval.index_store import load_or_build_index
+
+    try:
+        index = load_or_build_index(load_documents(KB_DIR), create_embeddings(os.environ.get("OPENAI_API_KEY")))
+        create_engine(index)
+    except Exception as e:
+        logger.warning(f"Index not prepared ({str(e)[:100]}); workers will build it on first use")
+        return False
+    logger.info(f"Index {index.key[:12]} ready for workers ({len(index)} chunks)")
+    return True
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Assistant HTTP API")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS)
+    parser.add_argument("--no-prepare", action="store_true", help="Skip building the index before forking")
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    if not args.no_prepare:
+        prepare_index()
+    uvicorn.run(
+        "server.api:create_app",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        timeout_graceful_shutdown=10
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,220 @@
+"""
+FastAPI service exposing the assistant and its tools
+
+Endpoints:
+    GET  /health          - liveness and the loaded index version
+    POST /chat            - one chat turn; Server-Sent Events when ``stream`` is true
+    GET  /tools           - tool names, descriptions and argument schemas
+    POST /tools/{name}    - call one tool with JSON arguments
+    GET  /usage           - the caller's request count and remaining quota
+    GET  /metrics         - Prometheus text of this worker's spans and counters
+
+The OpenAI key comes from the ``Authorization: Bearer sk-...`` header, or the
+server's OPENAI_API_KEY when the header is missing. The agent runs on the
+worker's own event loop, so one worker serves many concurrent chats; start
+several workers with ``python -m server --workers N`` (they share the
+memory-mapped knowledge index through the page cache).
+"""
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, List, Optional
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+from config.settings import PLATFORM_NAME, SERVER_RATE_LIMIT
+from utils.logger import setup_logger, set_request_id
+from utils.rate_limiter import RateLimiter, limiter_key
+from utils.tracing import get_metrics, span
+from utils.validation import sanitize_input, validate_api_key
+
+logger = setup_logger(__name__)
+
+
+class ChatMessage(BaseModel):
+    role: str
+    content: str
+    error: bool = False
+
+
+class ChatRequest(BaseModel):
+    """
+    A chat turn.
+
+    ``messages`` holds the turns not yet covered by ``summary`` and ends with
+    the user's prompt. The final 'memory' event (or the ``summarized`` field)
+    says how many of those messages the updated summary now covers.
+    """
+    messages: List[ChatMessage] = Field(min_length=1)
+    summary: str = ""
+    stream: bool = True
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _default_bundle(api_key: str):
+    from agent.registry import get_registry
+
+    return get_registry().get(api_key)
+
+
+def create_app(
+    get_bundle: Optional[Callable[[str], object]] = None,
+    rate_limit: bool = SERVER_RATE_LIMIT
+) -> FastAPI:
+    """
+    Build the API application.
+
+    Args:
+        get_bundle: ``api_key -> AgentBundle`` (defaults to the shared agent registry)
+        rate_limit: Enforce the per-key request limit on /chat and /tools/{name}
+
+    Returns:
+        FastAPI app (also usable as a uvicorn factory: ``server.api:create_app``)
+    """
+    get_bundle = get_bundle or _default_bundle
+    server_key = os.environ.get("OPENAI_API_KEY")
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        if server_key and validate_api_key(server_key):
+            # Build the agent before the first request instead of during it
+            try:
+                await _bundle(server_key)
+            except Exception as e:
+                logger.error(f"Agent preload failed: {str(e)}")
+        yield
+
+    app = FastAPI(title=f"{PLATFORM_NAME} Assistant API", lifespan=lifespan)
+    app.state.index = None
+
+    async def _bundle(api_key: str):
+        from agent.service import warm_up
+
+        bundle = await asyncio.to_thread(get_bundle, api_key)
+        app.state.index = bundle.vectorstore.key
+        warm_up(bundle)
+        return bundle
+
+    def _api_key(request: Request) -> str:
+        header = request.headers.get("authorization", "")
+        api_key = header[7:].strip() if header.lower().startswith("bearer ") else server_key
+        if not api_key or not validate_api_key(api_key):
+            raise HTTPException(status_code=401, detail="Missing or invalid OpenAI API key")
+        return api_key
+
+    def _check_rate_limit(api_key: str) -> None:
+        if rate_limit and not RateLimiter(limiter_key(api_key, "api")).check_limit():
+            raise HTTPException(status_code=429, detail="Rate limit reached, please wait before sending more messages")
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok", "index": app.state.index, "pid": os.getpid()}
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def metrics():
+        return get_metrics().to_prometheus()
+
+    @app.get("/usage")
+    async def usage(request: Request):
+        limiter = RateLimiter(limiter_key(_api_key(request), "api"))
+        return {
+            "total": limiter.get_total(),
+            "remaining": limiter.get_remaining() if rate_limit else None,
+            "limit": limiter.limit if rate_limit else None
+        }
+
+    @app.get("/tools")
+    async def list_tools(request: Request):
+        bundle = await _bundle(_api_key(request))
+        return [
+            {"name": tool.name, "description": tool.description, "args": tool.args}
+            for tool in bundle.tools
+        ]
+
+    @app.post("/tools/{name}")
+    async def call_tool(name: str, arguments: dict, request: Request):
+        api_key = _api_key(request)
+        _check_rate_limit(api_key)
+        bundle = await _bundle(api_key)
+        tool = next((t for t in bundle.tools if t.name == name), None)
+        if tool is None:
+            raise HTTPException(status_code=404, detail=f"Unknown tool: {name}")
+        set_request_id()
+        try:
+            with span(f"api.tool.{name}"):
+                result = await tool.ainvoke(arguments)
+        except Exception as e:
+            logger.error(f"Tool {name} failed: {str(e)}")
+            raise HTTPException(status_code=422, detail=str(e))
+        return {"tool": name, "result": result}
+
+    @app.post("/chat")
+    async def chat(body: ChatRequest, request: Request):
+        api_key = _api_key(request)
+        _check_rate_limit(api_key)
+
+        messages = [m.model_dump() for m in body.messages]
+        if messages[-1]["role"] != "user":
+            raise HTTPException(status_code=400, detail="The last message must be the user's prompt")
+        messages[-1]["content"] = sanitize_input(messages[-1]["content"])
+        if len(messages[-1]["content"]) < 3:
+            raise HTTPException(status_code=400, detail="Please enter a valid question (min 3 characters)")
+
+        bundle = await _bundle(api_key)
+        events = _turn_events(bundle, messages, body.summary)
+
+        if body.stream:
+            return StreamingResponse(
+                events,
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
+
+        result = {}
+        async for chunk in events:
+            event, _, data = chunk.partition("\ndata: ")
+            payload = json.loads(data)
+            if event == "event: done":
+                result.update(answer=payload["text"], source=payload["source"])
+            elif event == "event: memory":
+                result.update(payload)
+            elif event == "event: error":
+                return JSONResponse(status_code=500, content={"detail": payload["message"]})
+        return result
+
+    return app
+
+
+async def _turn_events(bundle, messages: List[dict], summary: str) -> AsyncIterator[str]:
+    """SSE stream of one turn: tokens and tool progress, 'done', then 'memory'"""
+    from agent.history import ConversationMemory
+    from agent.service import astream_turn, finish_turn
+
+    set_request_id()
+    memory = ConversationMemory()
+    memory.summary = summary
+    answer = None
+    try:
+        with span("api.chat"):
+            async for event in astream_turn(bundle, messages, memory):
+                if event.kind == "token":
+                    yield _sse("token", {"text": event.text})
+                elif event.kind in ("tool_start", "tool_end"):
+                    yield _sse(event.kind, {"tool": event.tool})
+                elif event.kind == "done":
+                    answer = event.text
+                    yield _sse("done", {"text": event.text, "source": event.source})
+
+            # The summary update may call the model; do it after the answer is out
+            history = messages + [{"role": "assistant", "content": answer or ""}]
+            await asyncio.to_thread(finish_turn, bundle, history, memory)
+            yield _sse("memory", {"summary": memory.summary, "summarized": memory.summarized})
+    except Exception as e:
+        logger.error(f"Chat stream error: {str(e)}")
+        yield _sse("error", {"message": "Error processing request. Please try again."})
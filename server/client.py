@@ -0,0 +1,146 @@
+"""
+Client for the assistant HTTP API
+
+Used by the Streamlit app when API_BASE_URL is set, so the UI process needs
+neither LangChain nor the knowledge index. Server-Sent Events from /chat are
+turned back into the same event shape the in-process agent stream produces.
+"""
+import json
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
+
+import httpx
+
+from config.settings import API_BASE_URL
+from utils.http_client import get_http_client
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class AssistantAPIError(Exception):
+    """The API rejected a request or failed mid-stream"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@dataclass(frozen=True)
+class ChatEvent:
+    """One streamed event (same fields as ``agent.streaming.StreamEvent``)"""
+    kind: str
+    text: str = ""
+    tool: Optional[str] = None
+    source: Optional[str] = None
+
+
+@dataclass
+class ConversationState:
+    """
+    Summary state of a chat whose memory is managed by the server.
+
+    Has the two ``ConversationMemory`` attributes ``stream_chat`` uses, so the
+    client doesn't import the token counting behind the full class.
+    """
+    summary: str = ""
+    summarized: int = 0
+
+
+def iter_sse(lines: Iterator[str]) -> Iterator[tuple]:
+    """Parse Server-Sent Events into (event, data) pairs"""
+    event, data = "message", []
+    for line in lines:
+        if not line:
+            if data:
+                yield event, "\n".join(data)
+            event, data = "message", []
+        elif line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:"):
+            data.append(line[5:].lstrip())
+    if data:
+        yield event, "\n".join(data)
+
+
+class AssistantClient:
+    """Thin client of the assistant API"""
+
+    def __init__(self, api_key: str, base_url: str = API_BASE_URL, http_client: httpx.Client = None):
+        """
+        Args:
+            api_key: OpenAI API key forwarded to the server
+            base_url: Server URL, e.g. http://127.0.0.1:8000
+            http_client: Client to send requests with (defaults to the shared pool)
+        """
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.http = http_client or get_http_client()
+
+    @property
+    def _headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.api_key}"}
+
+    def health(self) -> dict:
+        response = self.http.get(f"{self.base_url}/health")
+        response.raise_for_status()
+        return response.json()
+
+    def usage(self) -> dict:
+        """The server's request total, remaining quota and limit for this key"""
+        response = self.http.get(f"{self.base_url}/usage", headers=self._headers)
+        if response.status_code != 200:
+            raise AssistantAPIError(response.json().get("detail", response.text), response.status_code)
+        return response.json()
+
+    def call_tool(self, name: str, **arguments) -> str:
+        response = self.http.post(f"{self.base_url}/tools/{name}", json=arguments, headers=self._headers)
+        if response.status_code != 200:
+            raise AssistantAPIError(response.json().get("detail", response.text), response.status_code)
+        return response.json()["result"]
+
+    def stream_chat(self, messages: List[dict], memory) -> Iterator[ChatEvent]:
+        """
+        Stream one chat turn.
+
+        Only the messages not yet covered by ``memory.summary`` are sent. The
+        server's updated summary is applied to ``memory`` when the turn ends.
+
+        Args:
+            messages: Full chat history ending with the user's prompt
+            memory: The chat's ConversationState or ConversationMemory (updated in place)
+
+        Yields:
+            ChatEvents, ending with one 'done' event
+        """
+        offset = memory.summarized
+        body = {
+            "messages": [
+                {"role": m["role"], "content": m["content"], "error": bool(m.get("error"))}
+                for m in messages[offset:]
+            ],
+            "summary": memory.summary,
+            "stream": True
+        }
+        with self.http.stream("POST", f"{self.base_url}/chat", json=body, headers=self._headers) as response:
+            if response.status_code != 200:
+                response.read()
+                try:
+                    detail = response.json().get("detail", response.text)
+                except ValueError:
+                    detail = response.text
+                raise AssistantAPIError(str(detail), response.status_code)
+
+            for event, data in iter_sse(response.iter_lines()):
+                payload = json.loads(data)
+                if event == "token":
+                    yield ChatEvent("token", text=payload["text"])
+                elif event in ("tool_start", "tool_end"):
+                    yield ChatEvent(event, tool=payload["tool"])
+                elif event == "done":
+                    yield ChatEvent("done", text=payload["text"], source=payload.get("source"))
+                elif event == "memory":
+                    memory.summary = payload["summary"]
+                    memory.summarized = offset + payload["summarized"]
+                elif event == "error":
+                    raise AssistantAPIError(payload["message"])
@@ -0,0 +1,69 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.load_test import build_index, fake_bundle
+from config.settings import RATE_LIMIT_REQUESTS
+from server.api import create_app
+from server.client import AssistantAPIError, AssistantClient, ConversationState, iter_sse
+
+
+@pytest.fixture(scope="module")
+def bundle(tmp_path_factory):
+    return fake_bundle(build_index(str(tmp_path_factory.mktemp("index"))))
+
+
+@pytest.fixture
+def client(bundle):
+    with TestClient(create_app(get_bundle=lambda api_key: bundle)) as test_client:
+        yield test_client
+
+
+def headers(api_key):
+    return {"Authorization": f"Bearer {api_key}"}
+
+
+def test_tools_endpoint_is_rate_limited(client):
+    key = "sk-tools-" + "1" * 40
+    statuses = [
+        client.post("/tools/calculate_profit", json={"purchase_price": 100, "selling_price": 300}, headers=headers(key))
+        .status_code
+        for _ in range(RATE_LIMIT_REQUESTS + 1)
+    ]
+    assert statuses == [200] * RATE_LIMIT_REQUESTS + [429]
+    assert client.get("/usage", headers=headers(key)).json() == {
+        "total": RATE_LIMIT_REQUESTS,
+        "remaining": 0,
+        "limit": RATE_LIMIT_REQUESTS
+    }
+
+
+def test_usage_requires_a_key(client, monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    assert client.get("/usage").status_code == 401
+
+
+def test_client_streams_a_turn_and_tracks_usage(client):
+    key = "sk-client-" + "2" * 40
+    api = AssistantClient(key, base_url="http://testserver", http_client=client)
+    memory = ConversationState()
+    events = list(api.stream_chat([{"role": "user", "content": "Calculate profit: buy £200, sell £450"}], memory))
+
+    assert events[-1].kind == "done"
+    assert events[-1].source == "router"
+    assert memory.summarized == 0
+    assert api.usage()["total"] == 1
+
+
+def test_client_raises_on_rate_limit(client):
+    key = "sk-limited-" + "3" * 40
+    api = AssistantClient(key, base_url="http://testserver", http_client=client)
+    for _ in range(RATE_LIMIT_REQUESTS):
+        api.call_tool("calculate_profit", purchase_price=100, selling_price=300)
+    with pytest.raises(AssistantAPIError) as error:
+        list(api.stream_chat([{"role": "user", "content": "hello there friend"}], ConversationState()))
+    assert error.value.status_code == 429
+
+
+def test_iter_sse_parses_events():
+    lines = ["event: token", 'data: {"text": "Hi"}', "", "event: done", "data: {}", ""]
+    assert list(iter_sse(iter(lines))) == [("token", '{"text": "Hi"}'), ("done", "{}")]
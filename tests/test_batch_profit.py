@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from tools.batch_profit import calculate_profit_batch, format_profit_table, rank_by_profit
+from tools.profit_calculator import TIER_NAMES
+
+
+def test_matches_the_single_item_formula():
+    results = calculate_profit_batch([100, 200], [300, 250], ["grailed", "eBay"], [8.0, 10.0])
+
+    np.testing.assert_allclose(results["fee_rate"], [0.12, 0.15])
+    np.testing.assert_allclose(results["profit"], [300 - 36 - 8 - 100, 250 - 37.5 - 10 - 200])
+    np.testing.assert_allclose(results["margin"], [156.0, 1.25])
+    assert [TIER_NAMES[t] for t in results["tier"]] == ["excellent", "low"]
+
+
+def test_invalid_rows_are_flagged_and_left_out_of_the_ranking():
+    results = calculate_profit_batch([100, 0.5, 300, 50], [150, 100, 200, 400])
+
+    assert results["valid"].tolist() == [True, False, False, True]
+    assert rank_by_profit(results)["item"].tolist() == [3, 0]
+
+
+def test_scalar_arguments_are_broadcast_and_lengths_checked():
+    results = calculate_profit_batch([10, 20, 30], 100, "vestiaire", 5.0)
+    np.testing.assert_allclose(results["shipping_cost"], [5.0] * 3)
+    np.testing.assert_allclose(results["fee_rate"], [0.15] * 3)
+
+    with pytest.raises(ValueError):
+        calculate_profit_batch([10, 20], [100, 200, 300])
+
+
+def test_table_lists_ranked_items_and_skips():
+    table = format_profit_table(calculate_profit_batch([100, 300], [300, 200]), labels=["Tabi", "Jacket"])
+
+    assert "1 of 2 items ranked" in table
+    assert "| 1 | Tabi | £100.00 | £300.00 |" in table
+    assert "1 item(s) skipped" in table
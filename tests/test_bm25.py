@@ -0,0 +1,39 @@
+from retrieval.bm25 import BM25Index, reciprocal_rank_fusion, tokenize
+
+TEXTS = [
+    "Margiela tabi boots have a split toe.",
+    "Rick Owens geobasket sneakers resell well on Grailed.",
+    "Photograph the tabi stitching and the split toe in daylight.",
+    "Pack items in a sturdy box."
+]
+
+
+def test_tokenize_drops_stopwords_and_punctuation():
+    assert tokenize("How do I sell the Tabi boots?") == ["sell", "tabi", "boots"]
+
+
+def test_search_ranks_matching_documents():
+    index = BM25Index(TEXTS)
+    ids, scores = index.search("tabi split toe boots", k=3)
+
+    assert ids.tolist() == [0, 2]
+    assert scores[0] > scores[1] > 0
+
+
+def test_search_without_known_terms_is_empty():
+    index = BM25Index(TEXTS)
+    ids, scores = index.search("the and of", k=3)
+    assert len(ids) == len(scores) == 0
+    assert len(index.search("vestiaire", k=3)[0]) == 0
+
+
+def test_search_caps_results_at_k():
+    index = BM25Index(TEXTS)
+    ids, _ = index.search("tabi geobasket box", k=2)
+    assert len(ids) == 2
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([[1, 2, 3], [4, 2, 5]], k=3, rrf_k=60)
+    assert fused == [2, 1, 4]
+    assert reciprocal_rank_fusion([[5, 6]], k=5, rrf_k=60) == [5, 6]
@@ -0,0 +1,80 @@
+import time
+
+import numpy as np
+from langchain_core.documents import Document
+
+from benchmarks.fakes import HashEmbeddings
+from retrieval.cache import QueryCache, normalize_query
+from retrieval.engine import RetrievalEngine
+from retrieval.index_store import load_or_build_index
+from retrieval.retriever import KnowledgeRetriever
+
+
+def unit(*values):
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_normalize_query():
+    assert normalize_query("  How do I   sell Tabi?? ") == "how do i sell tabi"
+
+
+def test_lru_eviction():
+    cache = QueryCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expiry_counts_a_miss():
+    cache = QueryCache(ttl=0.01)
+    cache.put("a", 1)
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert (stats["expirations"], stats["misses"], stats["size"]) == (1, 1, 0)
+
+
+def test_version_change_drops_entries():
+    cache = QueryCache()
+    cache.ensure_version("v1")
+    cache.put("a", 1, version="v1")
+    cache.put("stale", 2, version="v0")
+    assert len(cache) == 1
+
+    cache.ensure_version("v2")
+    assert cache.get("a") is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_semantic_lookup_respects_threshold_and_scope():
+    cache = QueryCache(similarity_threshold=0.95)
+    cache.put("a", "answer", unit(1, 0, 0), scope=4)
+
+    assert cache.get_similar(unit(1, 0.1, 0), scope=4) == "answer"
+    assert cache.get_similar(unit(1, 0.1, 0), scope=8) is None
+    assert cache.get_similar(unit(0, 1, 0), scope=4) is None
+    stats = cache.stats()
+    assert (stats["semantic_hits"], stats["semantic_misses"]) == (1, 2)
+
+
+def test_every_retriever_lookup_counts_a_hit_or_miss(tmp_path):
+    documents = [
+        Document(page_content="Margiela tabi boots resell well on Grailed.", metadata={"source": "a.md"}),
+        Document(page_content="Check the four white stitches on the back.", metadata={"source": "b.md"})
+    ]
+    index = load_or_build_index(documents, HashEmbeddings(32), str(tmp_path / "index.bin"))
+    retriever = KnowledgeRetriever(RetrievalEngine(index), mode="bm25")
+
+    retriever.similarity_search("tabi boots", k=1)
+    retriever.similarity_search("white stitches", k=1)
+    retriever.similarity_search("Tabi boots?", k=1)
+
+    stats = retriever.stats()
+    assert (stats["hits"], stats["misses"], stats["embedding_calls"]) == (1, 2, 0)
@@ -0,0 +1,51 @@
+import threading
+
+import numpy as np
+
+from retrieval import engine as engine_module
+from retrieval.engine import RetrievalEngine
+from retrieval.index_store import KnowledgeIndex
+
+
+def make_engine(n=2000, dim=32, hnsw=True):
+    vectors = np.random.default_rng(1).standard_normal((n, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    index = KnowledgeIndex("k", [f"chunk {i}" for i in range(n)], [{}] * n, vectors, hashes=[str(i) for i in range(n)])
+    return RetrievalEngine(index, hnsw_min_corpus=1 if hnsw else n + 1)
+
+
+def test_exact_search_returns_nearest_first():
+    engine = make_engine(200, hnsw=False)
+    ids, scores = engine.search_vectors(engine.matrix[[5, 7]], 3)
+    assert ids[:, 0].tolist() == [5, 7]
+    assert np.all(np.diff(scores, axis=1) <= 0)
+
+
+def test_hnsw_ef_is_fixed_and_restored_after_large_k():
+    engine = make_engine()
+    assert engine.backend == "hnsw"
+    assert engine._hnsw.ef == engine_module._GRAPH_EF
+
+    ids, _ = engine.search_vectors(engine.matrix[:1], engine_module._GRAPH_EF + 50)
+    assert ids.shape[1] == engine_module._GRAPH_EF + 50
+    assert engine._hnsw.ef == engine_module._GRAPH_EF
+
+
+def test_concurrent_queries_keep_recall():
+    engine = make_engine()
+    queries = engine.matrix[:100]
+    exact, _ = engine.exact_search_vectors(queries, 10)
+    recalls = []
+
+    def search(k):
+        for _ in range(5):
+            found, _ = engine.search_vectors(queries, k)
+            recalls.append(np.mean([len(set(e) & set(f[:10])) / 10 for e, f in zip(exact, found)]))
+
+    threads = [threading.Thread(target=search, args=(k,)) for k in (10, 10, 200)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert min(recalls) > 0.9
+    assert engine._hnsw.ef == engine_module._GRAPH_EF
@@ -0,0 +1,57 @@
+import pytest
+
+from data.guides import BrandMatcher, GuideRegistry
+
+ALIASES = {
+    "margiela": "margiela",
+    "mm6": "margiela",
+    "rick": "rick_owens",
+    "rick owens": "rick_owens",
+    "drkshdw": "rick_owens",
+    "rick owens x converse": "collab"
+}
+
+
+def test_matches_whole_words_plurals_and_spacing():
+    matcher = BrandMatcher(ALIASES)
+    assert matcher.match("Are these MARGIELAS legit?") == ["margiela"]
+    assert matcher.match("rickowens geobasket") == ["rick_owens"]
+    assert matcher.match("a rickshaw and a maroon mm61") == []
+
+
+def test_longer_alias_of_another_brand_wins():
+    matcher = BrandMatcher(ALIASES)
+    assert matcher.match("rick owens x converse turbowpn") == ["collab"]
+    assert matcher.match("drkshdw and mm6") == ["rick_owens", "margiela"]
+
+
+def write(path, brand, aliases, body):
+    path.write_text(f"---\nbrand: {brand}\naliases: {aliases}\n---\n{body}\n", encoding="utf-8")
+
+
+@pytest.fixture
+def registry(tmp_path):
+    auth = tmp_path / "authentication"
+    tutorials = tmp_path / "tutorials"
+    auth.mkdir()
+    tutorials.mkdir()
+    write(auth / "general.md", "General", "general", "General checklist")
+    write(auth / "margiela.md", "Maison Margiela", "mmm, mm6", "Margiela guide")
+    write(auth / "rick_owens.md", "Rick Owens", "drkshdw", "Rick guide, email {email}")
+    write(tutorials / "overview.md", "Overview", "overview, start", "Overview")
+    write(tutorials / "pricing.md", "Pricing", "prices", "Pricing tutorial")
+    return GuideRegistry(directory=str(tmp_path), max_brands=2)
+
+
+def test_registry_guides(registry):
+    assert registry.match_brands("Rick Owens ramones") == ["rick_owens"]
+    assert registry.authentication_guide("unknown brand") == "General checklist\n"
+    assert "{email}" not in registry.authentication_guide("drkshdw")
+
+    combined = registry.authentication_guide("mmm tabi vs rick owens geos")
+    assert combined.startswith("Rick guide") and "Margiela guide" in combined
+
+
+def test_registry_tutorials(registry):
+    assert registry.tutorial("Prices") == "Pricing tutorial\n"
+    assert registry.tutorial("something else") == "Overview\n"
@@ -0,0 +1,66 @@
+from agent.history import ConversationMemory, count_tokens, extractive_summary
+
+
+def chat(turns):
+    messages = []
+    for i in range(turns):
+        messages.append({"role": "user", "content": f"question {i}"})
+        messages.append({"role": "assistant", "content": f"answer {i}"})
+    return messages
+
+
+def contents(context):
+    return [m["content"] for m in context]
+
+
+def test_recent_turns_are_sent_verbatim():
+    memory = ConversationMemory(recent_turns=2)
+    messages = chat(4) + [{"role": "user", "content": "latest"}]
+
+    assert contents(memory.context(messages)) == [
+        "question 2", "answer 2", "question 3", "answer 3", "latest"
+    ]
+
+
+def test_error_placeholders_are_not_context():
+    memory = ConversationMemory()
+    messages = chat(1) + [
+        {"role": "assistant", "content": "Something went wrong", "error": True},
+        {"role": "user", "content": "latest"}
+    ]
+    assert contents(memory.context(messages)) == ["question 0", "answer 0", "latest"]
+
+
+def test_token_budget_limits_the_window_but_keeps_the_prompt():
+    memory = ConversationMemory(max_tokens=1, recent_turns=10)
+    messages = chat(3) + [{"role": "user", "content": "a long latest prompt " * 20}]
+    assert len(memory.context(messages)) == 1
+
+
+def test_compact_folds_old_messages_into_the_summary():
+    memory = ConversationMemory(recent_turns=1)
+    messages = chat(3)
+
+    calls = []
+
+    def summarize(summary, evicted, max_tokens):
+        calls.append(contents(evicted))
+        return summary + "|".join(contents(evicted))
+
+    assert memory.compact(messages, summarize)
+    assert calls == [["question 0", "answer 0", "question 1", "answer 1"]]
+    assert not memory.compact(messages, summarize)
+
+    context = memory.context(messages + [{"role": "user", "content": "latest"}])
+    assert context[0]["role"] == "system"
+    assert "question 0" in context[0]["content"]
+    assert contents(context[1:]) == ["question 2", "answer 2", "latest"]
+
+
+def test_extractive_summary_stays_within_budget():
+    messages = [{"role": "user", "content": f"item {i} " + "detail " * 50} for i in range(20)]
+    summary = extractive_summary("", messages, max_tokens=60)
+
+    assert count_tokens(summary) <= 60
+    assert "item 19" in summary
+    assert "item 0 " not in summary
@@ -0,0 +1,47 @@
+import os
+import threading
+
+import numpy as np
+from langchain_core.documents import Document
+
+from benchmarks.fakes import HashEmbeddings
+from retrieval.index_store import load_index, load_or_build_index, write_index
+
+
+def documents(source="a.md"):
+    return [
+        Document(page_content="Margiela tabi boots resell well on Grailed.", metadata={"source": source}),
+        Document(page_content="Check the four white stitches on the back.", metadata={"source": "b.md"})
+    ]
+
+
+def test_metadata_change_rebuilds_without_reembedding(tmp_path):
+    path = str(tmp_path / "index.bin")
+    embedding = HashEmbeddings(32)
+    first = load_or_build_index(documents(), embedding, path)
+    assert load_or_build_index(documents(), embedding, path).key == first.key
+
+    moved = load_or_build_index(documents(source="renamed.md"), embedding, path)
+    assert moved.key != first.key
+    assert moved.metadatas[0]["source"] == "renamed.md"
+    np.testing.assert_array_equal(np.asarray(moved.vectors), np.asarray(first.vectors))
+
+
+def test_concurrent_writers_leave_a_complete_index(tmp_path):
+    path = str(tmp_path / "index.bin")
+    texts = [f"chunk {i}" for i in range(200)]
+    vectors = np.random.default_rng(0).random((200, 64), dtype=np.float32)
+
+    def write(key):
+        for _ in range(5):
+            write_index(path, key, texts, [{}] * len(texts), vectors)
+
+    threads = [threading.Thread(target=write, args=(f"key-{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    index = load_index(path)
+    assert index is not None and len(index) == 200
+    assert os.listdir(tmp_path) == ["index.bin"]
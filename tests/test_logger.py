@@ -0,0 +1,38 @@
+import logging
+
+from utils import logger as logger_module
+from utils.logger import request_context, setup_logger
+
+
+def test_module_loggers_propagate_to_caplog(caplog):
+    log = setup_logger("tests.logger.propagate")
+    with caplog.at_level(logging.INFO, logger="tests.logger.propagate"):
+        with request_context("req-1"):
+            log.info("hello")
+
+    assert log.propagate
+    assert not log.handlers
+    [record] = [r for r in caplog.records if r.name == "tests.logger.propagate"]
+    assert record.getMessage() == "hello"
+    assert record.request_id == "req-1"
+
+
+def test_output_handlers_are_attached_once():
+    setup_logger("tests.logger.a")
+    setup_logger("tests.logger.a.child")
+    setup_logger("tests.logger.b")
+
+    root = logging.getLogger()
+    shared = [h for h in root.handlers if h in logger_module._root_handlers]
+    assert len(shared) == len(logger_module._root_handlers)
+    assert len(setup_logger("tests.logger.a").filters) == 1
+
+
+def test_sampling_still_applies_to_propagated_records(caplog, monkeypatch):
+    monkeypatch.setitem(logger_module.LOG_SAMPLE_RATES, "tests.logger.sampled", 0.0)
+    log = setup_logger("tests.logger.sampled")
+    with caplog.at_level(logging.INFO, logger="tests.logger.sampled"):
+        log.info("dropped")
+        log.warning("kept")
+
+    assert [r.getMessage() for r in caplog.records if r.name == "tests.logger.sampled"] == ["kept"]
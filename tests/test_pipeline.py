@@ -0,0 +1,43 @@
+import csv
+
+import pytest
+
+from pipeline.scoring import ListingScorer, run_pipeline
+
+
+@pytest.mark.parametrize("text, condition", [
+    ("New", "new"),
+    ("Unworn", "new"),
+    ("New with tags", "new"),
+    ("never worn", "new"),
+    ("like new", "excellent"),
+    ("excellent used", "excellent"),
+    ("Excellent condition", "excellent"),
+    ("very good", "excellent"),
+    ("good used condition", "good"),
+    ("Pre-owned", "good"),
+    ("worn", "good"),
+    ("fair, damaged sole", "fair"),
+    ("", "excellent"),
+])
+def test_condition(text, condition):
+    assert ListingScorer._condition(text) == condition
+
+
+def test_run_pipeline_in_process(tmp_path):
+    listings = tmp_path / "listings.csv"
+    with open(listings, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "title", "condition", "price", "postage", "url"])
+        writer.writerow(["cheap", "Maison Margiela tabi boots 41", "Used", "£20", "0", ""])
+        writer.writerow(["dear", "Maison Margiela tabi boots 42", "New with tags", "£5,000", "0", ""])
+        writer.writerow(["unknown", "plain white t-shirt", "", "£5", "", ""])
+
+    output = tmp_path / "opportunities.csv"
+    report = run_pipeline(str(listings), str(output), workers=0, top=5)
+
+    with open(output, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["id"] for row in rows] == ["cheap"]
+    assert rows[0]["condition"] == "good"
+    assert report.opportunities == 1
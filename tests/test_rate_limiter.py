@@ -0,0 +1,39 @@
+import fakeredis
+import redis
+
+from utils.rate_limiter import MemoryBackend, RateLimiter, RedisBackend
+
+
+def test_sliding_window_limit():
+    backend = MemoryBackend()
+    assert [backend.hit("k", 3, 60, 60.0)[0] for _ in range(4)] == [True, True, True, False]
+    # Halfway through the next window, half of the previous count still applies
+    assert backend.hit("k", 3, 60, 150.0, consume=False) == (True, 1)
+    assert backend.hit("k", 3, 60, 175.0, consume=False) == (True, 2)
+
+
+def test_total_survives_prune():
+    backend = MemoryBackend()
+    for _ in range(3):
+        backend.hit("idle", 10, 60, 100.0)
+    backend.hit("other", 10, 60, 400.0)
+
+    assert "idle" not in backend._counters
+    assert backend.total("idle") == 3
+    assert backend.hit("idle", 10, 60, 400.0, consume=False) == (True, 10)
+
+
+def test_redis_backend_shares_counts():
+    client = fakeredis.FakeRedis()
+    first = RateLimiter("k", backend=RedisBackend(client=client), limit=2, window=60)
+    second = RateLimiter("k", backend=RedisBackend(client=client), limit=2, window=60)
+    assert first.check_limit() and second.check_limit()
+    assert not first.check_limit()
+    assert second.get_total() == 2
+
+
+def test_redis_outage_falls_back_to_memory():
+    client = redis.Redis.from_url("redis://127.0.0.1:1", socket_connect_timeout=0.1)
+    limiter = RateLimiter("k", backend=RedisBackend(client=client), limit=2, window=60)
+    assert [limiter.check_limit() for _ in range(3)] == [True, True, False]
+    assert limiter.get_total() == 2
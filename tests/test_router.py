@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from agent.router import _amount, _parse_profit, get_router
+from config.settings import EXAMPLE_QUESTIONS
+
+
+def intents(prompt):
+    return [name for name, _, _ in get_router()._matches(prompt)]
+
+
+@pytest.mark.parametrize("prompt, intent", [
+    ("Calculate profit: buy £200, sell £450", "profit"),
+    ("Calculate profit: buy £150, sell £350 on Grailed", "profit"),
+    ("How do I authenticate Margiela?", "authentication"),
+    ("How do I authenticate Margiela pieces?", "authentication"),
+    ("authentication tips for mmm", "authentication"),
+    ("Show me the complete tutorial", "tutorial"),
+    ("What's the price of margiela tabi boots in good condition?", "price_range"),
+    ("What do margiela sneakers sell for on grailed?", "price_range"),
+])
+def test_routes_well_formed_prompts(prompt, intent):
+    assert intents(prompt) == [intent]
+
+
+@pytest.mark.parametrize("prompt", [
+    "buy £200 sell £450 then tell me about margiela",
+    "Tell me about margiela, buy 100 sell 300 profit",
+    "Calculate profit: buy 200, sell 450. Also what sells best?",
+    "How do I authenticate my account?",
+    "What does rick owens sneakers not sell for?",
+    "price of margiela boots and also rick jackets",
+    "How does Graby AI work?",
+    "Tips for listing photos?",
+])
+def test_partly_understood_prompts_go_to_the_agent(prompt):
+    assert intents(prompt) == []
+
+
+def test_example_questions_route_to_at_most_one_intent():
+    for prompt in EXAMPLE_QUESTIONS:
+        assert len(intents(prompt)) <= 1
+
+
+def test_thousands_separators():
+    assert _parse_profit("Calculate profit: buy £1,200, sell £2,000") == {
+        "purchase_price": 1200.0,
+        "selling_price": 2000.0
+    }
+    assert _amount("12,5") == 12.5
+    assert _amount("1,2345") is None
+    assert _parse_profit("Calculate profit: buy £1,2345, sell £2,000") is None
+
+
+def test_route_calls_the_tool():
+    result = get_router().route("Calculate profit: buy £200, sell £450 on grailed")
+    assert result.intent == "profit"
+    assert "GRAILED" in result.response
+    assert get_router().route("How do I authenticate my account?") is None
+
+
+def test_importing_the_router_does_not_load_duckdb():
+    code = "import sys, agent.router, tools; tools.get_price_range; print('duckdb' in sys.modules)"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
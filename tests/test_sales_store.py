@@ -0,0 +1,66 @@
+import datetime
+
+import pytest
+
+from data.sales_store import SoldPriceStore
+
+pytest.importorskip("duckdb")
+
+AS_OF = datetime.date(2026, 1, 31)
+
+
+def sale(condition, price, days_ago, platform="grailed", brand="Rick Owens", item_type="Sneakers"):
+    return {
+        "brand": brand,
+        "item_type": item_type,
+        "condition": condition,
+        "platform": platform,
+        "price": price,
+        "sold_at": (AS_OF - datetime.timedelta(days=days_ago)).isoformat()
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SoldPriceStore(path=str(tmp_path / "sales.duckdb"), aliases_path=None, min_samples=3)
+    records = (
+        [sale("good", price, days) for price, days in [(300, 5), (320, 10), (340, 20), (360, 40), (380, 100)]]
+        + [sale("new", 600, 3, platform="ebay")]
+        + [sale("mint", 100, 1), sale("good", -5, 1), sale("good", 200, 1, brand="")]
+    )
+    result = store.ingest(records, as_of=AS_OF)
+    assert result == {"read": 9, "appended": 6, "rejected": 3}
+    return store
+
+
+def test_segment_statistics(store):
+    stats = store.segment("rick owens", "sneaker", "good")
+
+    assert (stats.brand, stats.item_type, stats.condition) == ("rick owens", "sneaker", "good")
+    assert stats.sales == 5
+    assert stats.median == 340
+    assert (stats.sales_30, stats.sales_90) == (3, 4)
+    assert stats.last_sold == datetime.date(2026, 1, 26)
+
+
+def test_thin_segment_falls_back_to_all_conditions(store):
+    stats = store.segment("Rick Owens", "sneakers", "new")
+    assert stats.condition == "all"
+    assert stats.sales == 6
+    assert stats.platforms == ("ebay", "grailed")
+
+
+def test_unknown_segment_and_query_filters(store):
+    assert store.segment("margiela", "sneakers") is None
+    assert store.resolve_brand("margiela") is None
+
+    ebay = store.query("rick owens", "sneakers", platform="ebay")
+    assert (ebay.sales, ebay.median) == (1, 600)
+    assert store.query("rick owens", "sneakers", platform="vestiaire") is None
+
+
+def test_a_second_process_loads_the_aggregates(store):
+    reader = SoldPriceStore(path=store.path, aliases_path=None, min_samples=3)
+    assert reader.load()
+    assert len(reader) == len(store)
+    assert reader.segment("rick owens", "sneakers", "good").median == 340
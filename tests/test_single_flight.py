@@ -0,0 +1,87 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from utils.single_flight import FlightAborted, SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    group = SingleFlight("test_share")
+    calls = []
+    started = threading.Event()
+
+    def upstream():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return "answer"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(group.do("k", upstream)))
+    leader.start()
+    started.wait(1)
+    followers = [threading.Thread(target=lambda: results.append(group.do("k", upstream))) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    for thread in [leader] + followers:
+        thread.join()
+
+    assert results == ["answer"] * 4
+    assert calls == [1]
+    assert group.stats() == {"calls": 4, "upstream": 1, "saved": 3, "in_flight": 0}
+
+
+def test_leader_error_reaches_followers():
+    group = SingleFlight("test_error")
+    leader = group.join("k")
+    follower = group.join("k")
+    leader.reject(ValueError("boom"))
+    with pytest.raises(ValueError):
+        follower.wait()
+
+
+def test_abandoned_flight_aborts_followers():
+    group = SingleFlight("test_abort")
+    leader = group.join("k")
+    follower = group.join("k")
+    leader.close()
+    with pytest.raises(FlightAborted):
+        follower.wait()
+    assert group.stats()["saved"] == 0
+
+
+def test_follower_stops_waiting_on_a_stuck_leader():
+    group = SingleFlight("test_timeout", wait_timeout=0.05)
+    stuck = group.join("k")
+    assert stuck.leader
+
+    start = time.perf_counter()
+    assert group.do("k", lambda: "own answer") == "own answer"
+    assert time.perf_counter() - start < 1
+    assert group.stats()["saved"] == 0
+    assert group.stats()["upstream"] == 2
+
+    with pytest.raises(TimeoutError):
+        group.join("k").wait(timeout=0.01)
+    stuck.resolve("late")
+
+
+def test_cancelled_async_follower_leaves_others_waiting():
+    async def scenario():
+        group = SingleFlight("test_cancel")
+
+        async def upstream():
+            await asyncio.sleep(0.1)
+            return "answer"
+
+        leader = asyncio.create_task(group.ado("k", upstream))
+        await asyncio.sleep(0.01)
+        first = asyncio.create_task(group.ado("k", upstream))
+        second = asyncio.create_task(group.ado("k", upstream))
+        await asyncio.sleep(0.02)
+        first.cancel()
+        return await leader, await second, first.cancelled()
+
+    assert asyncio.run(scenario()) == ("answer", "answer", True)
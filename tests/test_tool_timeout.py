@@ -0,0 +1,36 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from agent.async_runner import ToolTimeoutMiddleware
+
+
+def request(name="slow_tool"):
+    return SimpleNamespace(tool_call={"name": name, "id": "call-1"})
+
+
+def test_timed_out_calls_are_bounded_and_released():
+    middleware = ToolTimeoutMiddleware(default_timeout=0.05, max_workers=1)
+    release = threading.Event()
+
+    def hang(_):
+        release.wait(5)
+        return "late"
+
+    first = middleware.wrap_tool_call(request(), hang)
+    assert first.status == "error" and "timed out" in first.content
+    assert middleware.abandoned == 1
+
+    # The only worker is busy: the next call times out in the queue and never runs
+    ran = []
+    second = middleware.wrap_tool_call(request(), lambda _: ran.append(1))
+    assert second.status == "error"
+    assert middleware.abandoned == 1
+
+    release.set()
+    deadline = time.time() + 2
+    while middleware.abandoned and time.time() < deadline:
+        time.sleep(0.01)
+    assert middleware.abandoned == 0
+    assert ran == []
+    assert middleware.wrap_tool_call(request(), lambda _: "ok") == "ok"
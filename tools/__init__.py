@@ -1,14 +1,31 @@
 """
 Import all tools for easy access
+
+Tools are registered by name and their modules (and LangChain) are only
+imported when a tool is first accessed, e.g. ``from tools import calculate_profit``.
 """
-from .profit_calculator import calculate_profit
-from .price_lookup import get_price_range
-from .tutorial import get_platform_tutorial
-from .authentication import check_authentication_tips
-
-__all__ = [
-    'calculate_profit',
-    'get_price_range',
-    'get_platform_tutorial',
-    'check_authentication_tips'
-]
\ No newline at end of file
+import importlib
+
+_TOOL_MODULES = {
+    'calculate_profit': '.profit_calculator',
+    'calculate_batch_profit': '.batch_profit',
+    'get_price_range': '.price_lookup',
+    'get_platform_tutorial': '.tutorial',
+    'check_authentication_tips': '.authentication'
+}
+
+__all__ = list(_TOOL_MODULES)
+
+
+def __getattr__(name):
+    module = _TOOL_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    # Cache on the package so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -2,8 +2,8 @@
 Authentication guidance tool
 """
 from langchain.tools import tool
+from data.guides import FALLBACK_AUTH_GUIDE, get_guide_registry
 from utils.logger import setup_logger
-from config.settings import WHATSAPP_GROUP_EMAIL
 
 logger = setup_logger(__name__)
 
@@ -13,49 +13,13 @@ def check_authentication_tips(brand: str = "general") -> str:
     Provide authentication guidelines for specific brands.
     
     Args:
-        brand: Designer brand name or 'general'
+        brand: Designer brand name(s) or 'general'
     
     Returns:
-        Authentication checklist
+        Authentication checklist (one per brand for collaborations)
     """
-    
-    auth_guides = {
-        "margiela": """
-🔍 **Maison Margiela Authentication Guide**
-
-**Key Details:**
-✓ Four white stitches on back
-✓ Blank fabric label with numbers
-✓ Premium materials
-✓ Quality construction
-
-**Red Flags:**
-❌ Missing white stitches
-❌ Poor stitching quality
-❌ Cheap materials
-
-📧 **Need expert help?**
-Email {email} to join our WhatsApp group for authentication support!
-""".format(email=WHATSAPP_GROUP_EMAIL),
-        
-        "general": """
-🔍 **Universal Authentication Checklist**
-
-1. Check labels and tags
-2. Verify construction quality
-3. Review seller profile
-4. Analyze description
-5. Check seller location
-6. Combine all factors
-
-📧 **Email {email} to join our WhatsApp group** for expert authentication help!
-""".format(email=WHATSAPP_GROUP_EMAIL)
-    }
-    
-    brand_lower = brand.lower()
-    
-    for key, guide in auth_guides.items():
-        if key in brand_lower:
-            return guide
-    
-    return auth_guides["general"]
\ No newline at end of file
+    try:
+        return get_guide_registry().authentication_guide(brand)
+    except Exception as e:
+        logger.error(f"Error loading authentication guide: {str(e)}")
+        return FALLBACK_AUTH_GUIDE
@@ -0,0 +1,196 @@
+"""
+Vectorized batch profit calculation
+
+Uses the same fee table and margin tiers as ``calculate_profit`` but computes
+a whole list of items in one NumPy pass.
+"""
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+from langchain.tools import tool
+
+from config.settings import MIN_PRICE, MAX_PRICE
+from tools.profit_calculator import (
+    PLATFORM_FEES,
+    DEFAULT_PLATFORM_FEE,
+    MARGIN_TIERS,
+    TIER_NAMES
+)
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+BATCH_PROFIT_MAX_ITEMS = 500
+DEFAULT_SHIPPING_COST = 8.0
+
+PROFIT_DTYPE = np.dtype([
+    ("item", np.int32),
+    ("purchase_price", np.float64),
+    ("selling_price", np.float64),
+    ("shipping_cost", np.float64),
+    ("fee_rate", np.float64),
+    ("platform_fees", np.float64),
+    ("net_revenue", np.float64),
+    ("profit", np.float64),
+    ("margin", np.float64),
+    ("tier", np.int8),
+    ("valid", np.bool_)
+])
+
+# Ascending thresholds for np.digitize: margin < 20 -> low ... >= 50 -> excellent
+_TIER_THRESHOLDS = np.array(sorted(t for t, _ in MARGIN_TIERS[:-1]), dtype=np.float64)
+
+
+def _broadcast(values, n: int, dtype) -> np.ndarray:
+    array = np.asarray(values, dtype=dtype)
+    if array.ndim == 0:
+        return np.full(n, array, dtype=dtype)
+    if len(array) != n:
+        raise ValueError(f"Expected {n} values, got {len(array)}")
+    return array
+
+
+def fee_rates(platforms: Union[str, Sequence[str]], n: int) -> np.ndarray:
+    """Map platform names to fee rates, one dictionary lookup per distinct platform"""
+    if isinstance(platforms, str):
+        return np.full(n, PLATFORM_FEES.get(platforms.lower(), DEFAULT_PLATFORM_FEE))
+
+    names = np.char.lower(_broadcast(platforms, n, str))
+    unique, inverse = np.unique(names, return_inverse=True)
+    rates = np.array([PLATFORM_FEES.get(str(p), DEFAULT_PLATFORM_FEE) for p in unique])
+    return rates[inverse] if n else np.empty(0)
+
+
+def calculate_profit_batch(
+    purchase_prices: Sequence[float],
+    selling_prices: Sequence[float],
+    platforms: Union[str, Sequence[str]] = "grailed",
+    shipping_costs: Union[float, Sequence[float]] = DEFAULT_SHIPPING_COST
+) -> np.ndarray:
+    """
+    Compute profit for many items at once.
+
+    Args:
+        purchase_prices: Prices paid on eBay UK in GBP
+        selling_prices: Expected selling prices in GBP
+        platforms: One platform for all items, or one per item
+        shipping_costs: One shipping cost for all items, or one per item
+
+    Returns:
+        Structured array (PROFIT_DTYPE), one row per input item in input
+        order. ``valid`` is False for rows ``calculate_profit`` would reject
+        (prices out of range or no profit possible).
+    """
+    purchase = np.asarray(purchase_prices, dtype=np.float64).ravel()
+    n = len(purchase)
+    selling = _broadcast(selling_prices, n, np.float64)
+    shipping = _broadcast(shipping_costs, n, np.float64)
+    rates = fee_rates(platforms, n)
+
+    platform_fees = selling * rates
+    net_revenue = selling - platform_fees - shipping
+    profit = net_revenue - purchase
+    with np.errstate(divide="ignore", invalid="ignore"):
+        margin = np.where(purchase > 0, profit / purchase * 100, 0.0)
+
+    valid = (
+        (purchase > MIN_PRICE) & (purchase < MAX_PRICE)
+        & (selling > MIN_PRICE) & (selling < MAX_PRICE)
+        & (selling > purchase)
+    )
+
+    # digitize gives 0 (low) .. 3 (excellent); TIER_NAMES is best first
+    tier = (len(_TIER_THRESHOLDS) - np.digitize(margin, _TIER_THRESHOLDS)).astype(np.int8)
+
+    result = np.empty(n, dtype=PROFIT_DTYPE)
+    result["item"] = np.arange(n)
+    result["purchase_price"] = purchase
+    result["selling_price"] = selling
+    result["shipping_cost"] = shipping
+    result["fee_rate"] = rates
+    result["platform_fees"] = platform_fees
+    result["net_revenue"] = net_revenue
+    result["profit"] = profit
+    result["margin"] = margin
+    result["tier"] = tier
+    result["valid"] = valid
+    return result
+
+
+def rank_by_profit(results: np.ndarray, valid_only: bool = True) -> np.ndarray:
+    """Return rows sorted by profit, highest first"""
+    if valid_only:
+        results = results[results["valid"]]
+    return results[np.argsort(-results["profit"], kind="stable")]
+
+
+def format_profit_table(results: np.ndarray, labels: Optional[List[str]] = None) -> str:
+    """Render ranked batch results as a compact markdown table"""
+    ranked = rank_by_profit(results)
+    invalid = int((~results["valid"]).sum())
+
+    lines = [
+        f"💰 **Batch Profit Analysis ({len(ranked)} of {len(results)} items ranked)**",
+        "",
+        "| # | Item | Buy | Sell | Fees | Profit | Margin | Tier |",
+        "|---|------|-----|------|------|--------|--------|------|"
+    ]
+    for rank, row in enumerate(ranked, start=1):
+        item = int(row["item"])
+        label = labels[item] if labels and item < len(labels) else f"Item {item + 1}"
+        lines.append(
+            f"| {rank} | {label} | £{row['purchase_price']:.2f} | £{row['selling_price']:.2f} "
+            f"| £{row['platform_fees']:.2f} | £{row['profit']:.2f} | {row['margin']:.1f}% "
+            f"| {TIER_NAMES[row['tier']]} |"
+        )
+
+    if invalid:
+        lines.append("")
+        lines.append(f"⚠️ {invalid} item(s) skipped: invalid prices or selling price not above purchase price.")
+
+    meets_target = int((ranked["margin"] >= 30).sum())
+    lines.append("")
+    lines.append(f"✅ {meets_target} item(s) meet our recommended 30%+ margin.")
+    return "\n".join(lines)
+
+
+@tool
+def calculate_batch_profit(
+    purchase_prices: List[float],
+    selling_prices: List[float],
+    platforms: Optional[List[str]] = None,
+    shipping_costs: Optional[List[float]] = None,
+    labels: Optional[List[str]] = None
+) -> str:
+    """
+    Calculate and rank profit for a list of items in one call. Use this instead of
+    calling calculate_profit repeatedly when the user gives several items.
+
+    Args:
+        purchase_prices: Prices paid on eBay UK in GBP, one per item
+        selling_prices: Expected selling prices in GBP, one per item
+        platforms: Resale platform per item ('grailed', 'ebay', 'vestiaire'), default grailed
+        shipping_costs: Shipping cost per item in GBP, default 8.0
+        labels: Optional short item names, one per item
+
+    Returns:
+        Ranked profit table with margin tiers
+    """
+
+    try:
+        if len(purchase_prices) > BATCH_PROFIT_MAX_ITEMS:
+            return f"❌ Error: Please send at most {BATCH_PROFIT_MAX_ITEMS} items per batch"
+
+        logger.info(f"Calculating batch profit for {len(purchase_prices)} items")
+
+        results = calculate_profit_batch(
+            purchase_prices,
+            selling_prices,
+            platforms if platforms else "grailed",
+            shipping_costs if shipping_costs else DEFAULT_SHIPPING_COST
+        )
+        return format_profit_table(results, labels)
+
+    except Exception as e:
+        logger.error(f"Error in batch profit calculation: {str(e)}")
+        return f"❌ Error calculating batch profit: {str(e)}"
@@ -1,24 +1,45 @@
 """
 Price range lookup tool
 """
+from typing import Optional
+
 from langchain.tools import tool
+from data.price_store import get_price_store
+from data.sales_store import SegmentStats, get_sales_store
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
-# Price database
-PRICE_DATA = {
-    "margiela": {
-        "sneakers": {"new": "£250-£400", "excellent": "£180-£350", "good": "£140-£280"},
-        "boots": {"new": "£450-£700", "excellent": "£300-£600", "good": "£220-£480"},
-        # ... rest of data
-    },
-    "rick owens": {
-        "sneakers": {"new": "£350-£550", "excellent": "£200-£450", "good": "£150-£350"},
-        # ... rest of data
-    },
-    # ... other brands
-}
+
+def _trend(change: Optional[float], days: int, sales: int) -> str:
+    if change is None:
+        return f"{days} days: {sales} sales, not enough history for a trend"
+    return f"{days} days: {change:+.1%} vs the previous {days} days ({sales} sales)"
+
+
+def _format_sales(brand: str, item_type: str, stats: SegmentStats) -> str:
+    condition = "All conditions" if stats.condition == "all" else stats.condition.title()
+    platforms = " and ".join(p.title() for p in stats.platforms) or "resale platforms"
+    return f"""
+📊 **{brand.title()} {item_type.title()} - Resale Price Data**
+
+**Condition: {condition}**
+💰 **Median Sold Price: £{stats.median:,.0f}** (middle half {stats.format_range()})
+
+📈 **Trend:**
+- {_trend(stats.trend_30, 30, stats.sales_30)}
+- {_trend(stats.trend_90, 90, stats.sales_90)}
+
+Based on {stats.sales:,} sales on {platforms}, most recent {stats.last_sold:%d %b %Y}.
+
+💡 **Factors Affecting Price:**
+- Specific model/collection
+- Colorway popularity
+- Seasonal timing
+- Original packaging included
+
+🔍 Check GrabyAI feed for exact historical data on specific items.
+"""
 
 @tool
 def get_price_range(brand: str, item_type: str, condition: str = "excellent") -> str:
@@ -37,26 +58,21 @@ def get_price_range(brand: str, item_type: str, condition: str = "excellent") ->
     try:
         logger.info(f"Price lookup: brand={brand}, type={item_type}, condition={condition}")
         
-        brand_lower = brand.lower()
-        item_lower = item_type.lower()
-        condition_lower = condition.lower()
+        stats = get_sales_store().segment(brand, item_type, condition)
+        if stats is not None:
+            return _format_sales(brand, item_type, stats)
+
+        # No recorded sales yet: the curated reference ranges
+        price = get_price_store().lookup(brand, item_type, condition)
         
-        # Search for matching brand and item
-        for brand_key in PRICE_DATA:
-            if brand_key in brand_lower or brand_lower in brand_key:
-                brand_data = PRICE_DATA[brand_key]
-                
-                for item_key, prices in brand_data.items():
-                    if item_key in item_lower or item_lower in item_key:
-                        price_range = prices.get(condition_lower, prices.get("excellent"))
-                        
-                        return f"""
+        if price is not None:
+            return f"""
 📊 **{brand.title()} {item_type.title()} - Resale Price Data**
 
-**Condition: {condition.title()}**
-💰 **Price Range: {price_range}**
+**Condition: {price.condition.title()}**
+💰 **Price Range: {price.format()}**
 
-Based on recent sales from Grailed and Vestiaire Collective.
+Reference range from the GrabyAI price guide (no recorded sales for this item yet).
 
 💡 **Factors Affecting Price:**
 - Specific model/collection
@@ -7,6 +7,31 @@ from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Platform fee structures
+PLATFORM_FEES = {
+    "grailed": 0.12,
+    "ebay": 0.15,
+    "vestiaire": 0.15
+}
+DEFAULT_PLATFORM_FEE = 0.12
+
+# Margin tiers (minimum margin %, recommendation), best first
+MARGIN_TIERS = [
+    (50, "🌟 Excellent margin! This is a strong opportunity."),
+    (30, "✅ Good margin. This meets our recommended minimum."),
+    (20, "⚠️ Acceptable margin but below our 30% recommendation."),
+    (float("-inf"), "❌ Low margin. Consider looking for better opportunities.")
+]
+TIER_NAMES = ["excellent", "good", "acceptable", "low"]
+
+
+def get_recommendation(profit_margin: float) -> str:
+    """Recommendation text for a profit margin in percent"""
+    for threshold, recommendation in MARGIN_TIERS:
+        if profit_margin >= threshold:
+            return recommendation
+    return MARGIN_TIERS[-1][1]
+
 @tool
 def calculate_profit(
     purchase_price: float, 
@@ -37,15 +62,8 @@ def calculate_profit(
         
         logger.info(f"Calculating profit: buy={purchase_price}, sell={selling_price}, platform={platform}")
         
-        # Platform fee structures
-        fees = {
-            "grailed": 0.12,
-            "ebay": 0.15,
-            "vestiaire": 0.15
-        }
-        
         platform_lower = platform.lower()
-        platform_fee = fees.get(platform_lower, 0.12)
+        platform_fee = PLATFORM_FEES.get(platform_lower, DEFAULT_PLATFORM_FEE)
         
         # Calculate breakdown
         platform_fees = selling_price * platform_fee
@@ -54,14 +72,7 @@ def calculate_profit(
         profit_margin = (profit / purchase_price) * 100 if purchase_price > 0 else 0
         
         # Generate recommendation
-        if profit_margin >= 50:
-            recommendation = "🌟 Excellent margin! This is a strong opportunity."
-        elif profit_margin >= 30:
-            recommendation = "✅ Good margin. This meets our recommended minimum."
-        elif profit_margin >= 20:
-            recommendation = "⚠️ Acceptable margin but below our 30% recommendation."
-        else:
-            recommendation = "❌ Low margin. Consider looking for better opportunities."
+        recommendation = get_recommendation(profit_margin)
         
         result = f"""
 💰 **Profit Analysis for {platform.upper()}**
@@ -2,6 +2,7 @@
 Platform tutorial tool
 """
 from langchain.tools import tool
+from data.guides import FALLBACK_TUTORIAL, get_guide_registry
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -17,22 +18,8 @@ def get_platform_tutorial(step: str = "overview") -> str:
     Returns:
         Tutorial content for requested section
     """
-    
-    tutorials = {
-        "overview": """
-📚 **GrabyAI Platform Tutorial - Overview**
-
-Quick Start Steps:
-1️⃣ Browse opportunities
-2️⃣ Evaluate profit & authenticity
-3️⃣ Purchase from eBay UK
-4️⃣ Verify on arrival
-5️⃣ List for resale
-6️⃣ Ship & profit!
-
-Ask about specific steps for detailed guidance!
-""",
-        # Add other tutorial sections...
-    }
-    
-    return tutorials.get(step.lower(), tutorials["overview"])
\ No newline at end of file
+    try:
+        return get_guide_registry().tutorial(step)
+    except Exception as e:
+        logger.error(f"Error loading tutorial: {str(e)}")
+        return FALLBACK_TUTORIAL
@@ -0,0 +1,321 @@
+"""
+Shared HTTP clients for the OpenAI chat and embeddings clients
+
+One pooled ``httpx.Client`` per process (and one ``httpx.AsyncClient`` per
+event loop, since async connections can't move between loops) is injected
+into every ChatOpenAI and OpenAIEmbeddings instance. Connections are kept
+alive and reused across sessions and API keys, so only the first request
+pays for the TCP/TLS handshake. HTTP/2 is used when the ``h2`` package is
+installed.
+
+The transports count requests in flight and how often a request found
+every pooled connection busy; ``pool_stats()`` reports them together with
+the open and idle connections of each pool.
+
+The OpenAI SDK stops reading a streamed completion at ``data: [DONE]`` and
+closes the response before the final HTTP chunk is read, which makes httpcore
+drop the connection. Response bodies here finish reading that terminator on
+close once ``[DONE]`` was seen, so streamed calls keep their connection.
+"""
+import asyncio
+import importlib.util
+import threading
+import weakref
+from typing import Dict, Optional
+
+import httpx
+
+from config.settings import (
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_HTTP2,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_READ_TIMEOUT,
+    HTTP_WRITE_TIMEOUT,
+    HTTP_POOL_TIMEOUT
+)
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def http2_available() -> bool:
+    """HTTP/2 is enabled in settings and the h2 package is installed"""
+    return HTTP_HTTP2 and importlib.util.find_spec("h2") is not None
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+    )
+
+
+def http_timeout() -> httpx.Timeout:
+    """
+    The configured connect/read/write/pool timeouts.
+
+    Also pass this to OpenAI SDK clients: LangChain gives them an explicit
+    timeout (None by default), which overrides the pooled client's.
+    """
+    return httpx.Timeout(
+        connect=HTTP_CONNECT_TIMEOUT,
+        read=HTTP_READ_TIMEOUT,
+        write=HTTP_WRITE_TIMEOUT,
+        pool=HTTP_POOL_TIMEOUT
+    )
+
+
+class _PoolCounters:
+    """Requests in flight and pool-exhaustion waits of one transport"""
+
+    def __init__(self, max_connections: int):
+        self.max_connections = max_connections
+        self.active = 0
+        self.requests = 0
+        self.waits = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self.active >= self.max_connections:
+                self.waits += 1
+            self.active += 1
+            self.requests += 1
+
+    def release(self) -> None:
+        with self._lock:
+            self.active -= 1
+
+
+_SSE_DONE = b"data: [DONE]"
+# Bytes read on close after [DONE]; only the chunked-encoding terminator is expected
+_DRAIN_LIMIT = 1024
+
+
+class _TrackedStream(httpx.SyncByteStream):
+    """Response body that releases its pool slot once closed"""
+
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+        self._iterator = None
+        self._tail = b""
+
+    def __iter__(self):
+        self._iterator = iter(self._stream)
+        for chunk in self._iterator:
+            self._tail = (self._tail + chunk)[-32:]
+            yield chunk
+        self._iterator = None
+
+    def close(self) -> None:
+        try:
+            if self._iterator is not None and _SSE_DONE in self._tail:
+                drained = 0
+                for chunk in self._iterator:
+                    drained += len(chunk)
+                    if drained > _DRAIN_LIMIT:
+                        break
+            self._stream.close()
+        finally:
+            if self._release is not None:
+                self._release()
+                self._release = None
+
+
+class _AsyncTrackedStream(httpx.AsyncByteStream):
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+        self._iterator = None
+        self._tail = b""
+
+    async def __aiter__(self):
+        self._iterator = self._stream.__aiter__()
+        async for chunk in self._iterator:
+            self._tail = (self._tail + chunk)[-32:]
+            yield chunk
+        self._iterator = None
+
+    async def aclose(self) -> None:
+        try:
+            if self._iterator is not None and _SSE_DONE in self._tail:
+                drained = 0
+                async for chunk in self._iterator:
+                    drained += len(chunk)
+                    if drained > _DRAIN_LIMIT:
+                        break
+            await self._stream.aclose()
+        finally:
+            if self._release is not None:
+                self._release()
+                self._release = None
+
+
+class PooledTransport(httpx.HTTPTransport):
+    """HTTPTransport that records pool usage; a request is active until its body is closed"""
+
+    def __init__(self, **kwargs):
+        limits = kwargs.setdefault("limits", _limits())
+        super().__init__(**kwargs)
+        self.counters = _PoolCounters(limits.max_connections)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self.counters.acquire()
+        try:
+            response = super().handle_request(request)
+        except BaseException:
+            self.counters.release()
+            raise
+        response.stream = _TrackedStream(response.stream, self.counters.release)
+        return response
+
+    def connections(self) -> Dict[str, int]:
+        conns = list(self._pool.connections)
+        return {"open": len(conns), "idle": sum(1 for c in conns if c.is_idle())}
+
+
+class AsyncPooledTransport(httpx.AsyncHTTPTransport):
+    """Async counterpart of ``PooledTransport``"""
+
+    def __init__(self, **kwargs):
+        limits = kwargs.setdefault("limits", _limits())
+        super().__init__(**kwargs)
+        self.counters = _PoolCounters(limits.max_connections)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.counters.acquire()
+        try:
+            response = await super().handle_async_request(request)
+        except BaseException:
+            self.counters.release()
+            raise
+        response.stream = _AsyncTrackedStream(response.stream, self.counters.release)
+        return response
+
+    def connections(self) -> Dict[str, int]:
+        conns = list(self._pool.connections)
+        return {"open": len(conns), "idle": sum(1 for c in conns if c.is_idle())}
+
+
+def create_http_client() -> httpx.Client:
+    """New pooled sync client with the configured limits and timeouts"""
+    return httpx.Client(
+        transport=PooledTransport(http2=http2_available()),
+        timeout=http_timeout(),
+        follow_redirects=True
+    )
+
+
+def create_async_http_client() -> httpx.AsyncClient:
+    """New pooled async client (use it from a single event loop)"""
+    return httpx.AsyncClient(
+        transport=AsyncPooledTransport(http2=http2_available()),
+        timeout=http_timeout(),
+        follow_redirects=True
+    )
+
+
+_client: Optional[httpx.Client] = None
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> httpx.Client:
+    """Return the process-wide sync client, creating it on first use"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = create_http_client()
+                logger.info(
+                    f"Shared HTTP client: {HTTP_MAX_CONNECTIONS} connections, "
+                    f"{HTTP_MAX_KEEPALIVE} keep-alive, http2={http2_available()}"
+                )
+    return _client
+
+
+class _LoopBoundAsyncClient(httpx.AsyncClient):
+    """
+    AsyncClient facade that forwards to the pooled client of the running loop.
+
+    The OpenAI SDK keeps the async client it was given for its lifetime,
+    but the same model object may be awaited from different event loops
+    (the agent loop, a web server's loop); each gets its own pool.
+    """
+
+    def __init__(self):
+        super().__init__(timeout=http_timeout())
+
+    async def send(self, request: httpx.Request, **kwargs) -> httpx.Response:
+        return await get_async_http_client().send(request, **kwargs)
+
+
+def get_async_http_client(loop: Optional[asyncio.AbstractEventLoop] = None) -> httpx.AsyncClient:
+    """
+    Return the pooled async client of ``loop`` (default: the running loop).
+
+    Args:
+        loop: Event loop the client will be used from
+
+    Returns:
+        httpx.AsyncClient shared by everything running on that loop
+    """
+    if loop is None:
+        loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        with _client_lock:
+            client = _async_clients.get(loop)
+            if client is None:
+                client = create_async_http_client()
+                _async_clients[loop] = client
+    return client
+
+
+_loop_bound_client: Optional[_LoopBoundAsyncClient] = None
+
+
+def get_shared_async_client() -> httpx.AsyncClient:
+    """Async client to inject into SDK clients; dispatches to the current loop's pool"""
+    global _loop_bound_client
+    if _loop_bound_client is None:
+        with _client_lock:
+            if _loop_bound_client is None:
+                _loop_bound_client = _LoopBoundAsyncClient()
+    return _loop_bound_client
+
+
+def pool_stats() -> Dict[str, int]:
+    """
+    Connection pool usage summed over the shared clients.
+
+    Returns:
+        Dict with active (requests in flight), open and idle connections,
+        requests sent, waits (requests that found every connection busy)
+        and max_connections per pool
+    """
+    transports = []
+    if _client is not None:
+        transports.append(_client._transport)
+    with _client_lock:
+        transports.extend(c._transport for c in list(_async_clients.values()))
+
+    stats = {"active": 0, "open": 0, "idle": 0, "requests": 0, "waits": 0, "pools": 0}
+    for transport in transports:
+        counters = getattr(transport, "counters", None)
+        if counters is None:
+            continue
+        stats["pools"] += 1
+        stats["active"] += counters.active
+        stats["requests"] += counters.requests
+        stats["waits"] += counters.waits
+        for name, value in transport.connections().items():
+            stats[name] += value
+    stats["max_connections"] = HTTP_MAX_CONNECTIONS
+    return stats
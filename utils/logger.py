@@ -1,27 +1,208 @@
 """
 Logging configuration
+
+In the default 'queue' mode, module loggers only put records on an
+in-memory queue; a single background listener thread formats them and does
+the file/console I/O, so a slow disk never blocks a chat turn. File records
+are JSON lines carrying the request ID of the chat turn that produced them,
+and the file is rotated by size or time. INFO/DEBUG records can be sampled
+per module to keep chatty hot paths cheap. Output handlers live on the
+root logger only; module loggers propagate to it.
 """
+import atexit
+import contextvars
+import copy
+import json
 import logging
-from config.settings import LOG_FILE, LOG_FORMAT
+import logging.handlers
+import queue
+import random
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Optional
+
+from config.settings import (
+    LOG_FILE,
+    LOG_FORMAT,
+    LOG_MODE,
+    LOG_JSON,
+    LOG_ROTATION,
+    LOG_MAX_BYTES,
+    LOG_BACKUP_COUNT,
+    LOG_ROTATE_WHEN,
+    LOG_SAMPLE_RATES
+)
+
+_request_id: contextvars.ContextVar = contextvars.ContextVar("request_id", default=None)
+
+
+def get_request_id() -> Optional[str]:
+    """Request ID of the current chat turn, if any"""
+    return _request_id.get()
+
+
+def set_request_id(request_id: Optional[str] = None) -> str:
+    """Start a new request context and return its ID"""
+    request_id = request_id or uuid.uuid4().hex[:12]
+    _request_id.set(request_id)
+    return request_id
+
+
+@contextmanager
+def request_context(request_id: Optional[str] = None):
+    """Tag every record logged inside the block with one request ID"""
+    token = _request_id.set(request_id or uuid.uuid4().hex[:12])
+    try:
+        yield _request_id.get()
+    finally:
+        _request_id.reset(token)
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp records with the request ID on the calling thread"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            record.request_id = _request_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of records below WARNING; warnings and errors always pass"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "thread": record.threadName
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that keeps the message and traceback as separate fields"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _file_handler() -> logging.Handler:
+    if LOG_ROTATION == "time":
+        handler = logging.handlers.TimedRotatingFileHandler(
+            LOG_FILE, when=LOG_ROTATE_WHEN, backupCount=LOG_BACKUP_COUNT, encoding="utf-8"
+        )
+    elif LOG_ROTATION == "size":
+        handler = logging.handlers.RotatingFileHandler(
+            LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8"
+        )
+    else:
+        handler = logging.FileHandler(LOG_FILE, encoding="utf-8")
+    handler.setFormatter(JsonFormatter() if LOG_JSON else logging.Formatter(LOG_FORMAT))
+    return handler
+
+
+def _console_handler() -> logging.Handler:
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    return handler
+
+
+_queue: Optional[queue.Queue] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+_sync_handlers: Optional[list] = None
+_root_handlers: Optional[list] = None
+_init_lock = threading.Lock()
+
+
+def _output_handlers() -> list:
+    """Start the shared listener (queue mode) or build shared handlers (sync mode) once"""
+    global _queue, _listener, _sync_handlers
+
+    with _init_lock:
+        if LOG_MODE == "queue":
+            if _listener is None:
+                if _queue is None:
+                    _queue = queue.Queue(-1)
+                _listener = logging.handlers.QueueListener(
+                    _queue, _file_handler(), _console_handler(), respect_handler_level=True
+                )
+                _listener.start()
+                atexit.register(shutdown_logging)
+            return [_QueueHandler(_queue)]
+
+        if _sync_handlers is None:
+            _sync_handlers = [_file_handler(), _console_handler()]
+        return list(_sync_handlers)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    with _init_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def _attach_root_handlers() -> None:
+    """Give the root logger the shared output handlers, once"""
+    global _root_handlers
+    if _root_handlers is not None:
+        return
+    handlers = _output_handlers()
+    with _init_lock:
+        if _root_handlers is None:
+            root = logging.getLogger()
+            for handler in handlers:
+                root.addHandler(handler)
+            _root_handlers = handlers
+
 
 def setup_logger(name: str = __name__) -> logging.Logger:
-    """Configure and return logger instance"""
+    """
+    Configure and return logger instance.
+
+    Module loggers only carry filters and propagate their records to the
+    root logger, which owns the single set of output handlers. Handlers
+    added elsewhere (pytest's caplog, an embedding application) still see
+    every record, and nothing is written twice.
+    """
     logger = logging.getLogger(name)
     logger.setLevel(logging.INFO)
-    
-    # Avoid duplicate handlers
-    if not logger.handlers:
-        # File handler
-        file_handler = logging.FileHandler(LOG_FILE)
-        file_handler.setLevel(logging.INFO)
-        file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
-        
-        # Console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-        console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
-        
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
-    
-    return logger
\ No newline at end of file
+    _attach_root_handlers()
+
+    # Avoid duplicate filters
+    if not any(isinstance(f, RequestIdFilter) for f in logger.filters):
+        # Logger filters run on the calling thread, before a record is queued
+        logger.addFilter(RequestIdFilter())
+        sample_rate = LOG_SAMPLE_RATES.get(name, 1.0)
+        if sample_rate < 1.0:
+            logger.addFilter(SamplingFilter(sample_rate))
+
+    return logger
@@ -1,38 +1,243 @@
 """
 Rate limiting functionality
+
+Limits use a sliding-window counter: each key keeps the request count of the
+current and the previous fixed window, and the previous count is weighted by
+how much of it still overlaps the sliding window. Checks are O(1) in time and
+memory regardless of the limit.
+
+Two interchangeable backends are provided:
+    MemoryBackend - per process, guarded by a lock
+    RedisBackend  - shared by all sessions and worker processes, with the
+                    check-and-increment done atomically in a Lua script;
+                    while Redis is unreachable it falls back to per-process
+                    counters instead of failing requests
 """
+import math
+import threading
 import time
-from typing import List
-from config.settings import RATE_LIMIT_REQUESTS, RATE_LIMIT_WINDOW
+from typing import Dict, Optional, Tuple
+
+from config.settings import (
+    RATE_LIMIT_REQUESTS,
+    RATE_LIMIT_WINDOW,
+    RATE_LIMIT_BACKEND,
+    RATE_LIMIT_REDIS_URL,
+    RATE_LIMIT_KEY_PREFIX
+)
+from utils.logger import setup_logger
+from utils.validation import api_key_fingerprint
+
+logger = setup_logger(__name__)
+
+try:
+    from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+
+    _REDIS_ERRORS: tuple = (RedisConnectionError, RedisTimeoutError)
+except ImportError:  # pragma: no cover - redis is optional
+    _REDIS_ERRORS = ()
+
+
+class MemoryBackend:
+    """
+    In-process sliding-window counters.
+
+    Window counters of keys idle for two windows no longer affect any limit
+    and are dropped the next time a new window starts; lifetime totals are
+    kept separately (one int per key).
+    """
 
-class RateLimiter:
-    """Simple rate limiter for user requests"""
-    
     def __init__(self):
-        self.request_times: List[float] = []
-        self.total_requests: int = 0
-    
+        self._lock = threading.Lock()
+        # key -> [window index, current count, previous count]
+        self._counters: Dict[str, list] = {}
+        self._totals: Dict[str, int] = {}
+        self._pruned_window: Optional[int] = None
+
+    def _prune(self, window_index: int) -> None:
+        # At most one sweep per window; the caller holds the lock
+        if self._pruned_window == window_index:
+            return
+        self._pruned_window = window_index
+        expired = [key for key, state in self._counters.items() if state[0] < window_index - 1]
+        for key in expired:
+            del self._counters[key]
+
+    def _roll(self, key: str, window_index: int) -> list:
+        state = self._counters.get(key)
+        if state is None:
+            state = self._counters[key] = [window_index, 0, 0]
+        elif state[0] != window_index:
+            state[2] = state[1] if state[0] == window_index - 1 else 0
+            state[1] = 0
+            state[0] = window_index
+        return state
+
+    def hit(self, key: str, limit: int, window: float, now: float, consume: bool = True) -> Tuple[bool, int]:
+        """
+        Check (and optionally count) one request.
+
+        Returns:
+            Tuple of (allowed, remaining requests in the window)
+        """
+        window_index = int(now // window)
+        weight = 1.0 - (now % window) / window
+
+        with self._lock:
+            self._prune(window_index)
+            state = self._roll(key, window_index)
+            estimated = state[2] * weight + state[1]
+
+            if consume:
+                if estimated >= limit:
+                    return False, 0
+                state[1] += 1
+                self._totals[key] = self._totals.get(key, 0) + 1
+                estimated += 1
+
+            return True, max(0, math.floor(limit - estimated))
+
+    def total(self, key: str) -> int:
+        with self._lock:
+            return self._totals.get(key, 0)
+
+
+_REDIS_HIT_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local limit = tonumber(ARGV[1])
+local weight = tonumber(ARGV[2])
+local estimated = previous * weight + current
+
+if ARGV[4] == '1' then
+    if estimated >= limit then
+        return {0, 0}
+    end
+    redis.call('INCR', KEYS[1])
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+    redis.call('INCR', KEYS[3])
+    estimated = estimated + 1
+end
+
+local remaining = math.floor(limit - estimated)
+if remaining < 0 then
+    remaining = 0
+end
+return {1, remaining}
+"""
+
+
+class RedisBackend:
+    """Sliding-window counters in a Redis-compatible store, shared across processes"""
+
+    def __init__(self, client=None, url: str = RATE_LIMIT_REDIS_URL, prefix: str = RATE_LIMIT_KEY_PREFIX):
+        """
+        Args:
+            client: Existing redis.Redis-compatible client (e.g. fakeredis)
+            url: Connection URL used when no client is given
+            prefix: Namespace for all limiter keys
+        """
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(_REDIS_HIT_SCRIPT)
+        self._fallback = MemoryBackend()
+        self._unavailable = False
+
+    def _redis_down(self, error: Exception) -> None:
+        if not self._unavailable:
+            self._unavailable = True
+            logger.error(f"Rate limit store unreachable, using per-process limits: {str(error)}")
+
+    def _redis_up(self) -> None:
+        if self._unavailable:
+            self._unavailable = False
+            logger.info("Rate limit store reachable again")
+
+    def _keys(self, key: str, window_index: int):
+        base = f"{self.prefix}:{key}"
+        return [f"{base}:{window_index}", f"{base}:{window_index - 1}", f"{base}:total"]
+
+    def hit(self, key: str, limit: int, window: float, now: float, consume: bool = True) -> Tuple[bool, int]:
+        window_index = int(now // window)
+        weight = 1.0 - (now % window) / window
+        # Keep each window counter long enough to serve as "previous" next window
+        ttl = int(math.ceil(window * 2))
+
+        try:
+            allowed, remaining = self._script(
+                keys=self._keys(key, window_index),
+                args=[limit, repr(weight), ttl, "1" if consume else "0"]
+            )
+        except _REDIS_ERRORS as e:
+            self._redis_down(e)
+            return self._fallback.hit(key, limit, window, now, consume)
+        self._redis_up()
+        return bool(allowed), int(remaining)
+
+    def total(self, key: str) -> int:
+        try:
+            value = self.client.get(f"{self.prefix}:{key}:total")
+        except _REDIS_ERRORS as e:
+            self._redis_down(e)
+            return self._fallback.total(key)
+        return int(value) if value else 0
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Return the process-wide backend selected by RATE_LIMIT_BACKEND"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if RATE_LIMIT_BACKEND == "redis":
+                    _backend = RedisBackend()
+                elif RATE_LIMIT_BACKEND == "memory":
+                    _backend = MemoryBackend()
+                else:
+                    raise ValueError(f"Unknown rate limit backend: {RATE_LIMIT_BACKEND}")
+    return _backend
+
+
+class RateLimiter:
+    """Rate limiter for one user (API key or session)"""
+
+    def __init__(
+        self,
+        key: str = "default",
+        backend=None,
+        limit: int = RATE_LIMIT_REQUESTS,
+        window: float = RATE_LIMIT_WINDOW
+    ):
+        self.key = key
+        self.backend = backend if backend is not None else get_backend()
+        self.limit = limit
+        self.window = window
+
     def check_limit(self) -> bool:
-        """Check if user has exceeded rate limit"""
-        current_time = time.time()
-        
-        # Remove old requests outside the time window
-        self.request_times = [
-            t for t in self.request_times 
-            if current_time - t < RATE_LIMIT_WINDOW
-        ]
-        
-        if len(self.request_times) >= RATE_LIMIT_REQUESTS:
-            return False
-        
-        self.request_times.append(current_time)
-        self.total_requests += 1
-        return True
-    
+        """Check if user has exceeded rate limit, counting the request if not"""
+        allowed, _ = self.backend.hit(self.key, self.limit, self.window, time.time())
+        return allowed
+
     def get_remaining(self) -> int:
         """Get remaining requests in current window"""
-        return max(0, RATE_LIMIT_REQUESTS - len(self.request_times))
-    
+        _, remaining = self.backend.hit(self.key, self.limit, self.window, time.time(), consume=False)
+        return remaining
+
     def get_total(self) -> int:
         """Get total requests made"""
-        return self.total_requests
\ No newline at end of file
+        return self.backend.total(self.key)
+
+
+def limiter_key(api_key: Optional[str], session_id: str) -> str:
+    """Rate limit per API key when one is set, otherwise per browser session"""
+    if api_key:
+        return f"key:{api_key_fingerprint(api_key)}"
+    return f"session:{session_id}"
@@ -0,0 +1,239 @@
+"""
+Single-flight coalescing of identical in-flight calls
+
+When several sessions ask for the same thing at the same moment (the same
+query embedding, the same context-free chat turn), only the first caller -
+the leader - calls upstream. Callers arriving while that call is in flight
+join it and receive its result, or its exception. Nothing is kept once the
+call finishes; caching finished results is the caches' job.
+
+Flights are shared between threads and event loops: the result lives in a
+``concurrent.futures.Future``, which sync callers block on and async callers
+await through ``asyncio.wrap_future``. If the leader is cancelled or
+abandons its flight, waiters raise ``FlightAborted`` and ``do``/``ado``
+retry with a new leader. Followers wait at most the group's
+``wait_timeout``; after that ``wait`` raises ``TimeoutError`` and
+``do``/``ado`` make the call themselves instead of waiting on a stuck leader.
+
+Every group counts calls, upstream calls and saved calls; ``stats()``
+reports them and the saved count is also exported as the
+``single_flight_saved`` counter in /metrics.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+from config.settings import SINGLE_FLIGHT_ENABLED, SINGLE_FLIGHT_WAIT_TIMEOUT
+from utils.logger import setup_logger
+from utils.tracing import get_metrics
+
+logger = setup_logger(__name__)
+
+T = TypeVar("T")
+
+
+class FlightAborted(Exception):
+    """The leader gave up before producing a result; the caller should retry"""
+
+
+class Flight:
+    """
+    One caller's view of an in-flight call.
+
+    The leader must end the flight with ``resolve`` or ``reject`` (``close``
+    marks it abandoned otherwise); followers ``wait`` or ``wait_async``.
+    """
+
+    def __init__(self, group: "SingleFlight", key: Hashable, future: Future, leader: bool):
+        self.group = group
+        self.key = key
+        self.leader = leader
+        self._future = future
+
+    def resolve(self, value) -> None:
+        self._finish(value=value)
+
+    def reject(self, error: BaseException) -> None:
+        self._finish(error=error)
+
+    def close(self) -> None:
+        """End the flight if the leader didn't (waiters get FlightAborted)"""
+        if self.leader and not self._future.done():
+            self._finish(error=FlightAborted(f"{self.group.name} leader aborted"))
+
+    def wait(self, timeout: Optional[float] = None):
+        """
+        The leader's result.
+
+        Args:
+            timeout: Seconds to wait (defaults to the group's ``wait_timeout``)
+
+        Raises:
+            FlightAborted: The leader gave up; join again
+            TimeoutError: The leader took longer than ``timeout``
+        """
+        try:
+            return self._future.result(timeout=self._timeout(timeout))
+        except (FlightAborted, TimeoutError):
+            self.group._unsave()
+            raise
+
+    async def wait_async(self, timeout: Optional[float] = None):
+        """Async counterpart of ``wait``"""
+        # Shielded: cancelling this follower (a disconnected client) must not
+        # cancel the shared future the leader and other followers wait on
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(self._future)),
+                timeout=self._timeout(timeout)
+            )
+        except (FlightAborted, TimeoutError):
+            self.group._unsave()
+            raise
+
+    def _timeout(self, timeout: Optional[float]) -> Optional[float]:
+        return self.group.wait_timeout if timeout is None else timeout
+
+    def _finish(self, value=None, error: BaseException = None) -> None:
+        if not self.leader or self._future.done():
+            return
+        # Later callers start a new flight; current waiters still get this result
+        self.group._release(self.key, self._future)
+        if error is not None:
+            self._future.set_exception(error)
+        else:
+            self._future.set_result(value)
+
+    def __enter__(self) -> "Flight":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc is not None and isinstance(exc, Exception):
+            self.reject(exc)
+        self.close()
+        return False
+
+
+class SingleFlight:
+    """A named group of coalesced calls"""
+
+    def __init__(
+        self,
+        name: str,
+        enabled: bool = SINGLE_FLIGHT_ENABLED,
+        wait_timeout: float = SINGLE_FLIGHT_WAIT_TIMEOUT
+    ):
+        """
+        Args:
+            name: Group name used in stats and metrics labels
+            enabled: When False every caller leads its own call
+            wait_timeout: Seconds a follower waits for the leader
+        """
+        self.name = name
+        self.enabled = enabled
+        self.wait_timeout = wait_timeout
+        self.calls = 0
+        self.upstream = 0
+        self.saved = 0
+        self._flights: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        _groups[name] = self
+
+    def join(self, key: Hashable) -> Flight:
+        """
+        Lead a new flight for ``key``, or follow the one in progress.
+
+        Args:
+            key: Hashable identity of the call (normalized input + model parameters)
+
+        Returns:
+            Flight whose ``leader`` attribute says which role the caller got
+        """
+        with self._lock:
+            self.calls += 1
+            future = self._flights.get(key) if self.enabled else None
+            if future is None:
+                future = Future()
+                if self.enabled:
+                    self._flights[key] = future
+                self.upstream += 1
+                return Flight(self, key, future, leader=True)
+            self.saved += 1
+        get_metrics().increment("single_flight_saved", group=self.name)
+        return Flight(self, key, future, leader=False)
+
+    def do(self, key: Hashable, fn: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Call ``fn(*args, **kwargs)`` unless an identical call is in flight.
+
+        Args:
+            key: Identity of the call
+            fn: Upstream call, run by the leader only
+
+        Returns:
+            The leader's result (its exception is raised in every caller)
+        """
+        while True:
+            with self.join(key) as flight:
+                if flight.leader:
+                    result = fn(*args, **kwargs)
+                    flight.resolve(result)
+                    return result
+                try:
+                    return flight.wait()
+                except FlightAborted:
+                    continue
+                except TimeoutError:
+                    self._timed_out()
+            return fn(*args, **kwargs)
+
+    async def ado(self, key: Hashable, fn: Callable[..., Awaitable[T]], *args, **kwargs) -> T:
+        """Async counterpart of ``do``; ``fn`` returns an awaitable"""
+        while True:
+            with self.join(key) as flight:
+                if flight.leader:
+                    result = await fn(*args, **kwargs)
+                    flight.resolve(result)
+                    return result
+                try:
+                    return await flight.wait_async()
+                except FlightAborted:
+                    continue
+                except TimeoutError:
+                    self._timed_out()
+            return await fn(*args, **kwargs)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "upstream": self.upstream,
+                "saved": self.saved,
+                "in_flight": len(self._flights)
+            }
+
+    def _timed_out(self) -> None:
+        """A follower gave up on the leader and calls upstream itself"""
+        with self._lock:
+            self.upstream += 1
+        logger.warning(f"{self.name}: leader still running after {self.wait_timeout:.0f}s, calling upstream directly")
+
+    def _unsave(self) -> None:
+        # The follower retries, so joining the aborted flight saved nothing
+        with self._lock:
+            self.saved -= 1
+        get_metrics().increment("single_flight_saved", -1, group=self.name)
+
+    def _release(self, key: Hashable, future: Future) -> None:
+        with self._lock:
+            if self._flights.get(key) is future:
+                del self._flights[key]
+
+
+_groups: Dict[str, SingleFlight] = {}
+
+
+def single_flight_stats() -> Dict[str, Dict[str, int]]:
+    """Counters of every coalescing group, by group name"""
+    return {name: group.stats() for name, group in list(_groups.items())}
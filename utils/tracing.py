@@ -0,0 +1,347 @@
+"""
+Lightweight request tracing
+
+Code paths are wrapped in named spans. Spans nest through a context
+variable, so a chat turn's span tree covers the router, retrieval, every LLM
+call and every tool call, including those running on the agent loop or in
+tool threads. Each finished span feeds a per-name latency histogram that the
+sidebar reads as p50/p95/p99 and that can be exported in Prometheus text
+format.
+
+With tracing disabled, ``span`` returns a shared no-op context manager and
+``traced`` functions call straight through after one flag check.
+"""
+import asyncio
+import contextvars
+import functools
+import math
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from config.settings import (
+    TRACING_ENABLED,
+    TRACE_BUCKETS,
+    TRACE_WINDOW,
+    TRACE_SLOW_TURN
+)
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+_enabled = TRACING_ENABLED
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """One timed operation; use via ``span()``"""
+
+    __slots__ = ("name", "attributes", "parent", "children", "start", "duration", "_token")
+
+    def __init__(self, name: str, attributes: dict):
+        self.name = name
+        self.attributes = attributes
+        self.parent: Optional["Span"] = None
+        self.children: List["Span"] = []
+        self.start = 0.0
+        self.duration: Optional[float] = None
+        self._token = None
+
+    def set(self, **attributes) -> None:
+        """Attach attributes (e.g. token counts) to the span"""
+        self.attributes.update(attributes)
+
+    def __enter__(self) -> "Span":
+        self.parent = _current_span.get()
+        if self.parent is not None:
+            self.parent.children.append(self)
+        self._token = _current_span.set(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.duration = time.perf_counter() - self.start
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        get_metrics().observe(self.name, self.duration)
+        if self.parent is None and self.duration >= TRACE_SLOW_TURN:
+            logger.info(f"Slow trace: {format_trace(self)}")
+        return False
+
+
+class _NoopSpan:
+    """Stand-in returned by ``span()`` when tracing is disabled"""
+
+    __slots__ = ()
+
+    def set(self, **attributes) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name: str, **attributes):
+    """
+    Time a block of code as a named span.
+
+    Args:
+        name: Metric name, e.g. 'retrieval.search' or 'tool.calculate_profit'
+        **attributes: Extra fields kept on the span (shown in slow-trace logs)
+
+    Returns:
+        Context manager yielding the span
+    """
+    if not _enabled:
+        return _NOOP_SPAN
+    return Span(name, attributes)
+
+
+def current_span():
+    """Innermost open span of the current context (a no-op span if none)"""
+    return _current_span.get() or _NOOP_SPAN
+
+
+def traced(name: str):
+    """Decorator that wraps every call of a sync or async function in a span"""
+
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not _enabled:
+                    return await func(*args, **kwargs)
+                with Span(name, {}):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with Span(name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def set_tracing_enabled(enabled: bool) -> None:
+    """Switch tracing on or off at runtime"""
+    global _enabled
+    _enabled = enabled
+
+
+def tracing_enabled() -> bool:
+    return _enabled
+
+
+def format_trace(root: Span, indent: int = 0) -> str:
+    """Render a span tree as 'name 1.234s [attrs] > child ...' on one line"""
+    attrs = " ".join(f"{k}={v}" for k, v in root.attributes.items())
+    text = f"{root.name} {root.duration or 0:.3f}s" + (f" [{attrs}]" if attrs else "")
+    if root.children:
+        text += " > (" + ", ".join(format_trace(child) for child in root.children) + ")"
+    return text
+
+
+class FirstTokenTimer:
+    """Measures time from request start to the first rendered output"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.first_token: Optional[float] = None
+
+    def mark(self) -> None:
+        if self.first_token is None:
+            self.first_token = time.perf_counter() - self.start
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+
+class _Histogram:
+    __slots__ = ("bucket_counts", "count", "total", "recent")
+
+    def __init__(self, buckets: int, window: int):
+        self.bucket_counts = [0] * (buckets + 1)  # last slot is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=window)
+
+
+class MetricsRegistry:
+    """
+    Per-span-name latency histograms and counters.
+
+    Percentiles are computed exactly over the most recent ``window`` samples;
+    the cumulative bucket counts back the Prometheus export.
+    """
+
+    def __init__(self, buckets=TRACE_BUCKETS, window: int = TRACE_WINDOW):
+        self.buckets = sorted(buckets)
+        self.window = window
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, _Histogram] = {}
+        self._counters: Dict[tuple, float] = {}
+
+    def observe(self, name: str, seconds: float) -> None:
+        index = _bucket_index(self.buckets, seconds)
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = _Histogram(len(self.buckets), self.window)
+            histogram.bucket_counts[index] += 1
+            histogram.count += 1
+            histogram.total += seconds
+            histogram.recent.append(seconds)
+
+    def increment(self, name: str, amount: float = 1, **labels) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def percentiles(self, quantiles=(0.5, 0.95, 0.99)) -> List[dict]:
+        """
+        Latency summary per span name.
+
+        Returns:
+            List of dicts with span, count, mean and one key per quantile
+            (e.g. 'p95'), all times in milliseconds, sorted by span name
+        """
+        with self._lock:
+            snapshot = {name: (h.count, h.total, sorted(h.recent)) for name, h in self._histograms.items()}
+
+        rows = []
+        for name in sorted(snapshot):
+            count, total, recent = snapshot[name]
+            row = {"span": name, "count": count, "mean_ms": total / count * 1000}
+            for q in quantiles:
+                row[f"p{q * 100:g}_ms"] = _quantile(recent, q) * 1000
+            rows.append(row)
+        return rows
+
+    def counters(self) -> Dict[tuple, float]:
+        with self._lock:
+            return dict(self._counters)
+
+    def to_prometheus(self, prefix: str = "grabyai") -> str:
+        """Export histograms and counters in the Prometheus text exposition format"""
+        with self._lock:
+            histograms = {
+                name: (list(h.bucket_counts), h.count, h.total)
+                for name, h in self._histograms.items()
+            }
+            counters = dict(self._counters)
+
+        metric = f"{prefix}_span_duration_seconds"
+        lines = [
+            f"# HELP {metric} Duration of traced operations",
+            f"# TYPE {metric} histogram"
+        ]
+        for name in sorted(histograms):
+            bucket_counts, count, total = histograms[name]
+            cumulative = 0
+            for bound, n in zip(self.buckets + [math.inf], bucket_counts):
+                cumulative += n
+                le = "+Inf" if bound == math.inf else f"{bound:g}"
+                lines.append(f'{metric}_bucket{{span="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'{metric}_sum{{span="{name}"}} {total:.6f}')
+            lines.append(f'{metric}_count{{span="{name}"}} {count}')
+
+        for counter in sorted({name for name, _ in counters}):
+            full_name = f"{prefix}_{counter}_total"
+            lines.append(f"# TYPE {full_name} counter")
+            for (name, labels), value in sorted(counters.items()):
+                if name != counter:
+                    continue
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+                lines.append(f"{full_name}{{{label_text}}} {value:g}" if label_text else f"{full_name} {value:g}")
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+def _bucket_index(buckets: list, value: float) -> int:
+    for i, bound in enumerate(buckets):
+        if value <= bound:
+            return i
+    return len(buckets)
+
+
+def _quantile(ordered: list, q: float) -> float:
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * q
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+_metrics = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Return the process-wide metrics registry"""
+    return _metrics
+
+
+_metrics_server: Optional[ThreadingHTTPServer] = None
+_metrics_server_lock = threading.Lock()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = get_metrics().to_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> Optional[ThreadingHTTPServer]:
+    """
+    Serve ``/metrics`` for Prometheus scraping from a daemon thread.
+
+    Safe to call on every Streamlit rerun: only the first call binds the port.
+
+    Args:
+        port: TCP port to listen on
+        host: Interface to bind
+
+    Returns:
+        The running server, or None if the port could not be bound
+    """
+    global _metrics_server
+    with _metrics_server_lock:
+        if _metrics_server is None:
+            try:
+                _metrics_server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            except OSError as e:
+                logger.error(f"Metrics server failed to start on port {port}: {str(e)}")
+                return None
+            thread = threading.Thread(target=_metrics_server.serve_forever, name="metrics-server", daemon=True)
+            thread.start()
+            logger.info(f"Metrics endpoint listening on {host}:{port}/metrics")
+        return _metrics_server
@@ -1,6 +1,8 @@
 """
 Input validation and sanitization utilities
 """
+import hashlib
+
 from config.settings import MIN_PRICE, MAX_PRICE
 
 def validate_price(value: float) -> bool:
@@ -17,4 +19,8 @@ def sanitize_input(text: str) -> str:
 
 def validate_api_key(api_key: str) -> bool:
     """Validate OpenAI API key format"""
-    return api_key.startswith('sk-') and len(api_key) > 20
\ No newline at end of file
+    return api_key.startswith('sk-') and len(api_key) > 20
+
+def api_key_fingerprint(api_key: str) -> str:
+    """Stable, non-reversible identifier for an API key"""
+    return hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]